@@ -83,6 +83,51 @@ class AlbumPostProcessor:
             "processed_date": datetime.now().isoformat()
         }
 
+    def master_track(self, json_path, data, track_num):
+        """Normalizes one rendered track into DISTRIBUTION_READY. Returns False if it was skipped."""
+        # 1. Identify Audio File
+        wav_path = Path(json_path).with_suffix('.wav')
+        if not wav_path.exists():
+            print(f"{Fore.RED}   ⚠️ Missing Audio for: {Path(json_path).name}")
+            return False
+
+        title = data.get('configuration', {}).get('input_prompt', {}).get('topic', f"Untitled_{track_num}")
+        safe_title = "".join([c for c in title if c.isalnum() or c in " _-"]).strip().replace(" ", "_")
+
+        print(f"{Fore.LIGHTBLACK_EX}   🎚️  Mastering Track {track_num}: {title}")
+
+        # 2. Load & Normalize Audio
+        try:
+            rate, audio = self._load_wav(wav_path)
+            norm_audio = self.normalize_audio(audio)
+
+            # 3. Save to Distribution Folder (Clean Name)
+            final_filename = f"{track_num:02d}_{safe_title}.wav"
+            final_path = self.dist_path / final_filename
+
+            self._save_wav(final_path, rate, norm_audio)
+
+        except Exception as e:
+            print(f"{Fore.RED}      Error processing audio: {e}")
+            return False
+        return True
+
+    def write_release_log(self, cleaned_metadata):
+        """Writes MASTER_RELEASE_LOG.json for the mastered tracks (in album order) and returns the analytics."""
+        # 5. Generate Master Analytics
+        analytics = self.generate_analytics(cleaned_metadata)
+
+        # 6. Save Master JSON
+        master_release = {
+            "album_name": self.album_path.name.replace("ALBUM_", "").replace("_", " "),
+            "analytics": analytics,
+            "tracks": cleaned_metadata
+        }
+
+        with open(self.dist_path / "MASTER_RELEASE_LOG.json", "w") as f:
+            json.dump(master_release, f, indent=4)
+        return analytics
+
     def process_album(self):
         print(f"\n{Fore.CYAN}🎧 STARTING POST-PRODUCTION: {self.album_path.name}")
 
@@ -113,49 +158,11 @@ class AlbumPostProcessor:
 
         # PROCESSING LOOP
         for idx, (json_path, data) in enumerate(track_ledgers):
-            track_num = idx + 1
-
-            # 1. Identify Audio File
-            wav_path = json_path.with_suffix('.wav')
-            if not wav_path.exists():
-                print(f"{Fore.RED}   ⚠️ Missing Audio for: {json_path.name}")
-                continue
+            if self.master_track(json_path, data, idx + 1):
+                # 4. Append to Metadata List
+                cleaned_metadata.append(data)
 
-            title = data.get('configuration', {}).get('input_prompt', {}).get('topic', f"Untitled_{track_num}")
-            safe_title = "".join([c for c in title if c.isalnum() or c in " _-"]).strip().replace(" ", "_")
-
-            print(f"{Fore.LIGHTBLACK_EX}   🎚️  Mastering Track {track_num}: {title}")
-
-            # 2. Load & Normalize Audio
-            try:
-                rate, audio = self._load_wav(wav_path)
-                norm_audio = self.normalize_audio(audio)
-
-                # 3. Save to Distribution Folder (Clean Name)
-                final_filename = f"{track_num:02d}_{safe_title}.wav"
-                final_path = self.dist_path / final_filename
-
-                self._save_wav(final_path, rate, norm_audio)
-
-            except Exception as e:
-                print(f"{Fore.RED}      Error processing audio: {e}")
-                continue
-
-            # 4. Append to Metadata List
-            cleaned_metadata.append(data)
-
-        # 5. Generate Master Analytics
-        analytics = self.generate_analytics(cleaned_metadata)
-
-        # 6. Save Master JSON
-        master_release = {
-            "album_name": self.album_path.name.replace("ALBUM_", "").replace("_", " "),
-            "analytics": analytics,
-            "tracks": cleaned_metadata
-        }
-
-        with open(self.dist_path / "MASTER_RELEASE_LOG.json", "w") as f:
-            json.dump(master_release, f, indent=4)
+        analytics = self.write_release_log(cleaned_metadata)
 
         print(f"\n{Fore.GREEN}✨ ALBUM MASTERED SUCCESSFULLY!")
         print(f"📂 Output: {self.dist_path}")
@@ -16,12 +16,13 @@ import json
 import re
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from colorama import Fore, Style, init
 
 from orphio_config import conf
-from lmstudio_controler import LMStudioController
-from orphio_engine import OrphioEngine
+from lmstudio_controler import LMStudioController, json_complete
+from orphio_engine import OrphioEngine, move_render
 
 # Initialize colorama for Green/Black console output
 init(autoreset=True)
@@ -29,7 +30,7 @@ init(autoreset=True)
 
 class ProducerBlueprintEngine:
     def __init__(self):
-        self.lms = LMStudioController(conf.LM_STUDIO_URL)
+        self.lms = LMStudioController(conf.LM_STUDIO_URL, stream=conf.LLM_STREAMING)
         self.engine = OrphioEngine(log_callback=print)
         # Point to the strategies folder
         self.strategies_path = Path(__file__).parent / "PRODUCER_STRATEGIES"
@@ -79,15 +80,11 @@ class ProducerBlueprintEngine:
                     return None
         return None
 
-    def stage_1_draft_content(self, blueprint, user_topic, user_track_count=None, tag_mode="AI", manual_tags=None):
+    def plan_album(self, blueprint, user_topic, user_track_count=None):
         """
-        PHASE 1: Planning and Lyric Generation.
-        Propagates Album Title, Theme, and Sequence Context to every song.
+        Executive Producer call: plans the tracklist and creates the album folder.
+        Returns (album_dir, album_title, album_theme, track_list), or None if the plan was not valid JSON.
         """
-        print(f"\n{Fore.GREEN}╔════════════════════════════════════════════════╗")
-        print(f"{Fore.GREEN}║  📝 PHASE 1: CONTENT DRAFTING & PROPAGATION   ║")
-        print(f"{Fore.GREEN}╚════════════════════════════════════════════════╝")
-
         # 1. Determine Track Count
         target_count = blueprint['executive_strategy'].get('track_count', 3)
         if user_track_count and user_track_count > 0:
@@ -102,7 +99,9 @@ class ProducerBlueprintEngine:
         )
 
         print(f"{Fore.GREEN}🧠 [PRODUCER] Blueprinting the album structure...")
-        plan_raw = self.lms.chat("You are a Master Executive Music Producer.", exec_prompt)
+        # Streaming stops as soon as the plan JSON is complete
+        plan_raw = self.lms.chat("You are a Master Executive Music Producer.", exec_prompt,
+                                 stop_when=lambda text: json_complete(text, dict))
         plan = self._extract_json_from_response(plan_raw)
 
         if not plan:
@@ -112,9 +111,8 @@ class ProducerBlueprintEngine:
         album_title = plan.get('album_title', 'Untitled Project')
         album_theme = plan.get('album_theme_summary', user_topic)
         track_list = plan.get('tracklist', [])
-        total_tracks = len(track_list)
 
-        print(f"{Fore.GREEN}✅ [PLAN READY] {album_title} | {total_tracks} tracks")
+        print(f"{Fore.GREEN}✅ [PLAN READY] {album_title} | {len(track_list)} tracks")
 
         # Create Album Directory
         safe_album_title = "".join([c for c in album_title if c.isalnum() or c in " _-"]).strip().replace(" ", "_")
@@ -125,73 +123,204 @@ class ProducerBlueprintEngine:
         with open(album_dir / "00_ALBUM_MANIFEST.json", "w", encoding='utf-8') as f:
             json.dump(plan, f, indent=4)
 
+        return album_dir, album_title, album_theme, track_list
+
+    def draft_track_lyrics(self, blueprint, album_title, album_theme, track, current_num, total_tracks,
+                           prev_context_text):
+        """Writes one track's lyrics from the blueprint template and the previous track's context."""
+        t_title = track.get('title', f"Track {current_num}")
+        t_description = track.get('scene_description', "Atmospheric development.")
+
+        print(f"\n{Fore.GREEN}✍️  Drafting Song {current_num}/{total_tracks}: {t_title}")
+
+        # Inject Blueprint Logic
+        template = blueprint['propagation_logic']['lyric_instruction_template']
+        smart_prompt = template.replace("{album_title}", album_title) \
+            .replace("{album_theme}", album_theme) \
+            .replace("{track_title}", t_title) \
+            .replace("{track_num}", str(current_num)) \
+            .replace("{total_tracks}", str(total_tracks)) \
+            .replace("{scene_description}", t_description) \
+            .replace("{prev_context}", prev_context_text)
+
+        # 4. Generate Lyrics
+        lyrics = self.lms.chat(conf.PROMPT_WRITER, smart_prompt)
+        return self.engine._enforce_tag_schema(lyrics)
+
+    def draft_track_tags(self, album_title, lyrics, tag_mode="AI", manual_tags=None):
+        # 5. Generate Tags
+        if tag_mode == "MANUAL":
+            tags = manual_tags if manual_tags else ["Electronic"]
+        else:
+            try:
+                print(f"{Fore.GREEN}   🏷️  Analyzing genre and vibe...")
+                tags_raw = self.lms.chat(conf.PROMPT_TAGGER, f"Album: {album_title}\nLyrics: {lyrics}", temp=0.2)
+                tags = self.engine._clean_tags_list(tags_raw)
+            except Exception:
+                tags = ["melodic", "modern", album_title.split()[0]]
+
+        print(f"{Fore.WHITE}   Final Style: {', '.join(tags)}")
+        return tags
+
+    def save_track_draft(self, album_dir, album_title, track, current_num, total_tracks, lyrics, tags):
+        """Saves the draft ledger and returns its path."""
+        t_title = track.get('title', f"Track {current_num}")
+        # 6. Save Draft Ledger
+        draft_data = {
+            "track_number": current_num,
+            "total_tracks": total_tracks,
+            "album_title": album_title,
+            "title": t_title,
+            "status": "DRAFT_READY",
+            "parameters": {
+                "topic": t_title,
+                "lyrics": lyrics,
+                "tags": tags,
+                "scene": track.get('scene_description', "Atmospheric development.")
+            }
+        }
+
+        safe_title = "".join([c for c in t_title if c.isalnum() or c in " _-"]).replace(" ", "_")
+        draft_path = Path(album_dir) / f"{current_num:02d}_{safe_title}_DRAFT.json"
+        with open(draft_path, "w", encoding='utf-8') as f:
+            json.dump(draft_data, f, indent=4)
+        return draft_path
+
+    @staticmethod
+    def _context_summary(lyrics):
+        # Context for the next song (first 200 chars of current lyrics)
+        return lyrics.replace("\n", " ")[:200] + "..."
+
+    @staticmethod
+    def _plan_context(track_list, i):
+        # "parallel" drafting: the previous song is not written yet, so describe it from the plan
+        if i == 0:
+            return "This is the opening track."
+        prev = track_list[i - 1]
+        return f"Previous track: {prev.get('title', f'Track {i}')} - {prev.get('scene_description', '')}"
+
+    def _draft_tracks_concurrently(self, blueprint, album_dir, album_title, album_theme, track_list,
+                                   tag_mode, manual_tags, slots, mode):
+        """
+        Drafts every track with up to `slots` LLM calls in flight.
+        pipelined: the writer chain stays in order (each song sees the previous lyrics) while the
+        tagger of song N runs next to the writer of song N+1. parallel: all songs at once.
+        Same failure policy as the sequential loop: no new track is started once a failure is seen,
+        the drafts already saved stay on disk, and the first failure (by track) is raised.
+        """
+        total_tracks = len(track_list)
+
+        def tag_and_save(i, track, lyrics):
+            tags = self.draft_track_tags(album_title, lyrics, tag_mode, manual_tags)
+            return self.save_track_draft(album_dir, album_title, track, i + 1, total_tracks, lyrics, tags)
+
+        def write_tag_and_save(i, track):
+            lyrics = self.draft_track_lyrics(blueprint, album_title, album_theme, track, i + 1, total_tracks,
+                                             self._plan_context(track_list, i))
+            return tag_and_save(i, track, lyrics)
+
+        def failed(futures):
+            return [(i, f.exception()) for i, f in futures
+                    if f.done() and not f.cancelled() and f.exception() is not None]
+
+        futures, failures = [], []
+        if mode == "parallel":
+            with ThreadPoolExecutor(max_workers=slots) as pool:
+                futures = [(i, pool.submit(write_tag_and_save, i, track)) for i, track in enumerate(track_list)]
+                for future in as_completed([f for _, f in futures]):
+                    if not future.cancelled() and future.exception() is not None:
+                        for _, pending in futures:
+                            pending.cancel()
+        else:
+            # The writer runs here, so the pool gets the remaining slots for taggers
+            with ThreadPoolExecutor(max_workers=max(1, slots - 1)) as pool:
+                prev_context_text = "This is the opening track."
+                for i, track in enumerate(track_list):
+                    if failed(futures):
+                        break
+                    try:
+                        lyrics = self.draft_track_lyrics(blueprint, album_title, album_theme, track, i + 1,
+                                                         total_tracks, prev_context_text)
+                    except Exception as e:
+                        failures.append((i, e))
+                        break
+                    futures.append((i, pool.submit(tag_and_save, i, track, lyrics)))
+                    prev_context_text = self._context_summary(lyrics)
+
+        failures = sorted(failures + failed(futures), key=lambda failure: failure[0])
+        if failures:
+            for i, e in failures:
+                print(f"{Fore.RED}❌ Drafting failed for track {i + 1}: {e}")
+            raise failures[0][1]
+
+    def stage_1_draft_content(self, blueprint, user_topic, user_track_count=None, tag_mode="AI", manual_tags=None):
+        """
+        PHASE 1: Planning and Lyric Generation.
+        Propagates Album Title, Theme, and Sequence Context to every song.
+        """
+        print(f"\n{Fore.GREEN}╔════════════════════════════════════════════════╗")
+        print(f"{Fore.GREEN}║  📝 PHASE 1: CONTENT DRAFTING & PROPAGATION   ║")
+        print(f"{Fore.GREEN}╚════════════════════════════════════════════════╝")
+
+        planned = self.plan_album(blueprint, user_topic, user_track_count)
+        if not planned:
+            return None
+        album_dir, album_title, album_theme, track_list = planned
+        total_tracks = len(track_list)
+
+        if conf.LLM_PARALLEL_SLOTS > 1:
+            self._draft_tracks_concurrently(blueprint, album_dir, album_title, album_theme, track_list,
+                                            tag_mode, manual_tags, conf.LLM_PARALLEL_SLOTS, conf.DRAFT_MODE)
+            return album_dir
+
         context_history = []
 
         # 3. Iterative Generation Loop
         for i, track in enumerate(track_list):
             current_num = i + 1
-            t_title = track.get('title', f"Track {current_num}")
-            t_description = track.get('scene_description', "Atmospheric development.")
-
-            print(f"\n{Fore.GREEN}✍️  Drafting Song {current_num}/{total_tracks}: {t_title}")
-
             # Prepare Sequence Context (Narrative Flow)
             prev_context_text = context_history[-1]['summary'] if context_history else "This is the opening track."
 
-            # Inject Blueprint Logic
-            template = blueprint['propagation_logic']['lyric_instruction_template']
-            smart_prompt = template.replace("{album_title}", album_title) \
-                .replace("{album_theme}", album_theme) \
-                .replace("{track_title}", t_title) \
-                .replace("{track_num}", str(current_num)) \
-                .replace("{total_tracks}", str(total_tracks)) \
-                .replace("{scene_description}", t_description) \
-                .replace("{prev_context}", prev_context_text)
-
-            # 4. Generate Lyrics
-            lyrics = self.lms.chat(conf.PROMPT_WRITER, smart_prompt)
-            lyrics = self.engine._enforce_tag_schema(lyrics)
-
-            # 5. Generate Tags
-            if tag_mode == "MANUAL":
-                tags = manual_tags if manual_tags else ["Electronic"]
-            else:
-                try:
-                    print(f"{Fore.GREEN}   🏷️  Analyzing genre and vibe...")
-                    tags_raw = self.lms.chat(conf.PROMPT_TAGGER, f"Album: {album_title}\nLyrics: {lyrics}", temp=0.2)
-                    tags = self.engine._clean_tags_list(tags_raw)
-                except Exception:
-                    tags = ["melodic", "modern", album_title.split()[0]]
-
-            print(f"{Fore.WHITE}   Final Style: {', '.join(tags)}")
-
-            # 6. Save Draft Ledger
-            draft_data = {
-                "track_number": current_num,
-                "total_tracks": total_tracks,
-                "album_title": album_title,
-                "title": t_title,
-                "status": "DRAFT_READY",
-                "parameters": {
-                    "topic": t_title,
-                    "lyrics": lyrics,
-                    "tags": tags,
-                    "scene": t_description
-                }
-            }
-
-            safe_title = "".join([c for c in t_title if c.isalnum() or c in " _-"]).replace(" ", "_")
-            fname = f"{current_num:02d}_{safe_title}_DRAFT.json"
-            with open(album_dir / fname, "w", encoding='utf-8') as f:
-                json.dump(draft_data, f, indent=4)
+            lyrics = self.draft_track_lyrics(blueprint, album_title, album_theme, track, current_num,
+                                             total_tracks, prev_context_text)
+            tags = self.draft_track_tags(album_title, lyrics, tag_mode, manual_tags)
+            self.save_track_draft(album_dir, album_title, track, current_num, total_tracks, lyrics, tags)
 
-            # Update context for the next song (first 200 chars of current lyrics)
-            summary = lyrics.replace("\n", " ")
-            context_history.append({"summary": summary[:200] + "..."})
+            context_history.append({"summary": self._context_summary(lyrics)})
             time.sleep(1.0)
 
         return album_dir
 
+    def render_track_draft(self, json_file, album_dir, user_duration, cfg_scale=1.5, unload_llm=True):
+        """Renders one *_DRAFT.json, moves the wav + ledger to their final album names and removes the draft."""
+        json_file, album_dir = Path(json_file), Path(album_dir)
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        params = data.get("parameters", {})
+        self.engine.free_memory()
+
+        wav_path, ledger = self.engine.render_audio_stage(
+            topic=data.get("title"),
+            lyrics=params.get("lyrics"),
+            tags=params.get("tags"),
+            duration_s=user_duration,
+            cfg=cfg_scale,
+            temp=1.0,
+            unload_llm=unload_llm
+        )
+
+        # Rename to final clean naming convention
+        dest_wav = album_dir / json_file.name.replace("_DRAFT.json", ".wav")
+        dest_json = album_dir / json_file.name.replace("_DRAFT.json", ".json")
+
+        if Path(wav_path).exists():
+            move_render(wav_path, dest_wav, ledger)
+
+        os.remove(json_file)  # Remove draft once rendered
+        print(f"{Fore.GREEN}   ✅ Finished Production: {dest_wav.name}")
+        return dest_json
+
     def stage_2_batch_render(self, album_dir, user_duration, cfg_scale=1.5):
         """
         PHASE 2: Batch Audio Rendering.
@@ -206,42 +335,112 @@ class ProducerBlueprintEngine:
         for idx, json_file in enumerate(drafts):
             try:
                 with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                params = data.get("parameters", {})
-                self.engine.free_memory()
+                    title = json.load(f).get('title')
+                print(f"{Fore.GREEN}🚀 Rendering [{idx + 1}/{len(drafts)}]: {title}")
+                self.render_track_draft(json_file, album_dir, user_duration, cfg_scale)
 
-                print(f"{Fore.GREEN}🚀 Rendering [{idx + 1}/{len(drafts)}]: {data.get('title')}")
-
-                wav_path, ledger = self.engine.render_audio_stage(
-                    topic=data.get("title"),
-                    lyrics=params.get("lyrics"),
-                    tags=params.get("tags"),
-                    duration_s=user_duration,
-                    cfg=cfg_scale,
-                    temp=1.0
-                )
+            except Exception as e:
+                print(f"{Fore.RED}❌ Batch Render Error on {json_file.name}: {e}")
 
-                # Rename to final clean naming convention
-                dest_wav_name = json_file.name.replace("_DRAFT.json", ".wav")
-                dest_json_name = json_file.name.replace("_DRAFT.json", ".json")
+    def execute_album_scheduled(self, blueprint, user_topic, user_duration=120, user_track_count=None,
+                                cfg_scale=1.5, master=False, tag_mode="AI", manual_tags=None):
+        """
+        Same album as stage_1 + stage_2 (+ mastering), run as a resource-aware task DAG
+        (see album_scheduler.py): per track draft -> tags -> render -> master. With
+        conf.LLM_ON_GPU = False the LLM drafts later tracks while earlier ones render.
+        """
+        from album_scheduler import DAGScheduler
 
-                if Path(wav_path).exists():
-                    Path(wav_path).rename(album_dir / dest_wav_name)
-                    ledger_source = Path(wav_path).with_suffix('.json')
-                    if ledger_source.exists():
-                        ledger_source.rename(album_dir / dest_json_name)
+        planned = self.plan_album(blueprint, user_topic, user_track_count)
+        if not planned:
+            return None
+        album_dir, album_title, album_theme, track_list = planned
+        total_tracks = len(track_list)
 
-                os.remove(json_file)  # Remove draft once rendered
-                print(f"{Fore.GREEN}   ✅ Finished Production: {dest_wav_name}")
+        llm_on_gpu = conf.LLM_ON_GPU
+        parallel = conf.DRAFT_MODE == "parallel"
+        # On the GPU the "llm" owner tag keeps drafts and renders apart; on the CPU drafts take a cpu slot
+        llm_tokens = {"llm": 1} if llm_on_gpu else {"llm": 1, "cpu": 1}
+        llm_owner = "llm" if llm_on_gpu else None
+        cpu_slots = conf.SCHEDULER_CPU_SLOTS + (0 if llm_on_gpu else conf.LLM_PARALLEL_SLOTS - 1)
+        scheduler = DAGScheduler(
+            {"vram": 1, "llm": conf.LLM_PARALLEL_SLOTS, "cpu": cpu_slots},
+            log=print,
+            gpu_owner=llm_owner  # the planning call just ran
+        )
+        processor = None
+        if master:
+            from Album_Post_Processor import AlbumPostProcessor
+            processor = AlbumPostProcessor(album_dir)
 
-            except Exception as e:
-                print(f"{Fore.RED}❌ Batch Render Error on {json_file.name}: {e}")
+        prev_draft = None
+        master_tasks = []
+        for i, track in enumerate(track_list):
+            num = i + 1
+
+            def draft(task, track=track, num=num, prev=prev_draft):
+                if parallel:
+                    prev_context = self._plan_context(track_list, num - 1)
+                elif prev:
+                    prev_context = self._context_summary(prev.result)
+                else:
+                    prev_context = "This is the opening track."
+                return self.draft_track_lyrics(blueprint, album_title, album_theme, track, num,
+                                               total_tracks, prev_context)
+
+            def tag(task, track=track, num=num):
+                lyrics = task.deps[0].result
+                tags = self.draft_track_tags(album_title, lyrics, tag_mode, manual_tags)
+                return self.save_track_draft(album_dir, album_title, track, num, total_tracks, lyrics, tags)
+
+            def render(task, num=num):
+                print(f"{Fore.GREEN}🚀 Rendering [{num}/{total_tracks}]")
+                # Only evict the LLM when it actually shares the GPU with HeartMuLa
+                return self.render_track_draft(task.deps[0].result, album_dir, user_duration, cfg_scale,
+                                               unload_llm=llm_on_gpu and task.swap)
+
+            # Pipelined drafts follow the previous one: the narrative context chains the tracks
+            chain = [prev_draft] if prev_draft and not parallel else []
+            draft_task = scheduler.add(f"draft_{num:02d}", draft, deps=chain,
+                                       resources=llm_tokens, gpu_owner=llm_owner, track=num)
+            tag_task = scheduler.add(f"tags_{num:02d}", tag, deps=[draft_task], resources=llm_tokens,
+                                     gpu_owner=llm_owner, track=num)
+            render_task = scheduler.add(f"render_{num:02d}", render, deps=[tag_task], resources={"vram": 1},
+                                        gpu_owner="audio", track=num)
+            if processor is not None:
+                def master_fn(task, num=num):
+                    json_path = task.deps[0].result
+                    with open(json_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    return data if processor.master_track(json_path, data, num) else None
+
+                master_tasks.append(scheduler.add(f"master_{num:02d}", master_fn, deps=[render_task],
+                                                  resources={"cpu": 1}, track=num))
+            prev_draft = draft_task
+
+        summary = scheduler.run()
+        if processor is not None:
+            mastered = [t.result for t in master_tasks if t.state == "done" and t.result]
+            processor.write_release_log(mastered)
+
+        work = sum(t["sec"] for t in summary["tasks"].values())
+        print(f"{Fore.GREEN}⏱️ Album done in {summary['wall_sec']:.0f}s wall-clock "
+              f"({work:.0f}s of task time, {summary['gpu_swaps']} GPU model swap(s))")
+        failed = [name for name, t in summary["tasks"].items() if t["state"] != "done"]
+        if failed:
+            print(f"{Fore.RED}❌ Not completed: {', '.join(failed)}")
+        return album_dir
 
-    def execute_album(self, blueprint, user_topic, user_duration=120, user_track_count=None):
+    def execute_album(self, blueprint, user_topic, user_duration=120, user_track_count=None, master=False):
         """Full Pipeline Orchestrator."""
+        if conf.SCHEDULED_ALBUM_PIPELINE:
+            return self.execute_album_scheduled(blueprint, user_topic, user_duration, user_track_count,
+                                                master=master)
         album_path = self.stage_1_draft_content(blueprint, user_topic, user_track_count)
         if album_path:
             self.stage_2_batch_render(album_path, user_duration)
+            if master:
+                from Album_Post_Processor import AlbumPostProcessor
+                AlbumPostProcessor(album_path).process_album()
             return album_path
-        return None
\ No newline at end of file
+        return None
@@ -28,7 +28,7 @@ init(autoreset=True)
 
 try:
     from orphio_config import conf
-    from orphio_engine import OrphioEngine
+    from orphio_engine import OrphioEngine, move_render
 except ImportError:
     print(f"{Fore.RED}Error: Cannot import required modules.")
     print(f"{Fore.YELLOW}Make sure this script is in the AGANCY folder.")
@@ -116,15 +116,12 @@ class IndividualSongRenderer:
             final_wav = album_dir / f"{track_num:02d}_{safe_title}.wav"
             final_json = album_dir / f"{track_num:02d}_{safe_title}.json"
             
-            # Move files
+            # Move files (wav, ledger and codec artifact together)
             if Path(wav_path).exists():
-                Path(wav_path).rename(final_wav)
+                move_render(wav_path, final_wav, ledger)
                 self.log(f"✓ Audio saved: {final_wav.name}", "green")
-            
-            json_path = Path(wav_path).with_suffix('.json')
-            if json_path.exists():
-                json_path.rename(final_json)
-                self.log(f"✓ Ledger saved: {final_json.name}", "green")
+                if final_json.exists():
+                    self.log(f"✓ Ledger saved: {final_json.name}", "green")
             
             # Delete draft file
             draft_file.unlink()
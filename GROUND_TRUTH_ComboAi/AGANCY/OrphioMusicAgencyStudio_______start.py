@@ -113,6 +113,7 @@ class AgencyWaveform(QWidget):
 
 class WorkerSignals(QObject):
     log = pyqtSignal(str)
+    token = pyqtSignal(str)
     finished_draft = pyqtSignal(str, list)
     finished_decorate = pyqtSignal(str)
     finished_render = pyqtSignal(str)
@@ -132,12 +133,14 @@ class OrphioStudio(QMainWindow):
 
         self.signals = WorkerSignals()
         self.signals.log.connect(self.log_system)
+        self.signals.token.connect(self.append_live_token)
         self.signals.finished_draft.connect(self.on_draft_complete)
         self.signals.finished_decorate.connect(self.on_decorate_complete)
         self.signals.finished_render.connect(self.on_render_complete)
         self.signals.error.connect(self.on_error)
 
-        self.engine = OrphioEngine(log_callback=lambda m: self.signals.log.emit(m))
+        self.engine = OrphioEngine(log_callback=lambda m: self.signals.log.emit(m),
+                                   token_callback=lambda t: self.signals.token.emit(t))
         self.player = QMediaPlayer()
         self.audio_output = QAudioOutput()
         self.player.setAudioOutput(self.audio_output)
@@ -388,9 +391,17 @@ class OrphioStudio(QMainWindow):
         # We now pull from the LIVE EDITABLE box above the lyrics
         return [t.strip().lower() for t in self.txt_live_tags.text().split(",") if t.strip()]
 
+    def append_live_token(self, text):
+        # Streamed lyrics appear as they are written; the finished handler replaces them with the cleaned text
+        self.txt_lyrics.moveCursor(QTextCursor.MoveOperation.End)
+        self.txt_lyrics.insertPlainText(text)
+
     def run_draft_thread(self):
         topic = self.input_topic.toPlainText()
-        if topic: self.prog.setRange(0, 0); threading.Thread(target=self._bg_draft, args=(topic,), daemon=True).start()
+        if topic:
+            self.prog.setRange(0, 0)
+            self.txt_lyrics.clear()
+            threading.Thread(target=self._bg_draft, args=(topic,), daemon=True).start()
 
     def _bg_draft(self, t):
         try:
@@ -408,6 +419,7 @@ class OrphioStudio(QMainWindow):
         l = self.txt_lyrics.toPlainText()
         conf.CURRENT_DECORATOR_SCHEMA = self.combo_dec.currentText()
         self.prog.setRange(0, 0);
+        self.txt_lyrics.clear()
         threading.Thread(target=self._bg_decorate, args=(l, self.get_active_tags()), daemon=True).start()
 
     def _bg_decorate(self, l, t):
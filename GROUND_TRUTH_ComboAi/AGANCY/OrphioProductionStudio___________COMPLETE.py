@@ -36,7 +36,7 @@ if str(CURRENT_DIR) not in sys.path:
 try:
     # Core Engine
     from orphio_config import conf
-    from orphio_engine import OrphioEngine
+    from orphio_engine import OrphioEngine, move_render
     import torch
 
     # Pipeline Tools
@@ -44,6 +44,7 @@ try:
 
     # NEW: Import the Blueprint Engine for Dynamic Strategies
     from Blueprint_Executor import ProducerBlueprintEngine
+    from lmstudio_controler import json_complete
 
     # UI Styles
     from agency_styles import MODERN_STYLES
@@ -1087,7 +1088,8 @@ class OrphioStudio(QMainWindow):
                 "Example: [{\"title\": \"Song A\", \"mood\": \"Dark\", \"instruction\": \"Slow build\"}, ...]"
             )
 
-            plan_raw = self.engine.lms.chat(system_prompt, "Generate JSON plan now.", temp=0.7)
+            plan_raw = self.engine.lms.chat(system_prompt, "Generate JSON plan now.", temp=0.7,
+                                            stop_when=lambda text: json_complete(text, list))
 
             # CLEAN THE JSON (The Fix)
             plan_raw = plan_raw.replace("```json", "").replace("```", "").strip()
@@ -1361,9 +1363,18 @@ class OrphioStudio(QMainWindow):
                     tags=params.get('tags'),
                     duration_s=settings['duration'],
                     cfg=settings['cfg'],
-                    temp=settings['temp']
+                    temp=settings['temp'],
+                    seed=params.get('seed'),
+                    # Same-seed re-render: reuses codec windows while lyrics and tags are unchanged
+                    reuse_windows=params.get('seed') is not None
                 )
 
+                # Keep the seed on the draft so the next render of it is a same-seed re-render
+                params['seed'] = ledger.configuration.seed
+                data['parameters'] = params
+                with open(draft_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=4)
+
                 # NEW: Update ledger with actual settings used
                 ledger.configuration.cfg_scale = settings['cfg']
                 ledger.configuration.temperature = settings['temp']
@@ -1378,11 +1389,8 @@ class OrphioStudio(QMainWindow):
                 dest = draft_path.with_suffix('.wav').name.replace("_DRAFT", "")
                 final = draft_path.parent / dest
                 if Path(wav_path).exists():
-                    Path(wav_path).rename(final)
-                    # Also move the JSON
-                    json_dest = final.with_suffix('.json')
-                    if json_path.exists():
-                        json_path.rename(json_dest)
+                    # wav, ledger JSON and codec artifact move together
+                    move_render(wav_path, final, ledger)
 
             except Exception as e:
                 self.signals.error.emit(f"Render Error: {e}")
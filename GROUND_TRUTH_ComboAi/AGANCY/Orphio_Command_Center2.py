@@ -52,7 +52,7 @@ if str(CURRENT_DIR) not in sys.path:
 # Import engine components first
 try:
     from orphio_config import conf
-    from orphio_engine import OrphioEngine
+    from orphio_engine import OrphioEngine, move_render
     from Blueprint_Executor import ProducerBlueprintEngine
     import torch
 
@@ -284,7 +284,7 @@ class RenderThread(QThread):
                     dest_path = album_path / dest_wav
 
                     if Path(wav_path).exists():
-                        Path(wav_path).rename(dest_path)
+                        move_render(wav_path, dest_path, ledger)
 
                     # Save ledger
                     final_ledger_path = dest_path.with_suffix('.json')
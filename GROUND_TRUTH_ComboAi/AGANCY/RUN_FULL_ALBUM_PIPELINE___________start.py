@@ -12,13 +12,11 @@ except ImportError:
 # === END AUTO-PATCH ===
 
 import sys
-import time
 from pathlib import Path
 from colorama import Fore, Style, init
 
 # Import your classes
 from Blueprint_Executor import ProducerBlueprintEngine
-from Album_Post_Processor import AlbumPostProcessor
 from orphio_config import conf
 
 init(autoreset=True)
@@ -94,24 +92,12 @@ def main():
     print(f"\n{Fore.MAGENTA}🚀 HANDING OVER TO {p_name_display.upper()}...")
 
     # PASS COUNT TO EXECUTOR
-    executor.execute_album(blueprint, topic, user_duration, user_count)
-
-    # 6. AUTO-MASTERING
-    print(f"\n{Fore.YELLOW}⏳ GENERATION COMPLETE. SCANNING FOR ALBUM OUTPUT...")
-    time.sleep(2)
-
-    all_albums = [d for d in conf.OUTPUT_DIR.glob("ALBUM_*") if d.is_dir()]
-    if not all_albums:
+    # 6. AUTO-MASTERING: each track is normalized as soon as it is rendered
+    latest_album = executor.execute_album(blueprint, topic, user_duration, user_count, master=True)
+    if not latest_album:
         print(f"{Fore.RED}❌ Error: No album folder found.")
         return
 
-    latest_album = max(all_albums, key=lambda p: p.stat().st_ctime)
-
-    print(f"{Fore.CYAN}🎚️  MASTERING ENGINEER: Normalizing '{latest_album.name}'...")
-
-    processor = AlbumPostProcessor(latest_album)
-    processor.process_album()
-
     print(f"\n{Fore.GREEN}{Style.BRIGHT}✅ PRODUCTION CYCLE COMPLETE.")
     print(f"{Fore.WHITE}📂 LOCATION: {latest_album / 'DISTRIBUTION_READY'}")
 
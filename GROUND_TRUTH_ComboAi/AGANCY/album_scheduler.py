@@ -0,0 +1,134 @@
+# AGANCY/album_scheduler.py
+"""
+ALBUM SCHEDULER
+===============
+Runs a DAG of tasks (per track: draft -> tags -> render -> master) on worker threads, starting
+each task as soon as its dependencies are done and the resource tokens it asks for are free.
+
+Resources are plain counted tokens, e.g. {"vram": 1, "llm": 1, "cpu": 2}:
+  - vram: the GPU, held by HeartMuLa renders.
+  - llm:  concurrent completions LM Studio can serve (its parallel slots).
+  - cpu:  mastering and a CPU-hosted LLM.
+GPU-resident work is also tagged with a gpu_owner ("llm" / "audio"): tasks of different owners
+never share the GPU, while several LLM tasks may use it at once.
+With the LLM on the CPU, track 1 renders on the GPU while tracks 2..N are still being drafted, so
+album wall-clock approaches max(draft, render) instead of their sum. With the LLM on the GPU the
+scheduler keeps the current GPU owner (LLM or audio) busy for as long as it has ready work, so the
+model is swapped once per phase instead of once per song.
+"""
+
+import threading
+import time
+import traceback
+
+
+class Task:
+    def __init__(self, name, fn, deps=(), resources=None, gpu_owner=None, track=0):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.resources = dict(resources or {})
+        # Who has to be resident on the GPU while this runs ("llm" / "audio"), if anyone
+        self.gpu_owner = gpu_owner
+        self.track = track
+        self.state = "pending"  # pending -> running -> done | failed | skipped
+        self.result = None
+        self.error = None
+        self.swap = False  # set when starting this task evicts the other GPU owner
+        self.started = None
+        self.finished = None
+
+
+class DAGScheduler:
+    def __init__(self, capacity, log=print, gpu_owner=None):
+        self.capacity = dict(capacity)
+        self.free = dict(capacity)
+        self.log = log
+        self.tasks = []
+        # What is resident on the GPU before the first task, e.g. "llm" after the planning call
+        self.gpu_owner = gpu_owner
+        self.swaps = 0
+        self._cond = threading.Condition()
+
+    def add(self, name, fn, deps=(), resources=None, gpu_owner=None, track=0):
+        """Registers a task; fn(task) runs on a worker thread and its return value is task.result."""
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"{name}: dependency {dep.name} was not added to this scheduler")
+        for res, count in (resources or {}).items():
+            if count > self.capacity.get(res, 0):
+                raise ValueError(f"{name} needs {count} x {res}, capacity is {self.capacity.get(res, 0)}")
+        task = Task(name, fn, deps, resources, gpu_owner, track)
+        self.tasks.append(task)
+        return task
+
+    def _ready(self):
+        # Tasks are added after their dependencies, so one pass propagates failures downstream
+        for task in self.tasks:
+            if task.state == "pending" and any(dep.state in ("failed", "skipped") for dep in task.deps):
+                task.state = "skipped"
+                self.log(f"⏭️ {task.name}: skipped, a dependency failed")
+        ready = [
+            task for task in self.tasks
+            if task.state == "pending"
+            and all(dep.state == "done" for dep in task.deps)
+            and all(self.free.get(res, 0) >= n for res, n in task.resources.items())
+        ]
+        # Stay with the current GPU owner while it has work, then earliest track first
+        ready.sort(key=lambda t: (t.gpu_owner is not None and t.gpu_owner != self.gpu_owner, t.track))
+        return ready
+
+    def _start(self, task):
+        for res, n in task.resources.items():
+            self.free[res] -= n
+        if task.gpu_owner is not None:
+            task.swap = self.gpu_owner is not None and task.gpu_owner != self.gpu_owner
+            self.swaps += task.swap
+            self.gpu_owner = task.gpu_owner
+        task.state = "running"
+        task.started = time.time()
+        threading.Thread(target=self._run, args=(task,), name=task.name, daemon=True).start()
+
+    def _run(self, task):
+        try:
+            result, error = task.fn(task), None
+        except Exception as e:
+            result, error = None, e
+            self.log(f"❌ {task.name}: {e}")
+            traceback.print_exc()
+        with self._cond:
+            task.result, task.error = result, error
+            task.state = "failed" if error is not None else "done"
+            task.finished = time.time()
+            for res, n in task.resources.items():
+                self.free[res] += n
+            self._cond.notify_all()
+
+    def run(self):
+        """Runs every task; returns a summary with wall time, swaps and per-task timings."""
+        start = time.time()
+        with self._cond:
+            while True:
+                # A GPU task may only start once no task of the other owner is still on the GPU
+                busy_owners = {t.gpu_owner for t in self.tasks if t.state == "running" and t.gpu_owner}
+                for task in self._ready():
+                    if task.gpu_owner and busy_owners - {task.gpu_owner}:
+                        continue
+                    if all(self.free.get(res, 0) >= n for res, n in task.resources.items()):
+                        self._start(task)
+                        if task.gpu_owner:
+                            busy_owners.add(task.gpu_owner)
+                if all(t.state in ("done", "failed", "skipped") for t in self.tasks):
+                    break
+                if not any(t.state == "running" for t in self.tasks):
+                    stuck = [t.name for t in self.tasks if t.state == "pending"]
+                    raise RuntimeError(f"Scheduler deadlock, nothing can start: {stuck}")
+                self._cond.wait()
+        return {
+            "wall_sec": time.time() - start,
+            "gpu_swaps": self.swaps,
+            "tasks": {
+                t.name: {"state": t.state, "sec": (t.finished or start) - (t.started or start)}
+                for t in self.tasks
+            },
+        }
@@ -15,21 +15,177 @@ except ImportError:
 import requests
 import json
 import re
+import threading
+import time
+from requests.adapters import HTTPAdapter
 from colorama import Fore, Style
 
 
+class ReasoningFilter:
+    """
+    Streaming counterpart of detect_and_clean_reasoning: feed() takes raw completion chunks and
+    returns only the text outside <think>/<thought> blocks, as soon as it is known to be visible.
+    <|begin_of_box|> discards everything before it and <|end_of_box|> ends the answer (done).
+    A chunk tail that could be the start of a marker is held back until the next chunk.
+    """
+
+    OPEN = {"<think>": "</think>", "<thought>": "</thought>"}
+    BOX_BEGIN, BOX_END = "<|begin_of_box|>", "<|end_of_box|>"
+    MARKERS = tuple(OPEN) + (BOX_BEGIN, BOX_END)
+
+    def __init__(self):
+        self.text = ""  # visible answer so far
+        self.pending = ""  # unprocessed tail
+        self.closing = None  # closing tag while inside a reasoning block
+        self.done = False
+        self.scrubbed = 0
+
+    @staticmethod
+    def _partial(low, markers):
+        """Length of the longest suffix of low that is a proper prefix of a marker."""
+        for k in range(min(len(low), max(len(m) for m in markers) - 1), 0, -1):
+            if any(m.startswith(low[-k:]) for m in markers):
+                return k
+        return 0
+
+    def feed(self, chunk):
+        self.pending += chunk
+        out = ""
+        while self.pending and not self.done:
+            low = self.pending.lower()
+            if self.closing:
+                idx = low.find(self.closing)
+                if idx < 0:
+                    keep = self._partial(low, (self.closing,))
+                    self.scrubbed += len(self.pending) - keep
+                    self.pending = self.pending[len(self.pending) - keep:]
+                    break
+                self.scrubbed += idx + len(self.closing)
+                self.pending = self.pending[idx + len(self.closing):]
+                self.closing = None
+                continue
+            hits = [(low.find(m), m) for m in self.MARKERS if m in low]
+            if not hits:
+                keep = self._partial(low, self.MARKERS)
+                out += self.pending[:len(self.pending) - keep]
+                self.pending = self.pending[len(self.pending) - keep:]
+                break
+            idx, marker = min(hits)
+            out += self.pending[:idx]
+            self.pending = self.pending[idx + len(marker):]
+            self.scrubbed += len(marker)
+            if marker in self.OPEN:
+                self.closing = self.OPEN[marker]
+            elif marker == self.BOX_BEGIN:
+                # only the boxed answer counts
+                self.scrubbed += len(self.text) + len(out)
+                self.text, out = "", ""
+            else:
+                self.done = True
+        self.text += out
+        return out
+
+    def finish(self):
+        """The visible answer, with any held-back tail that turned out not to be a marker."""
+        if not self.closing and not self.done:
+            self.text += self.pending
+        else:
+            self.scrubbed += len(self.pending)
+        self.pending = ""
+        return self.text
+
+
+def json_complete(text, kind=(dict, list)):
+    """
+    Stop condition for streaming chat(): True once text holds a complete, parseable JSON value of
+    type `kind` (e.g. kind=dict for a {...} plan). Bracketed prose such as "Step [1]" is skipped
+    and the scan moves on to the next opening bracket; an unclosed candidate means "keep going".
+    """
+    opening = "{" if kind is dict else "[" if kind is list else "{["
+    pos = 0
+    while True:
+        starts = [i for i in (text.find(c, pos) for c in opening) if i >= 0]
+        if not starts:
+            return False
+        start = min(starts)
+        end = _matching_bracket(text, start)
+        if end is None:
+            return False
+        try:
+            value = json.loads(text[start:end + 1])
+        except ValueError:
+            pos = start + 1  # not JSON as a whole; a value may still start inside it
+            continue
+        if isinstance(value, kind):
+            return True
+        pos = end + 1
+
+
+def _matching_bracket(text, start):
+    """Index of the bracket closing text[start], or None while it is still open."""
+    depth, in_string, escaped = 0, False, False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
 class LMStudioController:
-    def __init__(self, base_url):
+    def __init__(self, base_url, model_ttl=60.0, pool_size=8, stream=False):
         self.base_url = base_url.rstrip('/')
+        # stream=True: chat() uses server-sent events unless told otherwise per call
+        self.stream = stream
+        # One keep-alive session for every call instead of a new TCP connection per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # The active model ID is cached for model_ttl seconds (dropped on 400/404 and unload)
+        self.model_ttl = model_ttl
+        self._model_id = None
+        self._model_checked = 0.0
+        self._model_lock = threading.Lock()
+
+    def invalidate_model_cache(self):
+        with self._model_lock:
+            self._model_id = None
+
+    def _fetch_models(self, timeout):
+        """GET /models; caches and returns (response, model_id)."""
+        res = self.session.get(f"{self.base_url}/models", timeout=timeout)
+        model_id = None
+        if res.status_code == 200:
+            data = res.json()
+            if data.get('data') and len(data['data']) > 0:
+                model_id = data['data'][0]['id']
+        with self._model_lock:
+            self._model_id = model_id
+            self._model_checked = time.monotonic()
+        return res, model_id
 
     def get_active_model(self):
-        """Fetches the exact ID of the currently loaded model from LM Studio."""
+        """Fetches the exact ID of the currently loaded model from LM Studio (cached for model_ttl seconds)."""
+        with self._model_lock:
+            if self._model_id and time.monotonic() - self._model_checked < self.model_ttl:
+                return self._model_id
         try:
-            res = requests.get(f"{self.base_url}/models", timeout=2)
-            if res.status_code == 200:
-                data = res.json()
-                if data.get('data') and len(data['data']) > 0:
-                    return data['data'][0]['id']
+            _, model_id = self._fetch_models(timeout=2)
+            if model_id:
+                return model_id
         except:
             pass
         return "local-model"
@@ -37,10 +193,9 @@ class LMStudioController:
     def check_connection(self):
         """Returns (bool, message) regarding connection status."""
         try:
-            model_id = self.get_active_model()
-            res = requests.get(f"{self.base_url}/models", timeout=3)
+            res, model_id = self._fetch_models(timeout=3)
             if res.status_code == 200:
-                return True, f"Connected: {model_id}"
+                return True, f"Connected: {model_id or 'local-model'}"
             return False, f"HTTP Error {res.status_code}"
         except requests.exceptions.ConnectionError:
             return False, "Connection Refused (Is LM Studio Server ON?)"
@@ -79,11 +234,63 @@ class LMStudioController:
 
         return content
 
-    def chat(self, system_prompt, user_content, temp=0.7):
+    def _post_completion(self, payload, stream):
+        # We set a long timeout (600s) because Reasoning models 'think'
+        # for a long time before sending the first character.
+        res = self.session.post(f"{self.base_url}/chat/completions", json=payload, timeout=600, stream=stream)
+
+        # Retry with generic ID if specific ID fails; the cached ID is probably stale
+        if res.status_code in (400, 404):
+            res.close()
+            self.invalidate_model_cache()
+            print(f"{Fore.YELLOW}⚠️  Retrying with generic 'local-model' ID...")
+            payload["model"] = "local-model"
+            res = self.session.post(f"{self.base_url}/chat/completions", json=payload, timeout=600,
+                                    stream=stream)
+
+        if res.status_code != 200:
+            raise Exception(f"LM Studio Error {res.status_code}: {res.text}")
+        return res
+
+    def _stream_completion(self, payload, on_token=None, stop_when=None):
+        """
+        Reads the SSE stream chunk by chunk, dropping reasoning / box markup on the fly.
+        on_token(text) gets each newly visible piece (e.g. to show lyrics live in a GUI);
+        the stream is closed early, which stops generation, when stop_when(visible_text)
+        returns True or the model closes its answer box.
+        """
+        payload = dict(payload, stream=True)
+        filt = ReasoningFilter()
+        with self._post_completion(payload, stream=True) as res:
+            res.encoding = "utf-8"
+            for line in res.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                delta = choices[0].get('delta', {}).get('content') or ""
+                visible = filt.feed(delta)
+                if visible and on_token is not None:
+                    on_token(visible)
+                if filt.done or (stop_when is not None and stop_when(filt.text)):
+                    print(f"{Fore.YELLOW}   ⏹️  Stopped the stream early ({len(filt.text)} chars kept).")
+                    break
+        content = filt.finish()
+        if filt.scrubbed:
+            print(f"{Fore.YELLOW}   🧹 Scrubbed {filt.scrubbed} chars of 'Thinking'/'System' tokens while streaming.")
+        return content
+
+    def chat(self, system_prompt, user_content, temp=0.7, stream=None, on_token=None, stop_when=None):
         """
         Sends a chat request. Includes reasoning detection and
         extended timeouts for slow models.
+        stream (default: the controller's setting) reads the answer as it is generated;
+        on_token / stop_when are only used when streaming, see _stream_completion.
         """
+        if stream is None:
+            stream = self.stream
         model_id = self.get_active_model()
 
         payload = {
@@ -98,23 +305,11 @@ class LMStudioController:
         }
 
         try:
-            # We set a long timeout (600s) because Reasoning models 'think'
-            # for a long time before sending the first character.
-            res = requests.post(
-                f"{self.base_url}/chat/completions",
-                json=payload,
-                timeout=600
-            )
-
-            # Retry with generic ID if specific ID fails
-            if res.status_code == 400:
-                print(f"{Fore.YELLOW}⚠️  Retrying with generic 'local-model' ID...")
-                payload["model"] = "local-model"
-                res = requests.post(f"{self.base_url}/chat/completions", json=payload, timeout=600)
-
-            if res.status_code != 200:
-                raise Exception(f"LM Studio Error {res.status_code}: {res.text}")
+            if stream:
+                # Code fences / whitespace are still tidied by the Smart Detector
+                return self.detect_and_clean_reasoning(self._stream_completion(payload, on_token, stop_when))
 
+            res = self._post_completion(payload, stream=False)
             data = res.json()
             raw_response = data['choices'][0]['message']['content'].strip()
             print(raw_response)
@@ -137,6 +332,7 @@ class LMStudioController:
         Attempts to unload the model to free VRAM for the Audio Engine.
         (Requires LM Studio SDK to be installed in the environment)
         """
+        self.invalidate_model_cache()
         try:
             import lmstudio as lms
             lms.llm().unload()
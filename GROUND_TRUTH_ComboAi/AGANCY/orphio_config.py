@@ -39,12 +39,47 @@ class Config:
 
     # Network Configuration
     LM_STUDIO_URL: str = "http://localhost:1234/v1"
+    LLM_STREAMING: bool = True  # stream completions: live tokens, <think> dropped on the fly, early stop
 
     # Audio Engine Settings
     COOLFOOT_WAIT: float = 0.1
     SAMPLE_RATE: int = 48000
     FADE_OUT_DURATION: float = 0.2
 
+    # Codec windows reused across re-renders of the same seed (LRU, on disk). Only used when a render
+    # asks for it (render_audio_stage(reuse_windows=True), the studio's same-seed re-render): any
+    # change to the lyrics or tags changes HeartMuLa's frames from frame 0 and invalidates every window
+    WINDOW_CACHE_DIR: Path = ROOT_DIR / "GROUND_TRUTH_ComboAi" / ".codec_window_cache"
+    WINDOW_CACHE_MAX_GB: float = 4.0
+    # torch.compile the codec's fused activations (needs a working Inductor/C++ toolchain)
+    CODEC_COMPILE: bool = False
+
+    # Transcribe each render in-process and fill lyric_accuracy_score right away
+    AUDIT_AFTER_RENDER: bool = False
+    # The transcriptor stays loaded (in CPU RAM between audits) unless less host RAM than this is free
+    TRANSCRIPTOR_MIN_FREE_RAM_GB: float = 8.0
+
+    # Render daemon (orphio_render_daemon.py): while it runs, every engine queues its renders there
+    USE_RENDER_DAEMON: bool = True
+    RENDER_DAEMON_HOST: str = "127.0.0.1"
+    RENDER_DAEMON_PORT: int = 6011
+    RENDER_DAEMON_PROBE_SEC: float = 30.0  # how long an engine trusts its last "is a daemon running?" check
+    # Random per-install key, created on first use and readable by the current user only
+    RENDER_DAEMON_AUTHKEY_FILE: Path = Path.home() / ".orphio" / "render_daemon.key"
+    RENDER_DAEMON_KEEP_WEIGHTS: bool = True  # False: reload HeartMuLa/HeartCodec from disk for every job
+    RENDER_DAEMON_OFFLOAD_IDLE: bool = True  # park the weights in CPU RAM while the queue is empty (frees VRAM for LM Studio)
+
+    # Album pipeline scheduling (album_scheduler.py)
+    SCHEDULED_ALBUM_PIPELINE: bool = True
+    LLM_ON_GPU: bool = True  # False when LM Studio runs the model on the CPU: drafting then overlaps rendering
+    SCHEDULER_CPU_SLOTS: int = 2  # concurrent CPU tasks (mastering, CPU-hosted LLM)
+
+    # Album drafting concurrency: set to LM Studio's "parallel" slot count
+    LLM_PARALLEL_SLOTS: int = 1
+    # "pipelined": each song still follows the previous one's lyrics, its tagging overlaps the next song
+    # "parallel":  every song is written at once, with the album plan as its narrative context
+    DRAFT_MODE: str = "pipelined"
+
     # =========================================================================
     # RENDERING PARAMETER RANGES (NEW)
     # =========================================================================
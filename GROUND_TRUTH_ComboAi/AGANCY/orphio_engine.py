@@ -16,6 +16,8 @@ import sys
 import time
 import torch
 import gc
+import hashlib
+import json
 import re
 import os
 import random
@@ -45,12 +47,56 @@ except ImportError:
     pass
 
 
+ARTIFACT_SUFFIX = ".heart.safetensors"  # heartlib.heartcodec.artifact.ARTIFACT_SUFFIX
+
+
+def move_render(wav_path, dest_wav, ledger=None):
+    """
+    Moves a finished render (wav, ledger JSON and codec artifact) to dest_wav's folder and name.
+    render_artifact is resolved next to the wav, so the artifact has to travel with it; the
+    ledger file (and the in-memory ledger, if given) is updated to the artifact's new name.
+    Returns the destination of the ledger JSON.
+    """
+    wav_path, dest_wav = Path(wav_path), Path(dest_wav)
+    src_json, dest_json = wav_path.with_suffix('.json'), dest_wav.with_suffix('.json')
+    data = None
+    if src_json.exists():
+        with open(src_json, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    artifact_name = ledger.render_artifact if ledger is not None else (data or {}).get('render_artifact')
+
+    if wav_path.exists():
+        os.replace(wav_path, dest_wav)
+    new_artifact = None
+    if artifact_name and (wav_path.parent / artifact_name).exists():
+        new_artifact = f"{dest_wav.stem}{ARTIFACT_SUFFIX}"
+        os.replace(wav_path.parent / artifact_name, dest_wav.parent / new_artifact)
+    if ledger is not None:
+        ledger.render_artifact = new_artifact
+    if data is not None:
+        data['render_artifact'] = new_artifact
+        with open(dest_json, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        if src_json != dest_json:
+            os.remove(src_json)
+    return dest_json
+
+
 class OrphioEngine:
-    def __init__(self, log_callback=print):
+    def __init__(self, log_callback=print, keep_pipeline=False, token_callback=None):
         self.log = log_callback
-        self.lms = LMStudioController(conf.LM_STUDIO_URL)
+        # token_callback(text) receives lyrics as the LLM writes them (streaming mode)
+        self.token_callback = token_callback
+        self.lms = LMStudioController(conf.LM_STUDIO_URL, stream=conf.LLM_STREAMING)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.captured_audio = []
+        # keep_pipeline: the render daemon reuses one HeartMuLaGenPipeline for every song
+        self.keep_pipeline = keep_pipeline
+        self.pipeline = None
+        self.parked = False  # warm weights moved to CPU RAM, see park_pipeline
+        self.transcriptor = None  # loaded on the first audit, parked in CPU RAM between renders
+        self._daemon = None  # RenderClient of a reachable daemon, see _render_daemon
+        self._daemon_checked = None
 
     def free_memory(self):
         """Clears GPU cache and forces garbage collection."""
@@ -110,7 +156,7 @@ class OrphioEngine:
         self.log("🔗 Connecting to LM Studio...")
         ok, msg = self.lms.check_connection()
         if not ok: raise ConnectionError(msg)
-        lyrics = self.lms.chat(conf.PROMPT_WRITER, f"Topic: {topic}")
+        lyrics = self.lms.chat(conf.PROMPT_WRITER, f"Topic: {topic}", on_token=self.token_callback)
         lyrics = self._enforce_tag_schema(lyrics)
         tags_raw = self.lms.chat(conf.PROMPT_TAGGER, lyrics, temp=0.2)
         tags_list = self._clean_tags_list(tags_raw)
@@ -129,94 +175,331 @@ class OrphioEngine:
         )
 
         user_prompt = f"Style: {', '.join(tags_list)}\n\nLyrics:\n{current_lyrics}"
-        decorated_text = self.lms.chat(decorator_prompt, user_prompt, temp=0.7)
+        decorated_text = self.lms.chat(decorator_prompt, user_prompt, temp=0.7, on_token=self.token_callback)
         return self._enforce_tag_schema(decorated_text) if decorated_text else current_lyrics
 
-    def render_audio_stage(self, topic: str, lyrics: str, tags: list, duration_s: int, cfg: float, temp: float):
-        start_time = time.time()
-        self.log(f"🔊 Offloading LLM... Duration: {duration_s}s, CFG: {cfg}")
-        self.lms.unload_model()
-        self.free_memory()
-        time.sleep(conf.COOLFOOT_WAIT)
+    def _finish_audio(self, audio_np):
+        """Codec output -> normalized (Samples, Channels) float audio with a short fade out."""
+        # --- FIXED BROADCASTING LOGIC ---
+        audio_np = audio_np.squeeze()
+
+        # Ensure shape is (Samples, Channels) for consistent processing
+        if audio_np.ndim == 2 and audio_np.shape[0] < audio_np.shape[1]:
+            audio_np = audio_np.T
+
+        # Normalize
+        if np.abs(audio_np).max() > 0:
+            audio_np = audio_np / np.abs(audio_np).max() * 0.9
+
+        # Apply Fade Out (Safe for Stereo/Mono)
+        fade_len = int(conf.FADE_OUT_DURATION * conf.SAMPLE_RATE)
+        if fade_len < len(audio_np):
+            fade_ramp = np.linspace(1.0, 0.0, fade_len)
+            # If audio is stereo (N, 2), expand ramp to (N, 1) so it broadcasts
+            if audio_np.ndim == 2:
+                fade_ramp = fade_ramp[:, np.newaxis]
+            audio_np[-fade_len:] *= fade_ramp
+        return audio_np
+
+    def remaster_from_artifact(self, wav_path, num_steps=None, guidance_scale=None):
+        """
+        Re-decodes a finished render from its saved frames/latents (HeartCodec only, no HeartMuLa).
+        Writes <id>_remaster.wav next to the original and returns its path.
+        """
+        wav_path = Path(wav_path)
+        with open(wav_path.with_suffix('.json'), 'r') as f:
+            ledger = MasterLedger.model_validate_json(f.read())
+        if not ledger.render_artifact:
+            raise FileNotFoundError(f"No render artifact recorded for {wav_path.name}")
 
         if str(conf.SRC_DIR) not in sys.path:
             sys.path.append(str(conf.SRC_DIR))
+        from heartlib.heartcodec.modeling_heartcodec import HeartCodec
+
+        self.log(f"🎚️ Re-decoding {wav_path.name} (steps={num_steps}, guidance={guidance_scale})...")
+        codec = HeartCodec.from_pretrained_folded(
+            str(conf.CKPT_DIR / "HeartCodec-oss"), device_map=self.device, dtype=torch.float32
+        )
+        wav = codec.detokenize_from_artifact(
+            str(wav_path.parent / ledger.render_artifact),
+            num_steps=num_steps,
+            guidance_scale=guidance_scale,
+        )
+        del codec
+        self.free_memory()
 
+        audio_np = self._finish_audio(wav.to(torch.float32).cpu().numpy())
+        out_path = wav_path.with_name(f"{wav_path.stem}_remaster.wav")
+        scipy.io.wavfile.write(str(out_path), conf.SAMPLE_RATE, (audio_np * 32767).astype(np.int16))
+        return str(out_path)
+
+    @staticmethod
+    def _file_sha256(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _clean_lyrics(text):
+        # Same normalisation as GT_02_Transcription_Validator.clean()
+        if not text: return ""
+        text = re.sub(r'\[.*?\]', '', text)
+        return re.sub(r'[^\w\s]', '', text).lower().replace('\n', ' ').strip()
+
+    def _lyric_audit(self, lyrics):
+        """post_render hook: transcribes the rendered tensor and scores it against the lyrics."""
+
+        def audit(wav, sample_rate):
+            from jiwer import wer
+
+            try:
+                transcriptor = self._get_transcriptor()
+                result = transcriptor.transcribe_tensor(wav, sample_rate, task="transcribe")
+            except Exception as e:
+                # The song is still good; GT_02 can audit it later
+                self.log(f"⚠️ Post-render audit skipped: {e}")
+                return None
+            finally:
+                # Whisper must not sit in VRAM during the next HeartMuLa render
+                self._park_transcriptor()
+            target = self._clean_lyrics(lyrics)
+            transcript = self._clean_lyrics(result.get('text', ''))
+            accuracy = max(0, 1 - wer(target, transcript)) if target and transcript else 0.0
+            return {
+                'lyric_accuracy_score': round(accuracy, 4),
+                'raw_transcript': transcript,
+                'audit_status': "AUDITED",
+            }
+
+        return audit
+
+    def _get_transcriptor(self):
+        """The engine's HeartTranscriptor, loaded once and moved back from CPU RAM for each audit."""
+        if self.transcriptor is None:
+            from heartlib import HeartTranscriptorPipeline
+
+            self.log("🕵️ Loading HeartTranscriptor for post-render audits...")
+            self.transcriptor = HeartTranscriptorPipeline.from_pretrained(
+                str(conf.CKPT_DIR), device=self.device, dtype=torch.float16
+            )
+        elif self.transcriptor.device != self.device:
+            # The ASR pipeline moves its inputs to .device, so it has to follow the weights
+            self.transcriptor.model.to(self.device)
+            self.transcriptor.device = self.device
+        return self.transcriptor
+
+    def _park_transcriptor(self):
+        """Moves the transcriptor to CPU RAM, or drops it when the host is short of RAM."""
+        transcriptor = self.transcriptor
+        if transcriptor is None:
+            return
+        if self.device.type != "cpu":
+            transcriptor.model.to("cpu")
+            transcriptor.device = torch.device("cpu")
+        if self._low_host_memory():
+            self.log("🧹 Host RAM is low, releasing HeartTranscriptor.")
+            self.release_transcriptor()
+        else:
+            self.free_memory()
+
+    def _low_host_memory(self):
         try:
-            import heartlib.pipelines.music_generation as mg
-            from heartlib import HeartMuLaGenPipeline
-
-            def patched_resolve_paths(pretrained_path, version):
-                return (
-                    str(conf.CKPT_DIR / "HeartMuLa-oss-3B"),
-                    str(conf.CKPT_DIR / "HeartCodec-oss"),
-                    str(conf.CKPT_DIR / "tokenizer.json"),
-                    str(conf.CKPT_DIR / "gen_config.json")
-                )
+            import psutil
+        except ImportError:
+            return False
+        return psutil.virtual_memory().available < conf.TRANSCRIPTOR_MIN_FREE_RAM_GB * 1024 ** 3
+
+    def release_transcriptor(self):
+        """Frees the transcriptor; the next audit loads it from disk again."""
+        if self.transcriptor is None:
+            return
+        self.transcriptor = None
+        self.free_memory()
+
+    def _render_daemon(self):
+        """A RenderClient when a daemon is running, probed at most every RENDER_DAEMON_PROBE_SEC."""
+        from orphio_render_daemon import RenderClient
+
+        now = time.monotonic()
+        if self._daemon_checked is not None and now - self._daemon_checked < conf.RENDER_DAEMON_PROBE_SEC:
+            return self._daemon
+        client = RenderClient()
+        status = client.status()
+        if status is None and client.error:
+            self.log(f"⚠️ Render daemon unavailable ({client.error}), rendering in-process.")
+        self._daemon = client if status is not None else None
+        self._daemon_checked = now
+        return self._daemon
+
+    def render_queue_depth(self):
+        """Jobs waiting in the render daemon, or None when no daemon is running."""
+        from orphio_render_daemon import RenderClient
+
+        status = RenderClient().status()
+        return status["queue_depth"] if status else None
+
+    def _pipeline_models(self):
+        pipeline = self.pipeline
+        return [(model, device) for model, device in ((pipeline._mula, pipeline.mula_device),
+                                                      (pipeline._codec, pipeline.codec_device))
+                if model is not None]
+
+    def park_pipeline(self):
+        """Moves the warm pipeline's weights to CPU RAM; the next render moves them back."""
+        if self.pipeline is None or self.parked or self.device.type == "cpu":
+            return
+        for model, _ in self._pipeline_models():
+            model.to("cpu")
+        self.parked = True
+        self.free_memory()
+        self.log("🅿️ Render weights parked in CPU RAM until the next job.")
+
+    def _get_pipeline(self):
+        """Builds the HeartMuLa pipeline, or returns the warm one when keep_pipeline is set."""
+        if self.pipeline is not None:
+            if self.parked:
+                # A host-to-device copy, far cheaper than reading the checkpoints again
+                for model, device in self._pipeline_models():
+                    model.to(device)
+                self.parked = False
+            return self.pipeline
+
+        if str(conf.SRC_DIR) not in sys.path:
+            sys.path.append(str(conf.SRC_DIR))
+        import heartlib.pipelines.music_generation as mg
+        from heartlib import HeartMuLaGenPipeline
+
+        def patched_resolve_paths(pretrained_path, version):
+            return (
+                str(conf.CKPT_DIR / "HeartMuLa-oss-3B"),
+                str(conf.CKPT_DIR / "HeartCodec-oss"),
+                str(conf.CKPT_DIR / "tokenizer.json"),
+                str(conf.CKPT_DIR / "gen_config.json")
+            )
+
+        mg._resolve_paths = patched_resolve_paths
+
+        pipeline = HeartMuLaGenPipeline.from_pretrained(
+            pretrained_path=str(conf.CKPT_DIR),
+            device=self.device,
+            dtype={"mula": torch.bfloat16, "codec": torch.float32},
+            version="IGNORE",
+            lazy_load=not (self.keep_pipeline and conf.RENDER_DAEMON_KEEP_WEIGHTS),
+            compile_codec=conf.CODEC_COMPILE
+        )
+        if self.keep_pipeline:
+            self.pipeline = pipeline
+        return pipeline
+
+    def render_audio_stage(self, topic: str, lyrics: str, tags: list, duration_s: int, cfg: float, temp: float,
+                           seed=None, progress_callback=None, unload_llm=True, reuse_windows=False):
+        """
+        Renders one song and writes its wav + ledger. When a render daemon is running (and
+        USE_RENDER_DAEMON is set) the job is queued there instead, so the warm pipeline is reused.
+        progress_callback(frames_done, frames_total) follows HeartMuLa frame generation.
+        unload_llm=False leaves LM Studio's model loaded (it runs on the CPU, or the caller knows
+        the GPU is free), see album_scheduler.py.
+        reuse_windows=True looks up / stores decoded codec windows in the on-disk WindowCache. Only
+        worth it when re-rendering with the same seed, lyrics and tags: any lyric or tag change
+        alters HeartMuLa's frames from the start, so no window can match.
+        """
+        if conf.USE_RENDER_DAEMON and not self.keep_pipeline:
+            from orphio_render_daemon import DaemonUnavailable
+
+            client = self._render_daemon()
+            if client is not None:
+                try:
+                    return client.render(topic, lyrics, tags, duration_s, cfg, temp, seed=seed,
+                                         log=self.log, progress_callback=progress_callback,
+                                         unload_llm=unload_llm, reuse_windows=reuse_windows)
+                except DaemonUnavailable as e:
+                    self.log(f"⚠️ Render daemon unavailable ({e}), rendering in-process.")
+                    self._daemon, self._daemon_checked = None, time.monotonic()
+
+        start_time = time.time()
+        if unload_llm:
+            self.log(f"🔊 Offloading LLM... Duration: {duration_s}s, CFG: {cfg}")
+            self.lms.unload_model()
+        self.free_memory()
+        time.sleep(conf.COOLFOOT_WAIT)
 
-            mg._resolve_paths = patched_resolve_paths
+        original_save = torchaudio.save
+        pending_artifact = None
+        try:
+            pipeline = self._get_pipeline()
 
             def _interceptor(uri, src, sr, **kwargs):
                 self.captured_audio.append(src.detach().cpu())
 
-            original_save = torchaudio.save
             torchaudio.save = _interceptor
             self.captured_audio = []
 
-            pipeline = HeartMuLaGenPipeline.from_pretrained(
-                pretrained_path=str(conf.CKPT_DIR),
-                device=self.device,
-                dtype={"mula": torch.bfloat16, "codec": torch.float32},
-                version="IGNORE",
-                lazy_load=True
-            )
+            from heartlib.heartcodec.window_cache import WindowCache
 
-            seed = random.randint(0, 2 ** 32 - 1)
+            if seed is None:
+                seed = random.randint(0, 2 ** 32 - 1)
             torch.manual_seed(seed)
+            # ~12 MB per window: only cached when the caller expects a same-seed re-render
+            window_cache = None
+            if reuse_windows:
+                window_cache = WindowCache(conf.WINDOW_CACHE_DIR, int(conf.WINDOW_CACHE_MAX_GB * 1024 ** 3))
             self.log(f"🚀 Rendering Audio (Seed: {seed})...")
+            pending_artifact = conf.OUTPUT_DIR / f"_render_{seed}{ARTIFACT_SUFFIX}"
+
+            total_frames = duration_s * 1000 // 80
 
-            with torch.inference_mode():
-                pipeline(
+            def on_span(span):
+                if progress_callback is not None and span["name"] == "frame":
+                    progress_callback(span["index"] + 1, total_frames)
+
+            with torch.inference_mode(), pipeline.profile(callback=on_span) as profiler:
+                audit = pipeline(
                     inputs={"lyrics": lyrics, "tags": ", ".join(tags)},
                     max_audio_length_ms=duration_s * 1000,
                     cfg_scale=cfg,
-                    temperature=temp
+                    temperature=temp,
+                    artifact_path=str(pending_artifact),
+                    window_cache=window_cache,
+                    codec_seed=seed,
+                    post_render=self._lyric_audit(lyrics) if conf.AUDIT_AFTER_RENDER else None
                 )
+            render_profile = profiler.report()
+            if window_cache is not None and window_cache.hits:
+                self.log(f"♻️ Reused {window_cache.hits} cached codec window(s)")
 
             torchaudio.save = original_save
-            del pipeline
+            del pipeline  # the warm pipeline stays referenced by self.pipeline
             self.free_memory()
 
             if not self.captured_audio:
                 raise RuntimeError("Audio pipeline finished but no audio was captured.")
 
-            # --- FIXED BROADCASTING LOGIC ---
-            audio_np = self.captured_audio[0].numpy().squeeze()
-
-            # Ensure shape is (Samples, Channels) for consistent processing
-            if audio_np.ndim == 2 and audio_np.shape[0] < audio_np.shape[1]:
-                audio_np = audio_np.T
-
-            # Normalize
-            if np.abs(audio_np).max() > 0:
-                audio_np = audio_np / np.abs(audio_np).max() * 0.9
-
-            # Apply Fade Out (Safe for Stereo/Mono)
-            fade_len = int(conf.FADE_OUT_DURATION * conf.SAMPLE_RATE)
-            if fade_len < len(audio_np):
-                fade_ramp = np.linspace(1.0, 0.0, fade_len)
-                # If audio is stereo (N, 2), expand ramp to (N, 1) so it broadcasts
-                if audio_np.ndim == 2:
-                    fade_ramp = fade_ramp[:, np.newaxis]
-                audio_np[-fade_len:] *= fade_ramp
+            audio_np = self._finish_audio(self.captured_audio[0].numpy())
 
             # Ledger
             ledger = MasterLedger.create_new(topic, lyrics, tags, seed, duration_s, time.time() - start_time,
                                              conf.ROOT_DIR)
+            ledger.automated_metrics.render_profile = render_profile
+            if audit:
+                for key, value in audit.items():
+                    setattr(ledger.automated_metrics, key, value)
+                self.log(f"🕵️ Lyric accuracy: {audit['lyric_accuracy_score']:.2%}")
             wav_path = conf.OUTPUT_DIR / f"{ledger.provenance.id}.wav"
 
+            # Keep the frames/latents so codec settings can be changed without re-rendering
+            if pending_artifact.exists():
+                artifact_path = conf.OUTPUT_DIR / f"{ledger.provenance.id}{ARTIFACT_SUFFIX}"
+                os.replace(pending_artifact, artifact_path)
+                pending_artifact = artifact_path  # still removed if saving fails below
+                ledger.render_artifact = artifact_path.name
+
             # Save
             scipy.io.wavfile.write(str(wav_path), conf.SAMPLE_RATE, (audio_np * 32767).astype(np.int16))
+            if audit:
+                # Lets GT_02 recognise this audio as audited
+                ledger.automated_metrics.audio_sha256 = self._file_sha256(wav_path)
             with open(wav_path.with_suffix('.json'), 'w') as f:
                 f.write(ledger.model_dump_json(indent=4))
 
@@ -224,4 +507,9 @@ class OrphioEngine:
 
         except Exception as e:
             self.log(f"❌ Error: {e}")
-            raise e
\ No newline at end of file
+            # A failed render must not leave its half-written artifact behind
+            if pending_artifact is not None and pending_artifact.exists():
+                pending_artifact.unlink()
+            raise e
+        finally:
+            torchaudio.save = original_save
\ No newline at end of file
@@ -0,0 +1,274 @@
+# === AUTO-PATCHED: DLL Fix Import (DO NOT REMOVE) ===
+try:
+    import windows_dll_fix
+except ImportError:
+    import os, sys
+    os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+    if sys.platform == "win32":
+        try:
+            os.add_dll_directory(r"C:\Windows\System32")
+        except:
+            pass
+# === END AUTO-PATCH ===
+
+# AGANCY/orphio_render_daemon.py
+"""
+RENDER DAEMON
+=============
+A long-lived worker that owns one warm HeartMuLa pipeline and renders queued jobs in order.
+
+    python orphio_render_daemon.py            # start it (leave it running)
+    python orphio_render_daemon.py --status   # queue depth / current job
+
+While it runs, OrphioEngine.render_audio_stage in the GUIs and CLIs (Blueprint_Executor,
+IndividualSongRenderer, the studios) sends its job here over a local socket and streams the
+daemon's log and frame progress back, so heartlib is imported, patched and loaded once instead of
+once per song. Without a daemon they render in-process as before.
+
+The weights stay resident between jobs; when the queue runs empty they are parked in CPU RAM so
+LM Studio can use the VRAM (RENDER_DAEMON_KEEP_WEIGHTS / RENDER_DAEMON_OFFLOAD_IDLE). Clients
+authenticate with a random key from RENDER_DAEMON_AUTHKEY_FILE, created on first use.
+"""
+
+import itertools
+import os
+import queue
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from orphio_config import conf
+
+_STOP = object()
+
+
+class DaemonUnavailable(ConnectionError):
+    """The render daemon could not be reached or rejected our key; nothing was queued."""
+
+
+def daemon_authkey(path=None):
+    """
+    The key both ends authenticate with. Generated on first use and stored where only the
+    current user can read it: the connection carries pickles, so whoever knows the key can run
+    code in the daemon.
+    """
+    path = path or conf.RENDER_DAEMON_AUTHKEY_FILE
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    key = secrets.token_hex(32).encode()
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # another process created it first
+        with open(path, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class _Job:
+    """One queued render: its parameters and the client connection its events go to."""
+
+    def __init__(self, job_id, params, conn):
+        self.id = job_id
+        self.params = params
+        self.conn = conn
+        self.connected = True
+
+    def send(self, event):
+        # A client that went away does not stop the render; the wav + ledger still land on disk
+        if not self.connected:
+            return
+        try:
+            self.conn.send(event)
+        except (EOFError, OSError):
+            self.connected = False
+
+    def close(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class RenderDaemon:
+    def __init__(self, address=None, authkey=None):
+        from orphio_engine import OrphioEngine
+
+        self.address = address or (conf.RENDER_DAEMON_HOST, conf.RENDER_DAEMON_PORT)
+        self.authkey = authkey or daemon_authkey()
+        self.jobs = queue.Queue()
+        self.current = None
+        self._ids = itertools.count(1)
+        self.engine = OrphioEngine(log_callback=self._log, keep_pipeline=True)
+
+    def _log(self, message):
+        print(message)
+        job = self.current
+        if job is not None:
+            job.send(("log", message))
+
+    def status(self):
+        job = self.current
+        return {
+            "queue_depth": self.jobs.qsize(),
+            "busy": job is not None,
+            "current": job.params.get("topic") if job is not None else None,
+            "warm": self.engine.pipeline is not None,
+            "parked": self.engine.parked,
+        }
+
+    def _handle(self, conn):
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            return
+        op = request.get("op")
+        if op == "render":
+            job = _Job(next(self._ids), request["params"], conn)
+            self.jobs.put(job)
+            # the connection stays open: the worker streams this job's events over it
+            job.send(("queued", job.id, self.jobs.qsize() - 1 + (self.current is not None)))
+            return
+        if op == "status":
+            conn.send(self.status())
+        elif op == "shutdown":
+            self.jobs.put(_STOP)
+            conn.send({"stopping": True})
+        conn.close()
+
+    def _accept_loop(self, listener):
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError as e:
+                # a client with a stale key (or something else on the port): refuse it, keep serving
+                print(f"⚠️ Rejected a connection: {e}")
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def serve_forever(self):
+        listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._accept_loop, args=(listener,), daemon=True).start()
+        print(f"🎛️ Render daemon listening on {self.address[0]}:{self.address[1]}")
+        try:
+            # Renders run one at a time on this thread: the GPU is the shared resource
+            while (job := self.jobs.get()) is not _STOP:
+                self.current = job
+                try:
+                    wav_path, ledger = self.engine.render_audio_stage(
+                        **job.params,
+                        progress_callback=lambda done, total: job.send(("progress", done, total))
+                    )
+                    job.send(("done", wav_path, ledger.model_dump_json()))
+                except Exception as e:
+                    job.send(("error", str(e)))
+                finally:
+                    self.current = None
+                    job.close()
+                if conf.RENDER_DAEMON_OFFLOAD_IDLE and self.jobs.empty():
+                    # Nothing queued: give the VRAM back (to LM Studio) until the next job
+                    self.engine.park_pipeline()
+        finally:
+            listener.close()
+            print("🛑 Render daemon stopped.")
+
+
+class RenderClient:
+    """Thin client for RenderDaemon; render() has the same result as OrphioEngine.render_audio_stage."""
+
+    def __init__(self, address=None, authkey=None):
+        self.address = address or (conf.RENDER_DAEMON_HOST, conf.RENDER_DAEMON_PORT)
+        self.authkey = authkey or daemon_authkey()
+        self.error = None  # why the last status() probe failed, when it was not just "no daemon"
+
+    def _request(self, request):
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise DaemonUnavailable(str(e) or type(e).__name__) from e
+        conn.send(request)
+        return conn
+
+    def status(self):
+        """{'queue_depth', 'busy', 'current', 'warm', 'parked'}, or None when no daemon is listening."""
+        self.error = None
+        try:
+            with self._request({"op": "status"}) as conn:
+                return conn.recv()
+        except DaemonUnavailable as e:
+            if isinstance(e.__cause__, AuthenticationError):
+                self.error = f"authentication failed, check {conf.RENDER_DAEMON_AUTHKEY_FILE}"
+            return None
+        except (EOFError, OSError):
+            return None
+
+    def queue_depth(self):
+        status = self.status()
+        return status["queue_depth"] if status else None
+
+    def shutdown(self):
+        """Stops the daemon once the jobs already queued are rendered."""
+        with self._request({"op": "shutdown"}) as conn:
+            return conn.recv()
+
+    def render(self, topic, lyrics, tags, duration_s, cfg, temp, seed=None, log=print,
+               progress_callback=None, unload_llm=True, reuse_windows=False):
+        """
+        Queues a render and blocks until it finishes, relaying the daemon's log and progress.
+        Raises DaemonUnavailable if the daemon cannot be reached (the job was not queued).
+        """
+        from orphio_schema import MasterLedger
+
+        params = {"topic": topic, "lyrics": lyrics, "tags": list(tags), "duration_s": duration_s,
+                  "cfg": cfg, "temp": temp, "seed": seed, "unload_llm": unload_llm,
+                  "reuse_windows": reuse_windows}
+        with self._request({"op": "render", "params": params}) as conn:
+            while True:
+                try:
+                    event = conn.recv()
+                except EOFError:
+                    raise RuntimeError("Render daemon closed the connection before the song finished.")
+                kind = event[0]
+                if kind == "queued":
+                    log(f"📥 Queued on render daemon as job {event[1]} ({event[2]} ahead)")
+                elif kind == "log":
+                    log(event[1])
+                elif kind == "progress":
+                    if progress_callback is not None:
+                        progress_callback(event[1], event[2])
+                elif kind == "done":
+                    return event[1], MasterLedger.model_validate_json(event[2])
+                elif kind == "error":
+                    raise RuntimeError(event[1])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="print the running daemon's queue and exit")
+    parser.add_argument("--stop", action="store_true", help="stop the running daemon after its queue")
+    args = parser.parse_args()
+
+    if args.status or args.stop:
+        client = RenderClient()
+        status = client.status()
+        if status is None:
+            print("No render daemon running.")
+        elif args.stop:
+            client.shutdown()
+            print(f"Stopping after {status['queue_depth']} queued job(s).")
+        else:
+            print(status)
+    else:
+        RenderDaemon().serve_forever()
@@ -37,6 +37,10 @@ class AutomatedMetrics(BaseModel):
     audit_status: str = "PENDING"
     lyric_accuracy_score: Optional[float] = None
     raw_transcript: Optional[str] = None
+    # sha256 of the wav the transcript belongs to; GT_02 skips ledgers whose audio still matches
+    audio_sha256: Optional[str] = None
+    # Per-stage timings and memory high-water marks of the render (Profiler.report())
+    render_profile: Optional[Dict[str, Any]] = None
 
 class HumanEvaluation(BaseModel):
     # 1. JUDGMENT: Overall score (1-10)
@@ -66,6 +70,8 @@ class MasterLedger(BaseModel):
     automated_metrics: AutomatedMetrics
     human_evaluation: HumanEvaluation
     status: str = "PRODUCED"
+    # Token frames + codec latents saved next to the wav (file name, same folder)
+    render_artifact: Optional[str] = None
 
     @classmethod
     def create_new(cls, topic, lyrics, tags, seed, duration, gen_time, root_path):
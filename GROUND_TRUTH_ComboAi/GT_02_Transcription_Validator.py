@@ -3,6 +3,9 @@ import sys
 import json
 import torch
 import re
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from jiwer import wer
 
@@ -36,6 +39,11 @@ except ImportError as e:
     sys.exit(1)
 
 
+AUDIT_INDEX = ROOT_DIR / "GROUND_TRUTH_ComboAi" / "audit_index.json"
+# Bump when clean() or the transcription settings change, to re-audit everything
+AUDIT_VERSION = 1
+
+
 def clean(text):
     if not text: return ""
     # Remove text inside brackets [Intro], [Chorus], etc.
@@ -44,27 +52,8 @@ def clean(text):
     return re.sub(r'[^\w\s]', '', text).lower().replace('\n', ' ').strip()
 
 
-def audit_system():
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"🕵️ LOADING AUDITOR (HeartTranscriptor)...")
-    print(f"📂 Using CKPT_DIR: {CKPT_DIR}")
-
-    # The pipeline expects the PARENT directory of HeartTranscriptor-oss
-    try:
-        model = HeartTranscriptorPipeline.from_pretrained(
-            str(CKPT_DIR),
-            device=device,
-            dtype=torch.float16
-        )
-    except Exception as e:
-        print(f"❌ FAILED TO LOAD TRANSCRIPTOR: {e}")
-        print(f"💡 Make sure {CKPT_DIR}/HeartTranscriptor-oss exists and contains safetensors.")
-        return
-
-    results_log = []
-    # Path to where your generated songs are
-    search_dirs = [ROOT_DIR / "GROUND_TRUTH_ComboAi" / "outputSongs_ComboAi"]
-
+def collect_jobs(search_dirs):
+    """Yields (json_path, ledger, wav_path, target_lyrics) for every auditable ledger."""
     for folder in search_dirs:
         if not folder.exists():
             print(f"⚠️ Folder not found: {folder}")
@@ -77,55 +66,248 @@ def audit_system():
             try:
                 with open(json_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
+            except Exception as e:
+                print(f"   ⚠️ Error reading {json_path.name}: {e}")
+                continue
 
-                if isinstance(data, list): data = data[0]
+            if isinstance(data, list): data = data[0]
 
-                wav_path = json_path.with_suffix('.wav')
-                if not wav_path.exists(): continue
+            wav_path = json_path.with_suffix('.wav')
+            if not wav_path.exists(): continue
 
-                print(f"📝 Auditing: {wav_path.name}")
+            # Extract lyrics from your specific JSON schema
+            config = data.get('configuration', {}).get('input_prompt', {})
+            target_lyrics = clean(config.get('lyrics', ''))
 
-                # Extract lyrics from your specific JSON schema
-                config = data.get('configuration', {}).get('input_prompt', {})
-                target_lyrics = clean(config.get('lyrics', ''))
+            if not target_lyrics:
+                print(f"   ⚠️ No lyrics found in ledger for {json_path.name}")
+                continue
 
-                if not target_lyrics:
-                    print(f"   ⚠️ No lyrics found in ledger for {json_path.name}")
-                    continue
+            yield json_path, data, wav_path, target_lyrics
 
-                with torch.no_grad():
-                    res = model(str(wav_path), task="transcribe")
-                    transcript = clean(res.get('text', ''))
 
-                # Calculate Accuracy via Word Error Rate
-                if target_lyrics and transcript:
-                    error_rate = wer(target_lyrics, transcript)
-                    accuracy = max(0, 1 - error_rate)
-                else:
-                    accuracy = 0.0
+def atomic_write_json(path, data):
+    """Writes JSON to a temp file and swaps it in, so a crash never leaves a half-written ledger."""
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def transcriptor_version(vocal_gating=False):
+    """Fingerprint of the transcriptor checkpoint (config + weight files) and the audit code."""
+    digest = hashlib.sha256(f"audit-v{AUDIT_VERSION}-gate{int(vocal_gating)}".encode())
+    model_dir = CKPT_DIR / "HeartTranscriptor-oss"
+    for path in sorted(model_dir.glob("*")) if model_dir.exists() else []:
+        if path.suffix == ".json":
+            digest.update(path.read_bytes())
+        elif path.is_file():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+class AuditIndex:
+    """
+    wav content hash + transcriptor version -> transcript, kept in audit_index.json.
+    File hashes are cached by (size, mtime) so unchanged wavs are not re-read.
+    """
+
+    def __init__(self, path, version):
+        self.path = Path(path)
+        self.version = version
+        self.data = {"files": {}, "transcripts": {}}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable audit index ({e}), starting fresh.")
+
+    def content_hash(self, wav_path):
+        stat = wav_path.stat()
+        cached = self.data["files"].get(str(wav_path))
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["hash"]
+        digest = hashlib.sha256()
+        with open(wav_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.data["files"][str(wav_path)] = {
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()
+        }
+        return digest.hexdigest()
+
+    def _key(self, wav_path):
+        return f"{self.content_hash(wav_path)}:{self.version}"
+
+    def get(self, wav_path):
+        return self.data["transcripts"].get(self._key(wav_path))
+
+    def put(self, wav_path, transcript):
+        self.data["transcripts"][self._key(wav_path)] = transcript
+
+    def save(self):
+        atomic_write_json(self.path, self.data)
+
 
-                results_log.append({
-                    "file": wav_path.name,
-                    "accuracy": round(accuracy, 4),
-                    "match": "PASS" if accuracy > 0.75 else "FAIL",
-                    "timestamp": data.get('provenance', {}).get('timestamp', 'unknown')
-                })
+def ledger_transcript(data, audio_hash):
+    """The transcript a ledger already carries (e.g. from the post-render audit), if it belongs to this audio."""
+    metrics = data.get('automated_metrics', {})
+    if metrics.get('audit_status') != "AUDITED" or metrics.get('audio_sha256') != audio_hash:
+        return None
+    return metrics.get('raw_transcript')
 
-                # Update the JSON file with the score (Injection)
-                data['automated_metrics']['lyric_accuracy_score'] = round(accuracy, 4)
-                data['automated_metrics']['raw_transcript'] = transcript
-                data['automated_metrics']['audit_status'] = "AUDITED"
 
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4)
+def load_audio(wav_path, sampling_rate):
+    """Decodes a wav to mono float32 at the transcriptor's sampling rate (runs in worker threads)."""
+    import torchaudio
 
+    wav, sr = torchaudio.load(str(wav_path))
+    wav = wav.mean(0)
+    if sr != sampling_rate:
+        wav = torchaudio.functional.resample(wav, sr, sampling_rate)
+    return {"raw": wav.numpy(), "sampling_rate": sampling_rate}
+
+
+def prefetch_audio(jobs, sampling_rate, num_workers):
+    """Decodes the audio of upcoming jobs in a thread pool while the GPU transcribes."""
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        pending = deque()
+        jobs = iter(jobs)
+        for job in jobs:
+            pending.append((job, pool.submit(load_audio, job[2], sampling_rate)))
+            if len(pending) >= 2 * num_workers:
+                break
+        while pending:
+            job, future = pending.popleft()
+            nxt = next(jobs, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(load_audio, nxt[2], sampling_rate)))
+            try:
+                yield job, future.result()
+            except Exception as e:
+                print(f"   ⚠️ Could not decode {job[2].name}: {e}")
+
+
+def write_result(json_path, data, wav_path, target_lyrics, transcript, audio_hash=None):
+    # Calculate Accuracy via Word Error Rate
+    if target_lyrics and transcript:
+        error_rate = wer(target_lyrics, transcript)
+        accuracy = max(0, 1 - error_rate)
+    else:
+        accuracy = 0.0
+
+    # Update the JSON file with the score (Injection), only if something changed
+    metrics = data['automated_metrics']
+    update = {
+        'lyric_accuracy_score': round(accuracy, 4),
+        'raw_transcript': transcript,
+        'audit_status': "AUDITED",
+        'audio_sha256': audio_hash,
+    }
+    if any(metrics.get(k) != v for k, v in update.items()):
+        metrics.update(update)
+        atomic_write_json(json_path, data)
+
+    return {
+        "file": wav_path.name,
+        "accuracy": round(accuracy, 4),
+        "match": "PASS" if accuracy > 0.75 else "FAIL",
+        "timestamp": data.get('provenance', {}).get('timestamp', 'unknown')
+    }
+
+
+def load_transcriptor():
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    print(f"🕵️ LOADING AUDITOR (HeartTranscriptor)...")
+    print(f"📂 Using CKPT_DIR: {CKPT_DIR}")
+
+    # The pipeline expects the PARENT directory of HeartTranscriptor-oss
+    try:
+        return HeartTranscriptorPipeline.from_pretrained(
+            str(CKPT_DIR),
+            device=device,
+            dtype=torch.float16
+        )
+    except Exception as e:
+        print(f"❌ FAILED TO LOAD TRANSCRIPTOR: {e}")
+        print(f"💡 Make sure {CKPT_DIR}/HeartTranscriptor-oss exists and contains safetensors.")
+        return None
+
+
+def audit_system(batch_files=8, num_workers=4, full=False, vocal_gating=False):
+    results_log = []
+    # Path to where your generated songs are
+    search_dirs = [ROOT_DIR / "GROUND_TRUTH_ComboAi" / "outputSongs_ComboAi"]
+    index = AuditIndex(AUDIT_INDEX, transcriptor_version(vocal_gating))
+
+    # Songs whose audio was already transcribed by this transcriptor (here or at render time)
+    # only get re-scored
+    todo = []
+    for job in collect_jobs(search_dirs):
+        json_path, data, wav_path, _ = job
+        try:
+            transcript = None
+            if not full:
+                audio_hash = index.content_hash(wav_path)
+                transcript = index.get(wav_path)
+                if transcript is None:
+                    transcript = ledger_transcript(data, audio_hash)
+                    if transcript is not None:
+                        index.put(wav_path, transcript)
+            if transcript is None:
+                todo.append(job)
+            else:
+                results_log.append(write_result(*job, transcript, audio_hash))
+        except Exception as e:
+            print(f"   ⚠️ Error processing {json_path.name}: {e}")
+    index.save()
+    print(f"♻️ {len(results_log)} songs unchanged since their last audit, {len(todo)} to transcribe.")
+
+    model = load_transcriptor() if todo else None
+    if todo and model is None:
+        return
+    sampling_rate = model.feature_extractor.sampling_rate if model else 16000
+
+    def transcribe_batch(batch):
+        # One pipeline call per batch: the 30 s chunks of all files share Whisper batches
+        print(f"📝 Auditing: {', '.join(job[2].name for job, _ in batch)}")
+        try:
+            with torch.no_grad():
+                audios = [audio for _, audio in batch]
+                if vocal_gating:
+                    # Only the voiced regions of each song are sent to Whisper
+                    raws = [audio["raw"] for audio in audios]
+                    outputs = model.transcribe_voiced(raws, sampling_rate, task="transcribe")
+                else:
+                    outputs = model(audios, task="transcribe")
+        except Exception as e:
+            print(f"   ⚠️ Error transcribing batch: {e}")
+            return
+        # Results are written back as soon as their batch completes
+        for (job, _), res in zip(batch, outputs):
+            json_path = job[0]
+            try:
+                transcript = clean(res.get('text', ''))
+                results_log.append(write_result(*job, transcript, index.content_hash(job[2])))
+                index.put(job[2], transcript)
             except Exception as e:
                 print(f"   ⚠️ Error processing {json_path.name}: {e}")
+        index.save()
+
+    batch = []
+    for job, audio in prefetch_audio(todo, sampling_rate, num_workers):
+        batch.append((job, audio))
+        if len(batch) == batch_files:
+            transcribe_batch(batch)
+            batch = []
+    if batch:
+        transcribe_batch(batch)
 
     # Save summary report
     report_path = ROOT_DIR / "GROUND_TRUTH_ComboAi" / "system_accuracy_report.json"
-    with open(report_path, 'w') as f:
-        json.dump(results_log, f, indent=4)
+    atomic_write_json(report_path, results_log)
 
     print(f"\n📊 Audit Complete.")
     print(f"✅ Updated {len(results_log)} ledgers with accuracy scores.")
@@ -133,4 +315,13 @@ def audit_system():
 
 
 if __name__ == "__main__":
-    audit_system()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_files", type=int, default=8, help="songs per transcription call")
+    parser.add_argument("--workers", type=int, default=4, help="audio decode threads")
+    parser.add_argument("--full", action="store_true", help="ignore the audit index and re-transcribe everything")
+    parser.add_argument("--vocal_gating", action="store_true", help="skip silent / instrumental-only sections")
+    args = parser.parse_args()
+    audit_system(batch_files=args.batch_files, num_workers=args.workers, full=args.full,
+                 vocal_gating=args.vocal_gating)
@@ -0,0 +1,219 @@
+import re
+import json
+import numpy as np
+from pathlib import Path
+
+# Per-section lyric accuracy for the whole vault in one pass.
+# Lyrics are split on the [SECTION] tags OrphioEngine._enforce_tag_schema guarantees, each ledger's
+# raw_transcript (written by GT_02 or the post-render audit) is aligned to the lyric words with a
+# banded edit-distance DP run over all ledgers at once, and every alignment error is charged to
+# the section of the lyric word it sits on. Output is one row per (song, section), column-stored.
+
+
+def find_project_root():
+    """Finds the main project directory containing the 'ckpt' folder."""
+    current = Path(__file__).resolve()
+    for parent in current.parents:
+        if (parent / "ckpt").exists():
+            return parent
+    return current.parent
+
+
+ROOT_DIR = find_project_root()
+VAULT_DIR = ROOT_DIR / "GROUND_TRUTH_ComboAi" / "outputSongs_ComboAi"
+METRICS_FILE = ROOT_DIR / "GROUND_TRUTH_ComboAi" / "section_accuracy.npz"
+
+TAG_RE = re.compile(r'\[\s*(.*?)\s*\]')
+INF = np.int32(1 << 20)
+DIAG, UP, LEFT = 0, 1, 2  # substitution/match, deletion, insertion
+
+
+def words(text):
+    """Same normalisation as GT_02 clean(), split into words."""
+    return re.sub(r'[^\w\s]', '', text or '').lower().split()
+
+
+def split_sections(lyrics):
+    """[(label, [words])] in song order; text before the first tag becomes 'UNTAGGED'."""
+    sections = []
+    label, pos = "UNTAGGED", 0
+    for match in TAG_RE.finditer(lyrics or ''):
+        sections.append((label, words(lyrics[pos:match.start()])))
+        label, pos = match.group(1).upper(), match.end()
+    sections.append((label, words(lyrics[pos:])))
+    return [(label, ws) for label, ws in sections if ws]
+
+
+def collect_songs(search_dirs):
+    """Yields (song_id, sections, transcript_words) for every audited ledger."""
+    for folder in search_dirs:
+        if not folder.exists():
+            print(f"⚠️ Folder not found: {folder}")
+            continue
+        for json_path in sorted(folder.glob("*.json")):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"   ⚠️ Error reading {json_path.name}: {e}")
+                continue
+            if isinstance(data, list): data = data[0]
+            if not isinstance(data, dict) or 'automated_metrics' not in data: continue
+
+            transcript = data['automated_metrics'].get('raw_transcript')
+            lyrics = data.get('configuration', {}).get('input_prompt', {}).get('lyrics', '')
+            sections = split_sections(lyrics)
+            if transcript is None or not sections: continue
+            song_id = data.get('provenance', {}).get('id', json_path.stem)
+            yield song_id, sections, words(transcript)
+
+
+def encode(songs):
+    """Maps every word to an integer id; returns padded ref/hyp id arrays, lengths and ref section ids."""
+    vocab = {}
+    refs = [[vocab.setdefault(w, len(vocab)) for _, ws in s for w in ws] for _, s, _ in songs]
+    hyps = [[vocab.setdefault(w, len(vocab)) for w in t] for _, _, t in songs]
+    n = np.array([len(r) for r in refs], dtype=np.int64)
+    m = np.array([len(h) for h in hyps], dtype=np.int64)
+    ref = np.full((len(songs), max(n.max(), 1)), -1, dtype=np.int32)
+    hyp = np.full((len(songs), max(m.max(), 1)), -2, dtype=np.int32)
+    section = np.zeros_like(ref)
+    for b, (r, h, (_, secs, _)) in enumerate(zip(refs, hyps, songs)):
+        ref[b, :len(r)] = r
+        hyp[b, :len(h)] = h
+        section[b, :len(r)] = np.repeat(np.arange(len(secs)), [len(ws) for _, ws in secs])
+    return ref, hyp, n, m, section
+
+
+def banded_alignment(ref, hyp, n, m, band=32):
+    """
+    Levenshtein alignment of every (ref[b, :n[b]], hyp[b, :m[b]]) pair at once.
+
+    Row i keeps only the 2 * band + 1 cells around the diagonal j = i * m / n, so the cost is
+    O(max(n) * batch * band) instead of O(n * m) per song. The DP runs row by row over the whole
+    batch: match/substitution and deletion come from the previous row, insertions are a running
+    minimum along the row (D[j] = min_k T[k] + j - k). Alignments that leave the band are
+    scored as if they could not, i.e. the result is an upper bound on the true edit distance.
+    Returns errors[b, i]: edit operations charged to lyric word i (insertions go to the lyric
+    word before them, or the first one).
+    """
+    batch, width = len(n), 2 * band + 1
+    rows = int(n.max()) + 1
+    safe_n = np.maximum(n, 1)
+    # band centre per row; row n[b] is centred on m[b] so the end cell is always inside
+    centre = np.rint(np.arange(rows)[None, :] * m[:, None] / safe_n[:, None]).astype(np.int64)
+    offsets = np.arange(width)[None, :] - band
+    kk = np.arange(width, dtype=np.int32)[None, :]
+    choice = np.empty((rows, batch, width), dtype=np.uint8)
+
+    j = centre[:, 0:1] + offsets
+    prev = np.where((j >= 0) & (j <= m[:, None]), j, INF).astype(np.int32)
+    choice[0] = LEFT
+    padded = np.full((batch, width + 2 * width), INF, dtype=np.int32)
+    for i in range(1, rows):
+        j = centre[:, i:i + 1] + offsets
+        valid = (j >= 0) & (j <= m[:, None])
+        shift = (centre[:, i] - centre[:, i - 1])[:, None]
+        padded[:, width:2 * width] = prev
+        cols = width + offsets + band + shift  # index of cell (i-1, j) in padded
+        up = np.take_along_axis(padded, np.clip(cols, 0, 3 * width - 1), axis=1) + 1
+        diag = np.take_along_axis(padded, np.clip(cols - 1, 0, 3 * width - 1), axis=1)
+        h = np.take_along_axis(hyp, np.clip(j - 1, 0, hyp.shape[1] - 1), axis=1)
+        diag = np.where(j >= 1, diag + (h != ref[:, i - 1:i]), INF)
+        t = np.minimum(np.minimum(diag, up), INF)
+        best = np.minimum.accumulate(t - kk, axis=1) + kk
+        d = np.where(valid, np.minimum(best, INF), INF).astype(np.int32)
+        choice[i] = np.where(d < t, LEFT, np.where(diag <= up, DIAG, UP))
+        prev = d
+
+    # Walk every song back from (n, m) to (0, 0) in lock-step
+    errors = np.zeros(ref.shape, dtype=np.int32)
+    b_idx = np.arange(batch)
+    i, jj = n.copy(), m.copy()
+    active = (i > 0) | (jj > 0)
+    while active.any():
+        b, ib, jb = b_idx[active], i[active], jj[active]
+        k = jb - centre[b, ib] + band
+        op = choice[ib, b, np.clip(k, 0, width - 1)]
+        op = np.where(ib == 0, LEFT, np.where(jb == 0, UP, op))
+        word = np.maximum(ib - 1, 0)
+        mismatch = (ref[b, word] != hyp[b, np.maximum(jb - 1, 0)]).astype(np.int32)
+        np.add.at(errors, (b, word), np.where(op == DIAG, mismatch, 1))
+        i[b] -= (op != LEFT)
+        jj[b] -= (op != UP)
+        active = (i > 0) | (jj > 0)
+    return errors
+
+
+def section_metrics(songs, band=32, chunk=1024):
+    """Column arrays with one row per (song, section): id, index, label, words, errors, wer."""
+    columns = {"song_id": [], "section_index": [], "section_label": [],
+               "ref_words": [], "errors": [], "wer": []}
+    # Similar lengths share a chunk so little of the batch is padding
+    order = sorted(range(len(songs)), key=lambda s: sum(len(ws) for _, ws in songs[s][1]))
+    for start in range(0, len(order), chunk):
+        batch = [songs[s] for s in order[start:start + chunk]]
+        ref, hyp, n, m, section = encode(batch)
+        errors = banded_alignment(ref, hyp, n, m, band=band)
+        num_sections = max(len(secs) for _, secs, _ in batch)
+        per_section = np.zeros((len(batch), num_sections), dtype=np.int64)
+        word_mask = np.arange(ref.shape[1])[None, :] < n[:, None]
+        rows = np.nonzero(word_mask)
+        np.add.at(per_section, (rows[0], section[rows]), errors[rows])
+        for b, (song_id, secs, _) in enumerate(batch):
+            for s, (label, ws) in enumerate(secs):
+                columns["song_id"].append(song_id)
+                columns["section_index"].append(s)
+                columns["section_label"].append(label)
+                columns["ref_words"].append(len(ws))
+                columns["errors"].append(int(per_section[b, s]))
+                columns["wer"].append(per_section[b, s] / len(ws))
+    return {
+        "song_id": np.array(columns["song_id"], dtype=str),
+        "section_index": np.array(columns["section_index"], dtype=np.int32),
+        "section_label": np.array(columns["section_label"], dtype=str),
+        "ref_words": np.array(columns["ref_words"], dtype=np.int32),
+        "errors": np.array(columns["errors"], dtype=np.int32),
+        "wer": np.array(columns["wer"], dtype=np.float32),
+    }
+
+
+def write_metrics(path, columns):
+    """.parquet when pyarrow is installed and asked for, otherwise one .npz array per column."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.table({k: v.tolist() for k, v in columns.items()}), str(path))
+    else:
+        np.savez_compressed(path, **columns)
+
+
+def audit_sections(output=METRICS_FILE, band=32):
+    songs = list(collect_songs([VAULT_DIR]))
+    if not songs:
+        print("⚠️ No audited ledgers found; run GT_02_Transcription_Validator.py first.")
+        return None
+    print(f"📐 Aligning {len(songs)} transcripts to their lyric sections...")
+    columns = section_metrics(songs, band=band)
+    write_metrics(output, columns)
+
+    # Section types that lose the most words across the vault
+    labels = np.char.rstrip(columns["section_label"], " 0123456789")
+    for label in np.unique(labels):
+        mask = labels == label
+        rate = columns["errors"][mask].sum() / max(columns["ref_words"][mask].sum(), 1)
+        print(f"   {label:>12}: WER {rate:.3f} over {mask.sum()} sections")
+    print(f"📝 {len(columns['wer'])} section rows saved to {output}")
+    return columns
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=str, default=str(METRICS_FILE), help=".npz or .parquet")
+    parser.add_argument("--band", type=int, default=32, help="alignment band half-width in words")
+    args = parser.parse_args()
+    audit_sections(output=args.output, band=args.band)
@@ -0,0 +1,104 @@
+import io
+import sys
+import json
+import time
+import threading
+import contextlib
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Latency of one album's worth of LM Studio traffic: the old one-shot requests (GET /models before
+# every completion, two in check_connection) vs LMStudioController's pooled session + cached model ID.
+# Runs against a local stub server, so it measures the client overhead only, not generation time.
+
+AGANCY_DIR = Path(__file__).resolve().parent / "AGANCY"
+if str(AGANCY_DIR) not in sys.path:
+    sys.path.insert(0, str(AGANCY_DIR))
+
+from lmstudio_controler import LMStudioController
+
+
+class StubLMStudio(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like LM Studio
+    delay = 0.0
+    counts = {"models": 0, "chat": 0, "connections": set()}
+
+    def _reply(self, body):
+        data = json.dumps(body).encode()
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.counts["models"] += 1
+        self.counts["connections"].add(self.client_address)
+        self._reply({"data": [{"id": "stub-model"}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.counts["chat"] += 1
+        self.counts["connections"].add(self.client_address)
+        self._reply({"choices": [{"message": {"content": "[VERSE 1]\nla la la"}}]})
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_album(base_url, chats):
+    """The pre-pooling call pattern: fresh connections, /models before every completion."""
+    requests.get(f"{base_url}/models", timeout=3)
+    requests.get(f"{base_url}/models", timeout=3)
+    for _ in range(chats):
+        model_id = requests.get(f"{base_url}/models", timeout=2).json()['data'][0]['id']
+        payload = {"model": model_id, "messages": [{"role": "user", "content": "hi"}], "stream": False}
+        requests.post(f"{base_url}/chat/completions", json=payload, timeout=600).json()
+
+
+def pooled_album(base_url, chats):
+    lms = LMStudioController(base_url)
+    lms.check_connection()
+    for _ in range(chats):
+        lms.chat("system", "hi")
+
+
+def measure(fn, base_url, chats, repeats):
+    best, counts = float("inf"), None
+    for _ in range(repeats):
+        StubLMStudio.counts = {"models": 0, "chat": 0, "connections": set()}
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # chat() echoes every response
+            fn(base_url, chats)
+        best = min(best, time.perf_counter() - start)
+        counts = dict(StubLMStudio.counts, connections=len(StubLMStudio.counts["connections"]))
+    return best, counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=10, help="album size: 1 plan + writer + tagger per track")
+    parser.add_argument("--delay_ms", type=float, default=2.0, help="stub server time per request")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    StubLMStudio.delay = args.delay_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLMStudio)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    chats = 1 + 2 * args.tracks
+
+    legacy_s, legacy_counts = measure(legacy_album, base_url, chats, args.repeats)
+    pooled_s, pooled_counts = measure(pooled_album, base_url, chats, args.repeats)
+    server.shutdown()
+
+    for name, secs, counts in (("one-shot", legacy_s, legacy_counts), ("pooled", pooled_s, pooled_counts)):
+        print(f"{name:>9}: {secs * 1000:8.1f} ms | {counts['models']:3d} x GET /models, "
+              f"{counts['chat']:3d} x completions, {counts['connections']:3d} TCP connections")
+    print(f"⏱️ Saved {(legacy_s - pooled_s) * 1000:.1f} ms per {args.tracks}-track album "
+          f"({legacy_counts['models'] - pooled_counts['models']} fewer round-trips)")
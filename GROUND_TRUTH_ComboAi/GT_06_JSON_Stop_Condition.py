@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+# Cases for json_complete, the stop condition that cuts the planner streams short: it must not fire
+# on bracketed prose ("Step [1] ...") ahead of the plan, nor on half-streamed JSON.
+
+AGANCY_DIR = Path(__file__).resolve().parent / "AGANCY"
+if str(AGANCY_DIR) not in sys.path:
+    sys.path.insert(0, str(AGANCY_DIR))
+
+from lmstudio_controler import json_complete
+
+PLAN = '{"album_title": "Neon", "tracks": [{"title": "A"}]}'
+
+CASES = [
+    # (text, kind, expected)
+    ("Step [1] then " + PLAN, dict, True),
+    ("Step [1] then " + PLAN[:-1], dict, False),  # list in prose must not end an object stream
+    ("Step [1] then " + PLAN[:-1], (dict, list), True),  # ...unless any JSON value will do
+    ("Notes {draft: yes} then " + PLAN, dict, True),  # non-JSON braces are skipped
+    ('Here: [{"title": "A"}, {"title": "B"}]', list, True),
+    ('Here: [{"title": "A"}, {"title": "B"', list, False),
+    ('{"lyric": "a } inside [ a string"}', dict, True),
+    ("no json yet", (dict, list), False),
+]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for text, kind, expected in CASES:
+        got = json_complete(text, kind)
+        failures += got != expected
+        print(f"{'✅' if got == expected else '❌'} {got!s:>5} | {text!r}")
+    if failures:
+        raise SystemExit(f"{failures} json_complete case(s) failed")
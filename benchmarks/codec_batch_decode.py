@@ -0,0 +1,93 @@
+"""Multi-song ``detokenize_batch`` vs. one ``detokenize`` call per song.
+
+Correctness: decodes ``--seconds`` songs (different lengths) together and
+each on its own, with the flow-matching noise set to zero so both runs see
+identical inputs, and reports the max difference per song. Throughput: times
+the whole group at every ``--batch_sizes`` value (songs per estimator call)
+and reports songs and audio seconds decoded per wall-clock second.
+"""
+
+from tiny_models import codec_arg_parser, load_codec, random_codes
+from unittest import mock
+import time
+import torch
+
+
+def parse_args():
+    parser = codec_arg_parser()
+    # Small enough for a few-GB host; a full album needs a GPU or plenty of RAM
+    parser.add_argument("--seconds", type=float, nargs="+", default=[10.0, 15.0, 20.0])
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    return parser.parse_args()
+
+
+def zero_noise(*args, **kwargs):
+    return torch.zeros(*args, **kwargs)
+
+
+def synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+def check(codec, codes_list, args):
+    with mock.patch("torch.randn", zero_noise):
+        batched = codec.detokenize_batch(
+            codes_list, num_steps=args.num_steps, disable_progress=True
+        )
+        singles = [
+            codec.detokenize(codes, num_steps=args.num_steps, disable_progress=True)
+            for codes in codes_list
+        ]
+    failures = 0
+    for seconds, wav, ref in zip(args.seconds, batched, singles):
+        if wav.shape != ref.shape:
+            print(f"{seconds:>8.1f}s: shape {tuple(wav.shape)} != {tuple(ref.shape)}")
+            failures += 1
+            continue
+        diff = (wav - ref).abs().max().item()
+        ok = diff <= args.tolerance
+        failures += not ok
+        print(f"{seconds:>8.1f}s: max diff {diff:.1e} {'ok' if ok else 'MISMATCH'}")
+    return failures
+
+
+def throughput(codec, codes_list, args):
+    audio_s = sum(args.seconds)
+    device = torch.device(args.device)
+    print(
+        f"{'batch':>6} {'seconds':>8} {'songs/s':>8} {'audio s/s':>10} "
+        f"{'speedup':>8}"
+    )
+    base = None
+    for batch_size in args.batch_sizes:
+        torch.manual_seed(0)
+        synchronize(device)
+        start = time.perf_counter()
+        codec.detokenize_batch(
+            codes_list,
+            num_steps=args.num_steps,
+            disable_progress=True,
+            batch_size=batch_size,
+        )
+        synchronize(device)
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(
+            f"{batch_size:>6} {elapsed:>8.2f} {len(codes_list) / elapsed:>8.3f} "
+            f"{audio_s / elapsed:>10.2f} {base / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    codec = load_codec(args.codec_path, args.device)
+    codes_list = [
+        random_codes(codec, seconds, seed=i) for i, seconds in enumerate(args.seconds)
+    ]
+    with torch.inference_mode():
+        failures = check(codec, codes_list, args)
+        throughput(codec, codes_list, args)
+    if failures:
+        raise SystemExit(f"{failures} song(s) differ from single-song detokenize")
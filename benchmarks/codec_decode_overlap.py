@@ -0,0 +1,55 @@
+"""detokenize with serial vs. overlapped ScalarModel decoding.
+
+Decodes the same random codes with the same seed with ``decode_workers=0``
+(solve and decode alternate per window) and with each ``--workers`` value
+(decodes run on worker threads, optionally on ``--decode_device``, while the
+estimator solves the next window), and checks the waveforms match.
+"""
+
+from tiny_models import codec_arg_parser, load_codec, random_codes
+import time
+import torch
+
+
+def parse_args():
+    parser = codec_arg_parser()
+    parser.add_argument("--decode_device", type=str, default=None)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--seconds", type=float, default=90.0)
+    return parser.parse_args()
+
+
+def run(codec, codes, args, workers, decode_device):
+    torch.manual_seed(0)
+    start = time.perf_counter()
+    wav = codec.detokenize(
+        codes,
+        num_steps=args.num_steps,
+        disable_progress=True,
+        decode_workers=workers,
+        decode_device=decode_device,
+    )
+    return time.perf_counter() - start, wav
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    codec = load_codec(args.codec_path, args.device)
+    codes = random_codes(codec, args.seconds)
+    # warm up (builds the decode-device copy)
+    run(codec, codes[:, :400], args, 1, args.decode_device)
+
+    serial_s, serial = run(codec, codes, args, 0, None)
+    print(
+        f"{'workers':>8} {'decode on':>10} {'seconds':>8} {'speedup':>8} "
+        f"{'max diff':>9}"
+    )
+    print(f"{0:>8} {args.device:>10} {serial_s:>8.2f} {1:>7.2f}x {0:>9.1e}")
+    for workers in args.workers:
+        elapsed, wav = run(codec, codes, args, workers, args.decode_device)
+        diff = (wav - serial).abs().max().item()
+        where = args.decode_device or args.device
+        print(
+            f"{workers:>8} {where:>10} {elapsed:>8.2f} "
+            f"{serial_s / elapsed:>7.2f}x {diff:>9.1e}"
+        )
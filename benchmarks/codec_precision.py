@@ -0,0 +1,100 @@
+"""Accuracy harness for reduced-precision HeartCodec decoding.
+
+Decodes the same codes with the same seed in fp32 and in each ``--dtypes``
+entry, then reports SNR and log-mel L1 distance against the fp32 waveform and
+the parameter memory of each dtype. Exits non-zero when a dtype falls below
+``--min_snr`` or above ``--max_logmel``, so it can gate changes to the codec.
+
+Without ``--codec_path`` a random-weight codec is used, which only checks
+numerical plumbing; pass a real checkpoint (and optionally ``--artifact`` with
+saved render frames) to judge audio quality.
+"""
+
+from heartlib.heartcodec.artifact import load_render_artifact
+from tiny_models import codec_arg_parser, load_codec, random_codes
+import sys
+import torch
+import torchaudio
+
+
+def str2dtype(value):
+    return {
+        "fp32": torch.float32,
+        "float32": torch.float32,
+        "bf16": torch.bfloat16,
+        "bfloat16": torch.bfloat16,
+        "fp16": torch.float16,
+        "float16": torch.float16,
+    }[value.lower()]
+
+
+def parse_args():
+    parser = codec_arg_parser()
+    parser.add_argument("--artifact", type=str, default=None)
+    parser.add_argument(
+        "--dtypes", type=str2dtype, nargs="+", default=[torch.bfloat16]
+    )
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--min_snr", type=float, default=20.0)
+    parser.add_argument("--max_logmel", type=float, default=0.5)
+    return parser.parse_args()
+
+
+def snr_db(ref, test):
+    noise = (ref - test).pow(2).sum()
+    return (10 * torch.log10(ref.pow(2).sum() / noise.clamp_min(1e-20))).item()
+
+
+def logmel_distance(ref, test, sample_rate):
+    mel = torchaudio.transforms.MelSpectrogram(
+        sample_rate=sample_rate, n_fft=2048, hop_length=512, n_mels=128
+    )
+    ref_mel = torch.log(mel(ref) + 1e-5)
+    test_mel = torch.log(mel(test) + 1e-5)
+    return (ref_mel - test_mel).abs().mean().item()
+
+
+def decode_all(codec, codes, seeds, num_steps):
+    outputs = []
+    for seed in seeds:
+        torch.manual_seed(seed)
+        wav = codec.detokenize(codes, num_steps=num_steps, disable_progress=True)
+        outputs.append(wav.float().cpu())
+    return outputs
+
+
+def param_bytes(model):
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    reference = load_codec(args.codec_path, args.device, torch.float32)
+    if args.artifact is not None:
+        codes = load_render_artifact(args.artifact, load_latents=False)["frames"]
+    else:
+        codes = random_codes(reference, args.seconds)
+    ref_wavs = decode_all(reference, codes, args.seeds, args.num_steps)
+    ref_bytes = param_bytes(reference)
+    sample_rate = reference.sample_rate
+    del reference
+
+    failed = False
+    print(f"{'dtype':>10} {'seed':>5} {'SNR dB':>8} {'log-mel L1':>11} {'params':>10}")
+    for dtype in args.dtypes:
+        codec = load_codec(args.codec_path, args.device, dtype)
+        wavs = decode_all(codec, codes, args.seeds, args.num_steps)
+        mem = f"{param_bytes(codec) / ref_bytes:.0%} fp32"
+        for seed, ref, test in zip(args.seeds, ref_wavs, wavs):
+            snr = snr_db(ref, test)
+            dist = logmel_distance(ref, test, sample_rate)
+            ok = snr >= args.min_snr and dist <= args.max_logmel
+            failed |= not ok
+            name = str(dtype).replace("torch.", "")
+            flag = "" if ok else "  FAIL"
+            print(f"{name:>10} {seed:>5} {snr:>8.2f} {dist:>11.4f} {mem:>10}{flag}")
+        del codec
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,95 @@
+"""Per-layer ScalarModel decoder profile: plain vs. fused activations.
+
+Times every top-level decoder layer (look-ahead conv, each ResDecoderBlock,
+PostProcessor, output conv) with forward hooks on a random-weight,
+weight-norm-folded ScalarModel, for three variants: the stock PReLU + add,
+the fused elementwise function in eager PyTorch, and the same function
+compiled with torch.compile.
+"""
+
+from streaming_decoder import build_scalar_model
+from heartlib.heartcodec.configuration_heartcodec import HeartCodecConfig
+from heartlib.heartcodec.models.sq_codec import ResidualUnit
+import argparse
+import time
+import torch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=744)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--iters", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    return parser.parse_args()
+
+
+def profile(model, latent, warmup, iters):
+    totals = [0.0] * len(model.decoder)
+    starts = {}
+
+    def pre_hook(idx):
+        def hook(module, inputs):
+            starts[idx] = time.perf_counter()
+
+        return hook
+
+    def post_hook(idx):
+        def hook(module, inputs, output):
+            totals[idx] += time.perf_counter() - starts[idx]
+
+        return hook
+
+    for _ in range(warmup):
+        model.decode(latent)
+    handles = []
+    for idx, layer in enumerate(model.decoder):
+        handles.append(layer.register_forward_pre_hook(pre_hook(idx)))
+        handles.append(layer.register_forward_hook(post_hook(idx)))
+    for _ in range(iters):
+        model.decode(latent)
+    for handle in handles:
+        handle.remove()
+    return [t / iters for t in totals]
+
+
+def set_variant(model, variant):
+    if variant == "stock":
+        for module in model.modules():
+            if isinstance(module, ResidualUnit):
+                module.fused_residual = None
+    else:
+        model.fuse_activations(compile=variant == "compiled")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    config = HeartCodecConfig()
+    model = build_scalar_model(config)
+    model.remove_weight_norm()
+    latent = torch.randn(2, config.latent_hidden_dim, args.frames).clamp(-1, 1)
+
+    variants = ["stock", "fused", "compiled"]
+    results = {}
+    outputs = {}
+    with torch.inference_mode():
+        for variant in variants:
+            set_variant(model, variant)
+            results[variant] = profile(model, latent, args.warmup, args.iters)
+            outputs[variant] = model.decode(latent)
+
+    print(f"{'layer':<28}" + "".join(f"{v:>12}" for v in variants) + f"{'gain':>8}")
+    for idx, layer in enumerate(model.decoder):
+        name = f"{idx}:{type(layer).__name__}"
+        row = [results[v][idx] * 1000 for v in variants]
+        gain = row[0] / min(row[1:]) if min(row[1:]) > 0 else float("nan")
+        cells = "".join(f"{ms:>10.1f}ms" for ms in row)
+        print(f"{name:<28}{cells}{gain:>7.2f}x")
+    total = [sum(results[v]) * 1000 for v in variants]
+    print(f"{'total':<28}" + "".join(f"{ms:>10.1f}ms" for ms in total))
+    for v in variants[1:]:
+        diff = (outputs[v] - outputs["stock"]).abs().max().item()
+        print(f"max abs diff {v} vs stock: {diff:.3e}")
@@ -0,0 +1,70 @@
+"""CPU throughput of the flow-matching estimator, eager vs. fast path.
+
+Builds a randomly initialised ``LlamaTransformer`` with the HeartCodec
+estimator shape (or a smaller one via flags), runs the same inputs through the
+eager attention path and through ``enable_fast_path()``, and reports
+windows/sec plus the max abs difference between both outputs.
+"""
+
+from heartlib.heartcodec.models.transformer import LlamaTransformer
+import argparse
+import copy
+import time
+import torch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_heads", type=int, default=24)
+    parser.add_argument("--head_dim", type=int, default=64)
+    parser.add_argument("--num_layers", type=int, default=24)
+    parser.add_argument("--num_layers_2", type=int, default=6)
+    parser.add_argument("--duration", type=float, default=29.76)
+    parser.add_argument("--batch_size", type=int, default=2)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--iters", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    return parser.parse_args()
+
+
+def _time(model, x, t, warmup, iters):
+    for _ in range(warmup):
+        model(x, timestep=t)
+    start = time.perf_counter()
+    for _ in range(iters):
+        out = model(x, timestep=t)
+    return (time.perf_counter() - start) / iters, out
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+
+    eager = LlamaTransformer(
+        num_attention_heads=args.num_heads,
+        attention_head_dim=args.head_dim,
+        in_channels=1024,
+        out_channels=256,
+        num_layers=args.num_layers,
+        num_layers_2=args.num_layers_2,
+        norm_type="ada_norm_single",
+    ).eval()
+    fast = copy.deepcopy(eager)
+    fast.enable_fast_path()
+
+    seq_len = int(args.duration * 25)
+    x = torch.randn(args.batch_size, seq_len, 1024)
+    t = torch.rand(args.batch_size)
+
+    with torch.inference_mode():
+        eager_s, eager_out = _time(eager, x, t, args.warmup, args.iters)
+        fast_s, fast_out = _time(fast, x, t, args.warmup, args.iters)
+
+    print(f"threads:     {torch.get_num_threads()}")
+    print(f"window:      {seq_len} frames x batch {args.batch_size}")
+    print(f"eager:       {eager_s * 1000:.1f} ms/call ({1 / eager_s:.2f} calls/s)")
+    print(f"fast path:   {fast_s * 1000:.1f} ms/call ({1 / fast_s:.2f} calls/s)")
+    print(f"speedup:     {eager_s / fast_s:.2f}x")
+    print(f"max abs err: {(eager_out - fast_out).abs().max().item():.3e}")
@@ -0,0 +1,64 @@
+"""Cold import time of heartlib entry points.
+
+Each target is imported in a fresh interpreter (``--repeats`` times, best
+kept) and the script reports the wall time and which heavy dependencies the
+import dragged in. ``import heartlib`` should load none of them; each
+pipeline should load only its own.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = {
+    "heartlib": "import heartlib",
+    "heartcodec config": (
+        "from heartlib.heartcodec.configuration_heartcodec import HeartCodecConfig"
+    ),
+    "HeartCodec": "from heartlib.heartcodec.modeling_heartcodec import HeartCodec",
+    "HeartMuLaGenPipeline": "from heartlib import HeartMuLaGenPipeline",
+    "HeartTranscriptorPipeline": "from heartlib import HeartTranscriptorPipeline",
+}
+HEAVY = [
+    "torch",
+    "transformers.modeling_utils",
+    "transformers.pipelines",
+    "transformers.models.whisper.modeling_whisper",
+    "torchtune",
+    "vector_quantize_pytorch",
+    "torchaudio",
+]
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--targets", type=str, nargs="+", default=list(TARGETS))
+    return parser.parse_args()
+
+
+def probe(statement):
+    code = PROBE.format(statement=statement, heavy=HEAVY)
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"{'target':<28}{'seconds':>9}  heavy modules loaded")
+    for name in args.targets:
+        runs = [probe(TARGETS[name]) for _ in range(args.repeats)]
+        best = min(run["seconds"] for run in runs)
+        loaded = ", ".join(runs[0]["loaded"]) or "-"
+        print(f"{name:<28}{best:>9.2f}  {loaded}")
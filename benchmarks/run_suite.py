@@ -0,0 +1,255 @@
+"""CPU benchmark suite over tiny random-weight HeartMuLa / HeartCodec models.
+
+Times every stage of a render on the models from ``tiny_models.py``:
+``preprocess``, the HeartMuLa prefill, per-frame ``generate_frame``,
+``sample_topk``, ``FlowMatching.solve_euler``, ``ScalarModel.decode`` and a
+full ``detokenize``. Results (seconds per call, calls or frames per second,
+real-time factor, peak RSS) are written as JSON and compared with a stored
+baseline; any stage slower than the baseline by more than ``--tolerance``
+fails the run.
+
+    python benchmarks/run_suite.py --save_baseline   # on the reference box
+    python benchmarks/run_suite.py                   # later: compare
+
+Keep ``--threads`` fixed between the baseline and later runs.
+"""
+
+from heartlib.heartmula.modeling_heartmula import sample_topk
+from tiny_models import SAMPLE_LYRICS, SAMPLE_TAGS, build_pipeline
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import torch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FRAME_SECONDS = 0.08  # one HeartMuLa frame = 80 ms of audio
+LATENT_SECONDS = 0.04  # one codec latent frame = 40 ms of audio
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "baseline.json"),
+    )
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument("--save_baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=40.0)
+    parser.add_argument("--num_steps", type=int, default=10)
+    return parser.parse_args()
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def measure(fn, repeats, warmup=1):
+    for _ in range(warmup):
+        fn()
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_preprocess(pipeline, args):
+    inputs = {"lyrics": SAMPLE_LYRICS, "tags": SAMPLE_TAGS}
+    seconds = measure(lambda: pipeline.preprocess(inputs, cfg_scale=1.5), 20)
+    return {"seconds": seconds, "per_sec": 1 / seconds}
+
+
+def bench_mula(pipeline, args):
+    mula = pipeline.mula
+    model_inputs = pipeline.preprocess(
+        {"lyrics": SAMPLE_LYRICS, "tags": SAMPLE_TAGS}, cfg_scale=1.5
+    )
+    prompt_pos = model_inputs["pos"]
+
+    def prefill():
+        mula.setup_caches(2)
+        return mula.generate_frame(
+            tokens=model_inputs["tokens"],
+            tokens_mask=model_inputs["tokens_mask"],
+            input_pos=prompt_pos,
+            temperature=1.0,
+            topk=50,
+            cfg_scale=1.5,
+            continuous_segments=model_inputs["muq_embed"],
+            starts=model_inputs["muq_idx"],
+        )
+
+    def frames():
+        token = prefill()
+        for i in range(args.frames):
+            padded = torch.zeros((2, 1, 9), dtype=torch.long)
+            padded[:, 0, :-1] = token
+            mask = torch.ones_like(padded, dtype=torch.bool)
+            mask[..., -1] = False
+            token = mula.generate_frame(
+                tokens=padded,
+                tokens_mask=mask,
+                input_pos=prompt_pos[..., -1:] + i + 1,
+                temperature=1.0,
+                topk=50,
+                cfg_scale=1.5,
+            )
+
+    prefill_s = measure(prefill, args.repeats)
+    frames_s = measure(frames, args.repeats) - prefill_s
+    frame_s = frames_s / args.frames
+    return {
+        "prefill": {"seconds": prefill_s, "tokens": prompt_pos.shape[-1]},
+        "generate_frame": {
+            "seconds": frame_s,
+            "per_sec": 1 / frame_s,
+            "rtf": frame_s / FRAME_SECONDS,
+        },
+    }
+
+
+def bench_sample_topk(pipeline, args):
+    logits = torch.randn(2, pipeline.mula.config.audio_vocab_size)
+    calls = 200
+    seconds = measure(
+        lambda: [sample_topk(logits, 50, 1.0) for _ in range(calls)], args.repeats
+    )
+    return {"seconds": seconds / calls, "per_sec": calls / seconds}
+
+
+def bench_codec(pipeline, args):
+    codec = pipeline.codec
+    fm = codec.flow_matching
+    latent_length = int(29.76 * 25)
+    mu_dim = fm.estimator.in_channels - 2 * fm.latent_dim
+    x = torch.randn(1, latent_length, fm.latent_dim)
+    incontext = torch.zeros_like(x)
+    mu = torch.randn(1, latent_length, mu_dim)
+    t_span = torch.linspace(0, 1, args.num_steps + 1)
+    latents = torch.randn(2, codec.config.latent_hidden_dim, latent_length)
+    num_codes = int(args.seconds * 12.5)
+    codes = torch.randint(
+        0,
+        codec.config.codebook_size,
+        (codec.config.num_quantizers, num_codes),
+        generator=torch.Generator().manual_seed(0),
+    )
+    window_s = latent_length * LATENT_SECONDS
+
+    def detokenize():
+        torch.manual_seed(0)
+        codec.detokenize(codes, num_steps=args.num_steps, disable_progress=True)
+
+    solve_s = measure(
+        lambda: fm.solve_euler(x.clone(), incontext, 0, t_span, mu, 1.25),
+        args.repeats,
+    )
+    decode_s = measure(lambda: codec.scalar_model.decode(latents), args.repeats)
+    detok_s = measure(detokenize, args.repeats)
+    return {
+        "solve_euler": {
+            "seconds": solve_s,
+            "per_sec": latent_length / solve_s,
+            "rtf": solve_s / window_s,
+        },
+        "decode": {
+            "seconds": decode_s,
+            "per_sec": latent_length / decode_s,
+            "rtf": decode_s / window_s,
+        },
+        "detokenize": {
+            "seconds": detok_s,
+            "per_sec": num_codes / detok_s,
+            "rtf": detok_s / args.seconds,
+        },
+    }
+
+
+def run(args):
+    torch.manual_seed(0)
+    pipeline = build_pipeline()
+    results = {}
+    with torch.inference_mode():
+        for bench in (bench_preprocess, bench_mula, bench_sample_topk, bench_codec):
+            out = bench(pipeline, args)
+            name = bench.__name__[len("bench_") :]
+            stages = out if isinstance(next(iter(out.values())), dict) else {name: out}
+            for stage, metrics in stages.items():
+                # process-wide high-water mark after the stage ran
+                metrics["peak_rss_mb"] = peak_rss_mb()
+                results[stage] = metrics
+                print(f"{stage:>15}: {metrics['seconds'] * 1000:10.2f} ms")
+    return {
+        "meta": {
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "threads": torch.get_num_threads(),
+            "frames": args.frames,
+            "seconds": args.seconds,
+            "num_steps": args.num_steps,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    failures = []
+    for stage, metrics in current["results"].items():
+        ref = baseline["results"].get(stage)
+        if ref is None:
+            continue
+        ratio = metrics["seconds"] / ref["seconds"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{stage:>15}: {ratio:6.2f}x baseline time {flag}")
+        if flag:
+            failures.append(stage)
+        ref_rss, rss = ref.get("peak_rss_mb"), metrics.get("peak_rss_mb")
+        if ref_rss and rss and rss > ref_rss * (1 + tolerance):
+            print(f"{stage:>15}: peak RSS {rss:.0f} MB vs {ref_rss:.0f} MB REGRESSION")
+            failures.append(f"{stage} (rss)")
+    return failures
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    torch.set_num_threads(args.threads)
+    current = run(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+    if not os.path.isfile(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save_baseline first.")
+        sys.exit(0)
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    for key in ("threads", "frames", "seconds", "num_steps"):
+        if baseline["meta"].get(key) != current["meta"][key]:
+            print(f"Warning: baseline {key}={baseline['meta'].get(key)} differs.")
+    failures = compare(current, baseline, args.tolerance)
+    if failures:
+        print(f"Performance regressions: {', '.join(failures)}")
+        sys.exit(1)
@@ -0,0 +1,53 @@
+"""ScalarModel.decode speed before and after folding weight norm.
+
+Times ``decode`` on a random-weight ScalarModel with the HeartCodec shape,
+folds every weight-norm parametrization with ``remove_weight_norm()`` and
+times it again, checking that the output is unchanged.
+"""
+
+from streaming_decoder import build_scalar_model
+from heartlib.heartcodec.configuration_heartcodec import HeartCodecConfig
+import argparse
+import time
+import torch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=744)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--iters", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    return parser.parse_args()
+
+
+def _time(model, latent, warmup, iters):
+    for _ in range(warmup):
+        model.decode(latent)
+    start = time.perf_counter()
+    for _ in range(iters):
+        out = model.decode(latent)
+    return (time.perf_counter() - start) / iters, out
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    config = HeartCodecConfig()
+    model = build_scalar_model(config)
+    latent = torch.randn(2, config.latent_hidden_dim, args.frames).clamp(-1, 1)
+    audio_s = args.frames / 25
+
+    with torch.inference_mode():
+        before_s, before = _time(model, latent, args.warmup, args.iters)
+    model.remove_weight_norm()
+    with torch.inference_mode():
+        after_s, after = _time(model, latent, args.warmup, args.iters)
+
+    print(f"audio:        {audio_s:.2f} s stereo")
+    print(f"weight norm:  {before_s:.3f} s/decode (RTF {before_s / audio_s:.3f})")
+    print(f"folded:       {after_s:.3f} s/decode (RTF {after_s / audio_s:.3f})")
+    print(f"speedup:      {before_s / after_s:.2f}x")
+    print(f"max abs diff: {(before - after).abs().max().item():.3e}")
@@ -0,0 +1,72 @@
+"""Streaming vs. full-window ScalarModel decode on a random-weight model.
+
+Decodes one latent window in one go and again through
+``ScalarModel.streaming_decoder()`` in chunks of ``--chunk`` latent frames,
+then reports the max abs difference, per-chunk latency and real-time factor.
+"""
+
+from heartlib.heartcodec.configuration_heartcodec import HeartCodecConfig
+from heartlib.heartcodec.models.sq_codec import ScalarModel
+import argparse
+import time
+import torch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=250)
+    parser.add_argument("--chunk", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0)
+    return parser.parse_args()
+
+
+def build_scalar_model(config: HeartCodecConfig) -> ScalarModel:
+    return ScalarModel(
+        num_bands=config.num_bands,
+        sample_rate=config.sample_rate,
+        causal=config.causal,
+        num_samples=config.num_samples,
+        downsample_factors=config.downsample_factors,
+        downsample_kernel_sizes=config.downsample_kernel_sizes,
+        upsample_factors=config.upsample_factors,
+        upsample_kernel_sizes=config.upsample_kernel_sizes,
+        latent_hidden_dim=config.latent_hidden_dim,
+        default_kernel_size=config.default_kernel_size,
+        delay_kernel_size=config.delay_kernel_size,
+        init_channel=config.init_channel,
+        res_kernel_size=config.res_kernel_size,
+    ).eval()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+    config = HeartCodecConfig()
+    model = build_scalar_model(config)
+    latent = torch.randn(2, config.latent_hidden_dim, args.frames).clamp(-1, 1)
+
+    with torch.inference_mode():
+        start = time.perf_counter()
+        full = model.decode(latent)
+        full_s = time.perf_counter() - start
+
+        stream = model.streaming_decoder()
+        chunks, latencies = [], []
+        for i in range(0, args.frames, args.chunk):
+            start = time.perf_counter()
+            chunks.append(stream.push(latent[..., i : i + args.chunk]))
+            latencies.append(time.perf_counter() - start)
+        chunks.append(stream.flush())
+        streamed = torch.cat(chunks, -1)
+
+    audio_s = full.shape[-1] / config.sample_rate
+    stream_s = sum(latencies)
+    mean_ms = 1000 * stream_s / len(latencies)
+    print(f"audio:          {audio_s:.2f} s, chunk {args.chunk * 40} ms")
+    print(f"full decode:    {full_s:.3f} s (RTF {full_s / audio_s:.3f})")
+    print(f"stream decode:  {stream_s:.3f} s (RTF {stream_s / audio_s:.3f})")
+    print(f"chunk latency:  {mean_ms:.1f} ms mean, {1000 * max(latencies):.1f} ms max")
+    print(f"shape match:    {tuple(full.shape) == tuple(streamed.shape)}")
+    print(f"max abs diff:   {(full - streamed).abs().max().item():.3e}")
@@ -0,0 +1,137 @@
+"""Random-weight HeartMuLa / HeartCodec / pipeline builders for benchmarks.
+
+The "tiny" flavors keep the real architecture (torchtune llama backbone and
+local decoder, FlowMatching + LlamaTransformer estimator, full ScalarModel)
+at a size that builds in seconds and runs on CPU, so the model code can be
+measured without multi-GB checkpoints. The codec scripts share
+``codec_arg_parser`` / ``load_codec``, which load a real checkpoint when
+``--codec_path`` is given and fall back to the tiny codec otherwise.
+"""
+
+from heartlib.heartcodec.configuration_heartcodec import HeartCodecConfig
+from heartlib.heartcodec.modeling_heartcodec import HeartCodec
+from heartlib.heartmula.configuration_heartmula import HeartMuLaConfig
+from heartlib.heartmula.modeling_heartmula import FLAVORS, HeartMuLa
+from heartlib.pipelines.music_generation import (
+    HeartMuLaGenConfig,
+    HeartMuLaGenPipeline,
+)
+from tokenizers import Tokenizer, models, pre_tokenizers
+from torchtune.models import llama3_2
+import argparse
+import torch
+
+TEXT_VOCAB_SIZE = 512
+SAMPLE_LYRICS = """[verse]
+the sun creeps in across the floor
+i hear the traffic outside the door
+[chorus]
+every day the light returns
+every day the fire burns
+"""
+SAMPLE_TAGS = "pop, piano, warm, female vocal"
+
+
+def _tiny_llama(num_layers, embed_dim, max_seq_len):
+    return llama3_2.llama3_2(
+        vocab_size=TEXT_VOCAB_SIZE,
+        num_layers=num_layers,
+        num_heads=4,
+        num_kv_heads=2,
+        embed_dim=embed_dim,
+        max_seq_len=max_seq_len,
+        intermediate_dim=embed_dim * 2,
+        attn_dropout=0.0,
+        norm_eps=1e-5,
+        rope_base=500_000,
+        scale_factor=32,
+    )
+
+
+FLAVORS.setdefault("llama-tiny", lambda: _tiny_llama(4, 256, 2048))
+FLAVORS.setdefault("llama-tiny-decoder", lambda: _tiny_llama(2, 128, 64))
+
+
+def tiny_mula_config() -> HeartMuLaConfig:
+    return HeartMuLaConfig(
+        backbone_flavor="llama-tiny",
+        decoder_flavor="llama-tiny-decoder",
+        text_vocab_size=TEXT_VOCAB_SIZE,
+    )
+
+
+def tiny_codec_config() -> HeartCodecConfig:
+    return HeartCodecConfig(num_layers=2, num_layers_2=1, num_attention_heads=4)
+
+
+def build_mula(seed: int = 0) -> HeartMuLa:
+    torch.manual_seed(seed)
+    return HeartMuLa(tiny_mula_config()).eval()
+
+
+def build_codec(seed: int = 0) -> HeartCodec:
+    return load_codec(seed=seed)
+
+
+def load_codec(
+    codec_path=None, device="cpu", dtype=torch.float32, seed: int = 0
+) -> HeartCodec:
+    """The checkpoint at ``codec_path``, or the tiny random-weight codec."""
+    device = torch.device(device)
+    if codec_path is not None:
+        codec = HeartCodec.from_pretrained(codec_path, device_map=device, dtype=dtype)
+    else:
+        torch.manual_seed(seed)
+        codec = HeartCodec(tiny_codec_config()).eval().to(device, dtype)
+    return codec.prepare_for_inference()
+
+
+def codec_arg_parser(**kwargs) -> argparse.ArgumentParser:
+    """``--codec_path``, ``--device`` and ``--num_steps`` for the codec scripts."""
+    parser = argparse.ArgumentParser(**kwargs)
+    parser.add_argument("--codec_path", type=str, default=None)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--num_steps", type=int, default=10)
+    return parser
+
+
+def random_codes(codec: HeartCodec, seconds: float, seed: int = 0) -> torch.Tensor:
+    """Uniform random codes for ``seconds`` of audio at 12.5 frames per second."""
+    generator = torch.Generator().manual_seed(seed)
+    return torch.randint(
+        0,
+        codec.config.codebook_size,
+        (codec.config.num_quantizers, int(seconds * 12.5)),
+        generator=generator,
+    )
+
+
+def build_tokenizer() -> Tokenizer:
+    words = sorted(set(SAMPLE_LYRICS.lower().split() + SAMPLE_TAGS.split()))
+    vocab = {"[unk]": 0, "[bos]": 1, "[eos]": 2, "<tag>": 3, "</tag>": 4}
+    for word in words:
+        vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[unk]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return tokenizer
+
+
+def build_pipeline(mula=None, codec=None) -> HeartMuLaGenPipeline:
+    """A pipeline holding in-memory tiny models instead of checkpoint paths."""
+    device = torch.device("cpu")
+    pipeline = HeartMuLaGenPipeline(
+        heartmula_path=None,
+        heartcodec_path=None,
+        heartmula_device=device,
+        heartcodec_device=device,
+        heartmula_dtype=torch.float32,
+        heartcodec_dtype=torch.float32,
+        lazy_load=True,  # skips loading from disk; models are attached below
+        muq_mulan=None,
+        text_tokenizer=build_tokenizer(),
+        config=HeartMuLaGenConfig(text_bos_id=1, text_eos_id=2),
+    )
+    pipeline._mula = mula if mula is not None else build_mula()
+    pipeline._codec = codec if codec is not None else build_codec()
+    pipeline.lazy_load = False  # keep the models across calls
+    return pipeline
@@ -0,0 +1,55 @@
+"""Re-render cost with the detokenize window cache after editing a song's tail.
+
+Decodes random codes, replaces the last ``--edit_seconds`` of them, and
+decodes again with the same seed, once without a cache and once through a
+``WindowCache`` warmed by the first render. Reports time, cache hits and the
+difference between the cached and uncached re-render (expected: zero).
+"""
+
+from heartlib.heartcodec.window_cache import WindowCache
+from tiny_models import codec_arg_parser, load_codec, random_codes
+import tempfile
+import time
+import torch
+
+
+def parse_args():
+    parser = codec_arg_parser()
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--edit_seconds", type=float, default=20.0)
+    return parser.parse_args()
+
+
+def render(codec, codes, args, window_cache=None):
+    torch.manual_seed(0)
+    start = time.perf_counter()
+    wav = codec.detokenize(
+        codes,
+        num_steps=args.num_steps,
+        disable_progress=True,
+        window_cache=window_cache,
+    )
+    return time.perf_counter() - start, wav
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    codec = load_codec(args.codec_path, args.device)
+    codes = random_codes(codec, args.seconds)
+    edited = codes.clone()
+    edit = random_codes(codec, args.edit_seconds, seed=1)
+    edited[:, -edit.shape[1] :] = edit
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = WindowCache(cache_dir)
+        render(codec, codes, args, cache)
+        cold_s, cold = render(codec, edited, args)
+        cache.hits = cache.misses = 0
+        warm_s, warm = render(codec, edited, args, cache)
+
+    print(f"uncached re-render: {cold_s:.2f} s")
+    print(
+        f"cached re-render:   {warm_s:.2f} s "
+        f"({cache.hits} hit / {cache.misses} miss, {cold_s / warm_s:.2f}x)"
+    )
+    print(f"max abs diff:       {(cold - warm).abs().max().item():.3e}")
@@ -0,0 +1,47 @@
+"""Codec work done for short previews under the "repeat" and "fit" schedules.
+
+Pure window arithmetic from ``plan_windows``; no checkpoints are needed. For
+each song length it reports the code frames pushed through the estimator and
+ScalarModel, and an attention-cost proxy (sum of squared window lengths),
+under both schedules.
+"""
+
+from heartlib.heartcodec.modeling_heartcodec import plan_windows
+import argparse
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        nargs="+",
+        default=[5, 10, 15, 20, 29.76, 45, 60, 120, 240],
+    )
+    parser.add_argument("--duration", type=float, default=29.76)
+    return parser.parse_args()
+
+
+def _cost(windows):
+    frames = sum(length for _, length, _ in windows)
+    attention = sum(length**2 for _, length, _ in windows)
+    return frames, attention
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(
+        f"{'song (s)':>9} {'windows':>8} {'repeat frames':>14} {'fit frames':>11} "
+        f"{'frames saved':>13} {'attn saved':>11}"
+    )
+    for seconds in args.seconds:
+        codes_len = int(seconds * 12.5)
+        repeat = plan_windows(codes_len, args.duration, "repeat")
+        fit = plan_windows(codes_len, args.duration, "fit")
+        repeat_frames, repeat_attn = _cost(repeat)
+        fit_frames, fit_attn = _cost(fit)
+        print(
+            f"{seconds:>9.2f} {len(repeat):>3} / {len(fit):<2} {repeat_frames:>14} "
+            f"{fit_frames:>11} {1 - fit_frames / repeat_frames:>12.1%} "
+            f"{1 - fit_attn / repeat_attn:>10.1%}"
+        )
@@ -0,0 +1,40 @@
+from heartlib.heartcodec.modeling_heartcodec import HeartCodec
+from heartlib.heartcodec.bulk_encoder import encode_files
+import argparse
+import glob
+import os
+import torch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, required=True)
+    parser.add_argument("--audio_dir", type=str, required=True)
+    parser.add_argument("--output_dir", type=str, required=True)
+    parser.add_argument("--pattern", type=str, default="**/*.wav")
+    parser.add_argument("--batch_size", type=int, default=4)
+    parser.add_argument("--num_workers", type=int, default=4)
+    parser.add_argument("--device", type=str, default="cuda")
+    parser.add_argument("--overwrite", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    codec = HeartCodec.from_pretrained_folded(
+        os.path.join(args.model_path, "HeartCodec-oss"),
+        device_map=torch.device(args.device),
+        dtype=torch.float32,
+    )
+    paths = sorted(
+        glob.glob(os.path.join(args.audio_dir, args.pattern), recursive=True)
+    )
+    results = encode_files(
+        codec,
+        paths,
+        args.output_dir,
+        batch_size=args.batch_size,
+        num_workers=args.num_workers,
+        overwrite=args.overwrite,
+    )
+    print(f"Encoded {len(results)} files to {args.output_dir}")
@@ -0,0 +1,44 @@
+from heartlib.heartcodec.export import check_export, export_codec
+from heartlib.heartcodec.modeling_heartcodec import HeartCodec
+import argparse
+import os
+import sys
+import torch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_path", type=str, required=True)
+    parser.add_argument("--export_dir", type=str, required=True)
+    parser.add_argument(
+        "--backend", type=str, default="torchscript", choices=["torchscript", "onnx"]
+    )
+    parser.add_argument("--duration", type=float, default=29.76)
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--atol", type=float, default=1e-3)
+    parser.add_argument("--skip_check", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    codec = HeartCodec.from_pretrained_folded(
+        os.path.join(args.model_path, "HeartCodec-oss"),
+        device_map=torch.device(args.device),
+        dtype=torch.float32,
+    )
+    manifest = export_codec(codec, args.export_dir, args.duration, args.backend)
+    print(f"Exported {args.backend} graphs: {manifest}")
+    if args.skip_check:
+        sys.exit(0)
+    # equivalence against eager PyTorch on random window-shaped inputs
+    diffs = check_export(codec, args.export_dir, args.backend)
+    if not diffs:
+        print(f"{args.backend} runtime not installed, equivalence not checked.")
+        sys.exit(0)
+    failed = False
+    for name, diff in diffs.items():
+        ok = diff <= args.atol
+        failed |= not ok
+        print(f"{name:>10}: max abs diff {diff:.3e} {'ok' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
@@ -1,7 +1,33 @@
-from .pipelines.music_generation import HeartMuLaGenPipeline
-from .pipelines.lyrics_transcription import HeartTranscriptorPipeline
+from typing import TYPE_CHECKING
+import importlib
+
+# Exports are imported on first access: the generation pipeline pulls in
+# torchtune / vector_quantize_pytorch / torchaudio and the transcription
+# pipeline pulls in transformers' ASR pipeline and Whisper, so neither is paid
+# for by code that only needs the other (or only a config).
+_LAZY_EXPORTS = {
+    "HeartMuLaGenPipeline": ".pipelines.music_generation",
+    "HeartTranscriptorPipeline": ".pipelines.lyrics_transcription",
+}
+
+if TYPE_CHECKING:
+    from .pipelines.music_generation import HeartMuLaGenPipeline
+    from .pipelines.lyrics_transcription import HeartTranscriptorPipeline
 
 __all__ = [
     "HeartMuLaGenPipeline",
     "HeartTranscriptorPipeline"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
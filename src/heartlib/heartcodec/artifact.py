@@ -0,0 +1,76 @@
+from typing import Any, Dict, List
+import json
+import os
+import numpy as np
+import torch
+from safetensors import safe_open
+from safetensors.numpy import save_file
+
+ARTIFACT_SUFFIX = ".heart.safetensors"
+ARTIFACT_FORMAT = "heartlib-render-artifact/1"
+
+
+def artifact_path_for(audio_path: str) -> str:
+    """``song.wav`` -> ``song.heart.safetensors`` in the same folder."""
+    return os.path.splitext(str(audio_path))[0] + ARTIFACT_SUFFIX
+
+
+def save_render_artifact(
+    path: str,
+    frames: torch.Tensor,
+    window_latents: List[torch.Tensor],
+    settings: Dict[str, Any],
+):
+    """
+    Write a render's token frames and flow-matching latents to one
+    memory-mappable safetensors file.
+
+    frames: [num_codebooks, T] HeartMuLa audio tokens, stored as uint16.
+    window_latents: per-window [T_w, 256] latents, stored as one fp16
+        [W, max T_w, 256] array plus the real length of every window.
+    settings: codec settings the latents were solved with (JSON-encoded).
+    """
+    max_frames = max(latent.shape[0] for latent in window_latents)
+    latents = np.zeros(
+        (len(window_latents), max_frames, window_latents[0].shape[-1]),
+        dtype=np.float16,
+    )
+    for i, latent in enumerate(window_latents):
+        latents[i, : latent.shape[0]] = latent.float().cpu().numpy()
+    tensors = {
+        "frames": frames.cpu().numpy().astype(np.uint16),
+        "latents": latents,
+        "window_frames": np.array(
+            [latent.shape[0] for latent in window_latents], dtype=np.int32
+        ),
+    }
+    metadata = {"format": ARTIFACT_FORMAT, "settings": json.dumps(settings)}
+    tmp_path = f"{path}.tmp"
+    save_file(tensors, tmp_path, metadata=metadata)
+    os.replace(tmp_path, path)
+
+
+def load_render_artifact(path: str, load_latents: bool = True) -> Dict[str, Any]:
+    """
+    Read an artifact written by ``save_render_artifact``. The file is memory
+    mapped; only the arrays that are asked for are materialised.
+    Returns ``frames`` ([num_codebooks, T] long), ``latents`` (list of
+    [T_w, 256] fp16 tensors, or None) and ``settings``.
+    """
+    with safe_open(path, framework="np") as f:
+        metadata = f.metadata() or {}
+        if metadata.get("format") != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} is not a {ARTIFACT_FORMAT} file.")
+        frames = torch.from_numpy(f.get_tensor("frames").astype(np.int64))
+        latents = None
+        if load_latents:
+            lengths = f.get_tensor("window_frames")
+            stacked = f.get_tensor("latents")
+            latents = [
+                torch.from_numpy(stacked[i, :n].copy()) for i, n in enumerate(lengths)
+            ]
+    return {
+        "frames": frames,
+        "latents": latents,
+        "settings": json.loads(metadata["settings"]),
+    }
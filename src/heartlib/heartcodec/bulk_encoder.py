@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Dict, Iterable, List
+import math
+import os
+import numpy as np
+import torch
+import torch.nn.functional as F
+import torchaudio
+from .modeling_heartcodec import HeartCodec
+
+
+def load_audio(path: str, sample_rate: int) -> torch.Tensor:
+    """Decode ``path`` to a [2, N] float tensor at ``sample_rate``."""
+    wav, sr = torchaudio.load(path)
+    if sr != sample_rate:
+        wav = torchaudio.functional.resample(wav, sr, sample_rate)
+    if wav.shape[0] == 1:
+        wav = wav.repeat(2, 1)
+    return wav[:2]
+
+
+def _prefetch(paths: List[str], sample_rate: int, num_workers: int):
+    # keep at most 2 * num_workers decoded files in flight
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        pending = deque()
+        it = iter(paths)
+        for path in it:
+            pending.append((path, pool.submit(load_audio, path, sample_rate)))
+            if len(pending) >= 2 * num_workers:
+                break
+        while pending:
+            path, future = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(load_audio, nxt, sample_rate)))
+            yield path, future.result()
+
+
+def _split_windows(wav: torch.Tensor, window: int, context: int) -> torch.Tensor:
+    """[2, N] -> [W, 2, context + window], each window with left context."""
+    n = wav.shape[-1]
+    num = max(1, math.ceil(n / window))
+    wav = F.pad(wav, (context, num * window - n))
+    return torch.stack(
+        [wav[:, i * window : i * window + context + window] for i in range(num)]
+    )
+
+
+def encode_files(
+    codec: HeartCodec,
+    paths: Iterable[str],
+    output_dir: str,
+    duration: float = 29.76,
+    context: float = 1.0,
+    batch_size: int = 4,
+    num_workers: int = 4,
+    overwrite: bool = False,
+) -> List[Dict[str, str]]:
+    """
+    Pre-encode a library of audio files into ScalarModel latents.
+
+    Files are decoded and resampled by a thread pool, cut into ``duration``
+    windows (with ``context`` seconds of left context for the causal encoder),
+    and windows from all files are encoded ``batch_size`` at a time. For each
+    file ``<stem>.latents.npy`` (fp16 [T, 256], 25 Hz) is written. Codes are
+    not produced (see ``HeartCodec.encode_latents``).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sample_rate = codec.sample_rate
+    hop = sample_rate // 25  # audio samples per latent frame
+    window = int(duration * 25) * hop
+    context = int(context * 25) * hop
+    context_frames = context // hop
+
+    paths = [str(p) for p in paths]
+    if not overwrite:
+        paths = [
+            p
+            for p in paths
+            if not os.path.isfile(_output_path(output_dir, p, "latents"))
+        ]
+
+    results = []
+    pending = {}  # path -> samples, windows left, encoded windows
+    batch = []  # (path, window index, [2, context + window])
+
+    def _flush_batch():
+        wav = torch.stack([w for _, _, w in batch])
+        latents = codec.encode_latents(wav)[:, context_frames:].float().cpu()
+        for k, (path, idx, _) in enumerate(batch):
+            entry = pending[path]
+            entry["latents"].append((idx, latents[k]))
+            entry["left"] -= 1
+            if entry["left"] == 0:
+                results.append(_write(output_dir, path, pending.pop(path), hop))
+        batch.clear()
+
+    for path, wav in _prefetch(paths, sample_rate, num_workers):
+        windows = _split_windows(wav, window, context)
+        pending[path] = {
+            "n": wav.shape[-1],
+            "left": windows.shape[0],
+            "latents": [],
+        }
+        for idx in range(windows.shape[0]):
+            batch.append((path, idx, windows[idx]))
+            if len(batch) == batch_size:
+                _flush_batch()
+    if batch:
+        _flush_batch()
+    return results
+
+
+def _output_path(output_dir: str, path: str, kind: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{stem}.{kind}.npy")
+
+
+def _write(output_dir: str, path: str, entry: Dict, hop: int) -> Dict[str, str]:
+    num_frames = math.ceil(entry["n"] / hop)
+    latents = torch.cat([x for _, x in sorted(entry["latents"], key=lambda e: e[0])])
+    out = {"audio": path, "latents": _output_path(output_dir, path, "latents")}
+    np.save(out["latents"], latents[:num_frames].numpy().astype(np.float16))
+    return out
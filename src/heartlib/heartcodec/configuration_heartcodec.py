@@ -38,6 +38,8 @@ class HeartCodecConfig(PretrainedConfig):
         delay_kernel_size: int = 5,
         init_channel: int = 64,
         res_kernel_size: int = 7,
+        # set once weight norm has been folded into plain conv weights
+        weight_norm_folded: bool = False,
         **kwargs
     ):
         super().__init__(**kwargs)
@@ -71,3 +73,4 @@ class HeartCodecConfig(PretrainedConfig):
         self.delay_kernel_size = delay_kernel_size
         self.init_channel = init_channel
         self.res_kernel_size = res_kernel_size
+        self.weight_norm_folded = weight_norm_folded
@@ -0,0 +1,229 @@
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import torch
+import torch.nn as nn
+
+MANIFEST_NAME = "heartcodec_export.json"
+BACKENDS = ("torchscript", "onnx")
+_SUFFIX = {"torchscript": ".pt", "onnx": ".onnx"}
+
+
+class _DecoderGraph(nn.Module):
+    def __init__(self, scalar_model):
+        super().__init__()
+        self.scalar_model = scalar_model
+
+    def forward(self, latents):
+        return self.scalar_model.decode(latents)
+
+
+class _EstimatorGraph(nn.Module):
+    def __init__(self, estimator):
+        super().__init__()
+        self.estimator = estimator
+
+    def forward(self, hidden_states, timestep):
+        return self.estimator(hidden_states, timestep=timestep)
+
+
+@contextmanager
+def _exportable(codec):
+    # the compiled activations and the complex-valued RoPE of the fast path do
+    # not trace; export the plain modules, which compute the same thing
+    estimator = codec.flow_matching.estimator
+    fused = [
+        (m, name, getattr(m, name))
+        for m in codec.scalar_model.modules()
+        for name in ("fused_residual", "fused_snake")
+        if getattr(m, name, None) is not None
+    ]
+    fast_path = estimator.fast_path
+    try:
+        for m, name, _ in fused:
+            setattr(m, name, None)
+        estimator.fast_path = False
+        yield
+    finally:
+        for m, name, fn in fused:
+            setattr(m, name, fn)
+        estimator.fast_path = fast_path
+
+
+def _graph_inputs(codec, duration: float) -> Dict[str, List[torch.Tensor]]:
+    """Example inputs of a one-song ``detokenize`` window of ``duration``."""
+    latent_length = int(duration * 25)
+    estimator = codec.flow_matching.estimator
+    param = next(codec.parameters())
+    kwargs = {"device": param.device, "dtype": param.dtype}
+    return {
+        # stereo halves of one window, [2, 128, T]
+        "decoder": [
+            torch.randn(2, codec.config.latent_hidden_dim, latent_length, **kwargs)
+        ],
+        # classifier-free guidance doubles the batch: [2, T, in_channels], [2]
+        "estimator": [
+            torch.randn(2, latent_length, estimator.in_channels, **kwargs),
+            torch.full((2,), 0.5, **kwargs),
+        ],
+    }
+
+
+def export_codec(
+    codec,
+    export_dir: str,
+    duration: float = 29.76,
+    backend: str = "torchscript",
+) -> str:
+    """
+    Export HeartCodec's ScalarModel decoder and flow-matching estimator as
+    standalone graphs for the fixed window of ``duration`` seconds, in
+    ``backend`` format (``"torchscript"`` or ``"onnx"``). Writes the graphs
+    and a manifest to ``export_dir`` and returns the manifest path; load them
+    with ``HeartCodec.set_backend``.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown export backend {backend!r}, expected {BACKENDS}.")
+    os.makedirs(export_dir, exist_ok=True)
+    codec.eval()
+    inputs = _graph_inputs(codec, duration)
+    graphs = {
+        "decoder": _DecoderGraph(codec.scalar_model),
+        "estimator": _EstimatorGraph(codec.flow_matching.estimator),
+    }
+    manifest = {
+        "backend": backend,
+        "duration": duration,
+        "dtype": str(next(codec.parameters()).dtype).replace("torch.", ""),
+        "graphs": {},
+    }
+    with _exportable(codec), torch.no_grad():
+        for name, graph in graphs.items():
+            filename = f"{name}{_SUFFIX[backend]}"
+            path = os.path.join(export_dir, filename)
+            if backend == "torchscript":
+                torch.jit.trace(graph, tuple(inputs[name])).save(path)
+            else:
+                input_names = ["latents"] if name == "decoder" else ["x", "timestep"]
+                torch.onnx.export(
+                    graph,
+                    tuple(inputs[name]),
+                    path,
+                    input_names=input_names,
+                    output_names=["output"],
+                    opset_version=17,
+                )
+            manifest["graphs"][name] = {
+                "file": filename,
+                "inputs": [list(x.shape) for x in inputs[name]],
+            }
+    manifest_path = os.path.join(export_dir, MANIFEST_NAME)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+class _TorchScriptRunner:
+    def __init__(self, path: str, device: torch.device):
+        self.module = torch.jit.load(path, map_location=device).eval()
+
+    def __call__(self, *inputs):
+        return self.module(*inputs)
+
+
+class _OnnxRunner:
+    def __init__(self, path: str, device: torch.device):
+        import onnxruntime
+
+        providers = ["CPUExecutionProvider"]
+        if device.type == "cuda":
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = onnxruntime.InferenceSession(path, providers=providers)
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, *inputs):
+        feeds = {
+            name: x.detach().cpu().numpy() for name, x in zip(self.input_names, inputs)
+        }
+        out = self.session.run(None, feeds)[0]
+        return torch.from_numpy(out).to(inputs[0].device)
+
+
+class ExportedGraph:
+    """
+    Runs an exported graph when the inputs have the shapes it was exported
+    with, and ``fallback`` (the eager module) otherwise, e.g. for a ``"fit"``
+    final window or a batched ``detokenize_batch`` call.
+    """
+
+    def __init__(self, runner, input_shapes: List[List[int]], dtype, fallback):
+        self.runner = runner
+        self.input_shapes = [tuple(s) for s in input_shapes]
+        self.dtype = dtype
+        self.fallback = fallback
+
+    def __call__(self, *args, **kwargs):
+        inputs = list(args) + list(kwargs.values())
+        if [tuple(x.shape) for x in inputs] != self.input_shapes:
+            return self.fallback(*args, **kwargs)
+        out = self.runner(*[x.to(self.dtype) for x in inputs])
+        return out.to(inputs[0].dtype)
+
+
+def load_exported(
+    codec, export_dir: str, backend: Optional[str] = None
+) -> Optional[Tuple[ExportedGraph, ExportedGraph]]:
+    """
+    Load the graphs written by ``export_codec`` as ``(decoder, estimator)``
+    callables for ``codec``, or return None if ``backend``'s runtime is not
+    installed.
+    """
+    with open(os.path.join(export_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    backend = backend or manifest["backend"]
+    if backend != manifest["backend"]:
+        raise ValueError(
+            f"{export_dir} holds a {manifest['backend']} export, not {backend}."
+        )
+    runner_cls = _TorchScriptRunner if backend == "torchscript" else _OnnxRunner
+    dtype = getattr(torch, manifest["dtype"])
+    device = next(codec.parameters()).device
+    fallbacks = {
+        "decoder": codec.scalar_model.decode,
+        "estimator": codec.flow_matching.estimator,
+    }
+    graphs = []
+    for name in ("decoder", "estimator"):
+        spec = manifest["graphs"][name]
+        try:
+            runner = runner_cls(os.path.join(export_dir, spec["file"]), device)
+        except ImportError as e:
+            print(f"{backend} runtime unavailable ({e}), keeping the eager codec.")
+            return None
+        graphs.append(ExportedGraph(runner, spec["inputs"], dtype, fallbacks[name]))
+    return graphs[0], graphs[1]
+
+
+@torch.no_grad()
+def check_export(codec, export_dir: str, backend: Optional[str] = None) -> Dict:
+    """
+    Run the exported graphs and the eager modules on the same random inputs
+    and return the max absolute difference per graph.
+    """
+    with open(os.path.join(export_dir, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    loaded = load_exported(codec, export_dir, backend)
+    if loaded is None:
+        return {}
+    inputs = _graph_inputs(codec, manifest["duration"])
+    eager = {
+        "decoder": lambda latents: codec.scalar_model.decode(latents),
+        "estimator": lambda x, t: codec.flow_matching.estimator(x, timestep=t),
+    }
+    diffs = {}
+    for name, exported in zip(("decoder", "estimator"), loaded):
+        ref = eager[name](*inputs[name]).float()
+        out = exported(*inputs[name]).float()
+        diffs[name] = (ref - out).abs().max().item()
+    return diffs
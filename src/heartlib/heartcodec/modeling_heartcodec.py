@@ -2,11 +2,55 @@ import torch
 from .models.flow_matching import FlowMatching
 from .models.sq_codec import ScalarModel
 from .configuration_heartcodec import HeartCodecConfig
+from .artifact import load_render_artifact, save_render_artifact
+from .window_cache import WindowCache
+from ..profiling import profile_span
 from transformers.modeling_utils import PreTrainedModel
+from concurrent.futures import Future, ThreadPoolExecutor
 import math
+import os
 import numpy as np
 
 
+def plan_windows(codes_len, duration=29.76, schedule="repeat", granularity=25):
+    """
+    Lay out the flow-matching windows for ``codes_len`` code frames.
+    Returns ``(start, length, content)`` per window, in code frames, where
+    ``content`` is the part of the window holding real (non-padding) codes.
+
+    ``"repeat"`` is the original layout: every window is a full ``duration``
+    window and short songs / the final window are filled by repeating codes.
+    ``"fit"`` sizes the only or final window to the real content, rounded up
+    to ``granularity`` code frames, and masks the rest.
+    """
+    min_samples = int(duration * 12.5)
+    hop_samples = min_samples // 93 * 80
+    ovlp_samples = min_samples - hop_samples
+    if schedule == "repeat":
+        padded_len = max(codes_len, min_samples)
+        if (padded_len - ovlp_samples * 2) % hop_samples > 0:
+            padded_len = (
+                math.ceil((padded_len - ovlp_samples) / float(hop_samples))
+                * hop_samples
+                + ovlp_samples
+            )
+        return [
+            (start, min_samples, min_samples)
+            for start in range(0, padded_len - hop_samples + 1, hop_samples)
+        ]
+    if schedule == "fit":
+        windows = []
+        start = 0
+        while True:
+            content = min(codes_len - start, min_samples)
+            length = min(min_samples, math.ceil(content / granularity) * granularity)
+            windows.append((start, length, content))
+            if start + min_samples >= codes_len:
+                return windows
+            start += hop_samples
+    raise ValueError(f"Unknown window schedule: {schedule}. Use 'repeat' or 'fit'.")
+
+
 class HeartCodec(PreTrainedModel):
     config_class = HeartCodecConfig
 
@@ -35,7 +79,18 @@ class HeartCodec(PreTrainedModel):
             num_layers_2=config.num_layers_2,
             out_channels=config.out_channels,
         )
-        self.scalar_model = ScalarModel(
+        self.scalar_model = self._build_scalar_model(config)
+        self.post_init()
+
+        self.sample_rate = config.sample_rate
+        self._decode_models = {}
+        self._decoder_backend = None
+        self._backend = "eager"
+        self.profiler = None
+
+    @staticmethod
+    def _build_scalar_model(config):
+        return ScalarModel(
             num_bands=config.num_bands,
             sample_rate=config.sample_rate,
             causal=config.causal,
@@ -49,10 +104,68 @@ class HeartCodec(PreTrainedModel):
             delay_kernel_size=config.delay_kernel_size,
             init_channel=config.init_channel,
             res_kernel_size=config.res_kernel_size,
+            use_weight_norm=not config.weight_norm_folded,
         )
-        self.post_init()
 
-        self.sample_rate = config.sample_rate
+    def prepare_for_inference(self, save_path=None, compile_activations=False):
+        """
+        Fold ScalarModel weight norm into plain conv weights, fuse the decoder's
+        elementwise activations and enable the estimator fast path. If
+        ``save_path`` is given, the folded codec is written there with
+        ``save_pretrained`` (before QKV fusion, so the checkpoint has no shared
+        tensors) and can be reloaded directly. ``compile_activations=True``
+        compiles the fused activations with torch.compile; it needs a working
+        Inductor toolchain and adds compile time to the first decode.
+        """
+        if not self.config.weight_norm_folded:
+            self.scalar_model.remove_weight_norm()
+            self.config.weight_norm_folded = True
+        if save_path is not None:
+            self.save_pretrained(save_path)
+        self.scalar_model.fuse_activations(compile=compile_activations)
+        self.flow_matching.estimator.enable_fast_path()
+        return self
+
+    @classmethod
+    def from_pretrained_folded(
+        cls, pretrained_path, cache_path=None, compile_activations=False, **kwargs
+    ):
+        """
+        Load an inference-ready codec, reusing a folded copy cached on disk.
+        The cache defaults to ``<pretrained_path>-folded-<dtype>`` and is
+        created from ``pretrained_path`` on first use.
+        """
+        if cache_path is None:
+            dtype = kwargs.get("dtype", None)
+            suffix = str(dtype).replace("torch.", "") if dtype is not None else "auto"
+            cache_path = f"{os.path.normpath(pretrained_path)}-folded-{suffix}"
+        if os.path.isfile(os.path.join(cache_path, "config.json")):
+            codec = cls.from_pretrained(cache_path, **kwargs)
+            return codec.prepare_for_inference(compile_activations=compile_activations)
+        codec = cls.from_pretrained(pretrained_path, **kwargs)
+        try:
+            return codec.prepare_for_inference(
+                save_path=cache_path, compile_activations=compile_activations
+            )
+        except OSError as e:
+            print(f"Could not cache folded HeartCodec at {cache_path}: {e}")
+            return codec.prepare_for_inference(compile_activations=compile_activations)
+
+    @torch.inference_mode()
+    def encode_latents(self, wav):
+        """
+        wav: [B, 2, N] stereo audio at ``self.sample_rate``.
+        Returns ScalarModel latents [B, N // 1920, 256] (25 Hz), laid out like
+        the flow-matching latents ``detokenize`` decodes (left | right).
+        There is no audio -> codes path: the codes ``detokenize`` takes index
+        features of a semantic encoder that does not ship with heartlib.
+        """
+        bsz = wav.shape[0]
+        wav = wav.to(self.device, self.dtype).reshape(bsz * 2, 1, wav.shape[-1])
+        latents = self.scalar_model.encode(wav)  # 2B, 128, T
+        _, f, t = latents.shape
+        latents = latents.reshape(bsz, 2, f, t).permute(0, 3, 1, 2)
+        return latents.reshape(bsz, t, 2 * f)
 
     @torch.inference_mode()
     def detokenize(
@@ -62,26 +175,294 @@ class HeartCodec(PreTrainedModel):
         num_steps=10,
         disable_progress=False,
         guidance_scale=1.25,
+        window_schedule="repeat",
+        artifact_path=None,
+        decode_workers=0,
+        decode_device=None,
+        window_cache=None,
+    ):
+        return self.detokenize_batch(
+            [codes],
+            duration=duration,
+            num_steps=num_steps,
+            disable_progress=disable_progress,
+            guidance_scale=guidance_scale,
+            window_schedule=window_schedule,
+            artifact_paths=[artifact_path],
+            decode_workers=decode_workers,
+            decode_device=decode_device,
+            window_cache=window_cache,
+        )[0]
+
+    @torch.inference_mode()
+    def detokenize_batch(
+        self,
+        codes_list,
+        duration=29.76,
+        num_steps=10,
+        disable_progress=False,
+        guidance_scale=1.25,
+        batch_size=None,
+        window_schedule="repeat",
+        artifact_paths=None,
+        decode_workers=0,
+        decode_device=None,
+        window_cache=None,
     ):
-        codes = codes.unsqueeze(0).to(self.device)
-        first_latent = torch.randn(
-            codes.shape[0], int(duration * 25), 256, dtype=self.dtype
-        ).to(
-            self.device
-        )  # B, T, 64
-        first_latent_length = 0
-        first_latent_codes_length = 0
+        """
+        Decode several songs of different lengths with shared estimator batches.
+        Window ``w`` of a song only depends on window ``w - 1`` of the same song,
+        so all songs' ``w``-th windows are solved together (at most
+        ``batch_size`` per estimator call). Returns one ``[2, target_len]``
+        waveform per entry of ``codes_list``, in order.
+        ``window_schedule="fit"`` decodes short songs and final windows at
+        their real length instead of repeating codes (see ``plan_windows``).
+        If ``artifact_paths[i]`` is set, song ``i``'s codes and window latents
+        are saved there for ``detokenize_from_artifact``.
+
+        With ``decode_workers > 0`` finished windows are handed to that many
+        threads running ScalarModel while the estimator solves the next window
+        (window ``w + 1`` only needs window ``w``'s latents, not its audio).
+        ``decode_device`` runs those decodes on another device, e.g. ``"cpu"``
+        next to a CUDA estimator, with an fp32 copy of ScalarModel. All random
+        draws stay on the calling thread and windows are overlap-added in
+        order, so the output does not depend on ``decode_workers``.
+
+        ``window_cache`` (a ``WindowCache`` or a directory for one) reuses the
+        latents and audio of windows already rendered with the same codes,
+        in-context latent, settings and RNG state, so re-rendering a song whose
+        leading windows are unchanged only solves and decodes the changed ones.
+        """
         min_samples = int(duration * 12.5)
         hop_samples = min_samples // 93 * 80
         ovlp_samples = min_samples - hop_samples
         ovlp_frames = ovlp_samples * 2
-        codes_len = codes.shape[-1]  #
-        target_len = int(
-            (codes_len - first_latent_codes_length) / 12.5 * self.sample_rate
+        latent_length = int(duration * 25)
+
+        songs_codes, first_latents, song_windows, target_lens = [], [], [], []
+        for codes in codes_list:
+            codes = codes.unsqueeze(0).to(self.device)
+            first_latents.append(
+                torch.randn(1, latent_length, 256).to(self.device, self.dtype)
+            )
+            codes_len = codes.shape[-1]
+            target_lens.append(int(codes_len / 12.5 * self.sample_rate))
+            windows = plan_windows(codes_len, duration, window_schedule)
+            if window_schedule == "repeat":
+                codes = self._pad_codes(codes, min_samples, hop_samples, ovlp_frames)
+            else:
+                codes = self._repeat_codes(codes, windows[-1][0] + windows[-1][1])
+            songs_codes.append(codes)
+            song_windows.append(windows)
+
+        if artifact_paths is None:
+            artifact_paths = [None] * len(songs_codes)
+        prev_latents = [None] * len(songs_codes)
+        outputs = [[] for _ in songs_codes]  # (audio or Future, index in batch)
+        window_latents = [[] for _ in songs_codes]
+        num_windows = max(len(windows) for windows in song_windows)
+        scalar_model = self._decode_model(decode_device)
+        pool = ThreadPoolExecutor(decode_workers) if decode_workers > 0 else None
+        if isinstance(window_cache, (str, os.PathLike)):
+            window_cache = WindowCache(window_cache)
+        new_entries = []  # (key, latents, audio or Future, rng state after)
+        try:
+            for w in range(num_windows):
+                # songs sharing a window index and length share estimator calls
+                groups = {}
+                for i, windows in enumerate(song_windows):
+                    if w < len(windows):
+                        groups.setdefault(windows[w][1], []).append(i)
+                for active in groups.values():
+                    step = batch_size or len(active)
+                    for j in range(0, len(active), step):
+                        group = active[j : j + step]
+                        solve_args = (
+                            [songs_codes[i] for i in group],
+                            [song_windows[i][w] for i in group],
+                            (
+                                [first_latents[i] for i in group]
+                                if w == 0 or ovlp_frames == 0
+                                else None
+                            ),
+                            [prev_latents[i] for i in group],
+                            latent_length,
+                            guidance_scale,
+                            num_steps,
+                            disable_progress,
+                        )
+                        entry, key = None, None
+                        if window_cache is not None:
+                            key = self._window_key(solve_args, scalar_model)
+                            entry = window_cache.get(key)
+                        if entry is not None:
+                            self._set_rng_state(entry["rng"])
+                            latents = entry["latents"].to(self.device, self.dtype)
+                            audio = entry["audio"]
+                        else:
+                            with profile_span(
+                                self.profiler,
+                                "codec.window",
+                                window=w,
+                                batch=len(group),
+                            ):
+                                latents = self._solve_windows(*solve_args)
+                            if pool is None:
+                                audio = self._decode_latents(latents, scalar_model)
+                            else:
+                                audio = pool.submit(
+                                    self._decode_latents, latents, scalar_model
+                                )
+                            if key is not None:
+                                new_entries.append(
+                                    (key, latents.cpu(), audio, self._rng_state())
+                                )
+                        for k, i in enumerate(group):
+                            prev_latents[i] = latents[k : k + 1, -ovlp_frames:, :]
+                            outputs[i].append((audio, k))
+                            if artifact_paths[i] is not None:
+                                window_latents[i].append(latents[k].cpu())
+            # assemble in window order whatever order the workers finished in
+            outputs = [
+                [self._window_audio(audio, k) for audio, k in song]
+                for song in outputs
+            ]
+            for key, latents, audio, rng in new_entries:
+                audio = self._window_audio(audio)
+                window_cache.put(key, {"latents": latents, "audio": audio, "rng": rng})
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        settings = {
+            "duration": duration,
+            "num_steps": num_steps,
+            "guidance_scale": guidance_scale,
+            "window_schedule": window_schedule,
+            "sample_rate": self.sample_rate,
+        }
+        for i, path in enumerate(artifact_paths):
+            if path is not None:
+                save_render_artifact(
+                    path, codes_list[i], window_latents[i], settings
+                )
+
+        min_samples = int(duration * self.sample_rate)
+        hop_samples = min_samples // 93 * 80
+        ovlp_samples = min_samples - hop_samples
+        return [
+            self._overlap_add(windows, min_samples, ovlp_samples)[:, 0:target_len]
+            for windows, target_len in zip(outputs, target_lens)
+        ]
+
+    @torch.inference_mode()
+    def detokenize_from_artifact(
+        self,
+        path,
+        num_steps=None,
+        guidance_scale=None,
+        window_schedule=None,
+        disable_progress=False,
+        window_cache=None,
+    ):
+        """
+        Re-decode a render saved with ``artifact_path`` without HeartMuLa.
+        With unchanged codec settings the stored latents only go through
+        ScalarModel; otherwise the stored codes are re-solved with the new
+        ``num_steps`` / ``guidance_scale`` / ``window_schedule`` (through
+        ``window_cache``, if given).
+        """
+        requested = {
+            "num_steps": num_steps,
+            "guidance_scale": guidance_scale,
+            "window_schedule": window_schedule,
+        }
+        artifact = load_render_artifact(path, load_latents=False)
+        settings = artifact["settings"]
+        changed = {
+            k: v for k, v in requested.items() if v is not None and v != settings[k]
+        }
+        codes = artifact["frames"]
+        if changed:
+            settings.update(changed)
+            return self.detokenize(
+                codes,
+                duration=settings["duration"],
+                num_steps=settings["num_steps"],
+                disable_progress=disable_progress,
+                guidance_scale=settings["guidance_scale"],
+                window_schedule=settings["window_schedule"],
+                window_cache=window_cache,
+            )
+
+        latents = load_render_artifact(path)["latents"]
+        target_len = int(codes.shape[-1] / 12.5 * self.sample_rate)
+        min_samples = int(settings["duration"] * self.sample_rate)
+        hop_samples = min_samples // 93 * 80
+        ovlp_samples = min_samples - hop_samples
+        windows = [
+            self._decode_latents(latent.unsqueeze(0).to(self.device, self.dtype))[0]
+            for latent in latents
+        ]
+        return self._overlap_add(windows, min_samples, ovlp_samples)[:, 0:target_len]
+
+    def _solve_windows(
+        self,
+        codes,
+        windows,
+        first_latents,
+        prev_latents,
+        latent_length,
+        guidance_scale,
+        num_steps,
+        disable_progress,
+    ):
+        window_len = windows[0][1]
+        num_frames = window_len * 2
+        codes_input = torch.cat(
+            [
+                song_codes[:, :, start : start + window_len]
+                for song_codes, (start, _, _) in zip(codes, windows)
+            ],
+            0,
         )
+        if first_latents is not None:
+            incontext_length = 0
+            true_latent = torch.cat(
+                [latent[:, :num_frames] for latent in first_latents], 0
+            )
+        else:
+            incontext_length = prev_latents[0].shape[1]
+            true_latent = torch.cat(
+                [self._incontext_latent(latent, num_frames) for latent in prev_latents],
+                0,
+            )
+        if all(content == window_len for _, _, content in windows):
+            content_length = latent_length
+        else:
+            content_length = torch.tensor([content * 2 for _, _, content in windows])
+        return self.flow_matching.inference_codes(
+            [codes_input],
+            true_latent,
+            content_length,
+            incontext_length,
+            guidance_scale=guidance_scale,
+            num_steps=num_steps,
+            disable_progress=disable_progress,
+            scenario="other_seg",
+        )
+
+    @staticmethod
+    def _repeat_codes(codes, length):
+        while codes.shape[-1] < length:
+            codes = torch.cat([codes, codes], -1)
+        return codes[:, :, 0:length]
 
+    @staticmethod
+    def _pad_codes(codes, min_samples, hop_samples, ovlp_frames):
+        ovlp_samples = min_samples - hop_samples
         # code repeat
-        if codes_len < min_samples:
+        if codes.shape[-1] < min_samples:
             while codes.shape[-1] < min_samples:
                 codes = torch.cat([codes, codes], -1)
             codes = codes[:, :, 0:min_samples]
@@ -94,90 +475,145 @@ class HeartCodec(PreTrainedModel):
             while codes.shape[-1] < len_codes:
                 codes = torch.cat([codes, codes], -1)
             codes = codes[:, :, 0:len_codes]
-        latent_length = int(duration * 25)
-        latent_list = []
-
-        for sinx in range(0, codes.shape[-1] - hop_samples + 1, hop_samples):
-            codes_input = []
-            codes_input.append(codes[:, :, sinx : sinx + min_samples])
-            if sinx == 0 or ovlp_frames == 0:
-                incontext_length = first_latent_length
-                latents = self.flow_matching.inference_codes(
-                    codes_input,
-                    first_latent,
-                    latent_length,
-                    incontext_length,
-                    guidance_scale=guidance_scale,
-                    num_steps=num_steps,
-                    disable_progress=disable_progress,
-                    scenario="other_seg",
-                )
-                latent_list.append(latents)
+        return codes
+
+    def _incontext_latent(self, prev_latent, latent_length):
+        len_add_to_latent = latent_length - prev_latent.shape[1]
+        return torch.cat(
+            [
+                prev_latent,
+                torch.randn(
+                    prev_latent.shape[0],
+                    len_add_to_latent,
+                    prev_latent.shape[-1],
+                ).to(self.device, self.dtype),
+            ],
+            1,
+        )
+
+    @torch.inference_mode()
+    def _decode_latents(self, latents, scalar_model=None):
+        # inference_mode is thread-local, so it is set here for decode workers
+        scalar_model = scalar_model or self.scalar_model
+        param = next(scalar_model.parameters())
+        # B, T, 256 -> 2B, 128, T: the two halves of the latent are the stereo channels
+        bsz, t, f = latents.shape
+        latents = latents.to(param.device, param.dtype)
+        latents = latents.reshape(bsz, t, 2, f // 2).permute(0, 2, 3, 1)
+        latents = latents.reshape(bsz * 2, f // 2, t)
+        with profile_span(self.profiler, "codec.decode", batch=bsz):
+            if scalar_model is self.scalar_model and self._decoder_backend is not None:
+                audio = self._decoder_backend(latents)
             else:
-                true_latent = latent_list[-1][:, -ovlp_frames:, :]
-                len_add_to_latent = latent_length - true_latent.shape[1]  #
-                incontext_length = true_latent.shape[1]
-                true_latent = torch.cat(
-                    [
-                        true_latent,
-                        torch.randn(
-                            true_latent.shape[0],
-                            len_add_to_latent,
-                            true_latent.shape[-1],
-                            dtype=self.dtype,
-                        ).to(self.device),
-                    ],
-                    1,
-                )
-                latents = self.flow_matching.inference_codes(
-                    codes_input,
-                    true_latent,
-                    latent_length,
-                    incontext_length,
-                    guidance_scale=guidance_scale,
-                    num_steps=num_steps,
-                    disable_progress=disable_progress,
-                    scenario="other_seg",
-                )
-                latent_list.append(latents)
+                audio = scalar_model.decode(latents)
+        return audio.reshape(bsz, 2, -1).detach().cpu()  # B, 2, samples
 
-        # latent_list = [l.float() for l in latent_list]
-        latent_list[0] = latent_list[0][:, first_latent_length:, :]
-        min_samples = int(duration * self.sample_rate)
-        hop_samples = min_samples // 93 * 80
-        ovlp_samples = min_samples - hop_samples
+    def set_profiler(self, profiler=None):
+        """Record ``codec.window``, ``codec.ode_step`` and ``codec.decode`` spans
+        on ``profiler`` (a ``heartlib.profiling.Profiler``); None turns it off."""
+        self.profiler = profiler
+        self.flow_matching.profiler = profiler
+        return self
 
-        output = None
-        for i in range(len(latent_list)):
-            latent = latent_list[i]
-            bsz, t, f = latent.shape
+    def set_backend(self, backend="eager", export_dir=None):
+        """
+        Run the ScalarModel decoder and flow-matching estimator through graphs
+        exported with ``heartcodec.export.export_codec`` (``"torchscript"`` or
+        ``"onnx"``, read from ``export_dir``), or through PyTorch (``"eager"``).
+        Windows whose shapes differ from the exported ones still run eagerly.
+        If the runtime for ``backend`` is not installed the codec stays eager.
+        """
+        self._decoder_backend = None
+        self.flow_matching.estimator_backend = None
+        self._backend = "eager"
+        if backend == "eager":
+            return self
+        from .export import load_exported
 
-            latent = latent.reshape(
-                latent.shape[0], latent.shape[1], 2, latent.shape[2] // 2
-            ).permute(0, 2, 1, 3)
-            latent = latent.reshape(
-                latent.shape[0] * 2, latent.shape[2], latent.shape[3]
-            )
-            cur_output = (
-                self.scalar_model.decode(latent.transpose(1, 2)).squeeze(0).squeeze(1)
-            )  # 1 512 256
+        loaded = load_exported(self, export_dir, backend)
+        if loaded is not None:
+            self._decoder_backend, self.flow_matching.estimator_backend = loaded
+            self._backend = backend
+        return self
+
+    def _decode_model(self, decode_device=None):
+        """ScalarModel to decode with: the codec's own, or an fp32 copy on
+        ``decode_device`` (built on first use from the current weights)."""
+        if decode_device is None:
+            return self.scalar_model
+        device = torch.device(decode_device)
+        if device == self.device:
+            return self.scalar_model
+        if device not in self._decode_models:
+            model = self._build_scalar_model(self.config)
+            model.load_state_dict(self.scalar_model.state_dict())
+            model = model.eval().to(device, torch.float32)
+            if any(
+                getattr(m, "fused_residual", None) is not None
+                for m in self.scalar_model.modules()
+            ):
+                model.fuse_activations()
+            self._decode_models[device] = model
+        return self._decode_models[device]
 
-            cur_output = cur_output[:, 0:min_samples].detach().cpu()  # B, T
-            if cur_output.dim() == 3:
-                cur_output = cur_output[0]
+    @staticmethod
+    def _window_audio(audio, k=None):
+        if isinstance(audio, Future):
+            audio = audio.result()
+        return audio if k is None else audio[k]
 
-            if output is None:
-                output = cur_output
+    def _rng_state(self):
+        state = [torch.get_rng_state()]
+        if self.device.type == "cuda":
+            state.append(torch.cuda.get_rng_state(self.device))
+        return state
+
+    def _set_rng_state(self, state):
+        torch.set_rng_state(state[0])
+        if len(state) > 1:
+            torch.cuda.set_rng_state(state[1], self.device)
+
+    def _window_key(self, solve_args, scalar_model):
+        # everything _solve_windows and _decode_latents read, plus the RNG state
+        codes, windows, first_latents, prev_latents = solve_args[:4]
+        window_len = windows[0][1]
+        parts = [
+            "heartcodec-window/1",
+            self.config._name_or_path,
+            self.dtype,
+            self._backend,
+            next(scalar_model.parameters()).dtype,
+            [(length, content) for _, length, content in windows],
+            solve_args[4:7],  # latent_length, guidance_scale, num_steps
+        ]
+        parts += [
+            song_codes[:, :, start : start + window_len]
+            for song_codes, (start, _, _) in zip(codes, windows)
+        ]
+        if first_latents is not None:
+            parts += [latent[:, : window_len * 2] for latent in first_latents]
+        else:
+            parts += prev_latents
+        parts += self._rng_state()
+        return WindowCache.make_key(*parts)
+
+    @staticmethod
+    def _overlap_add(windows, min_samples, ovlp_samples):
+        pieces = []
+        fade_in = torch.from_numpy(np.linspace(0, 1, ovlp_samples)[None, :])
+        fade_out = 1 - fade_in
+        for cur_output in windows:
+            # overlap-add in fp32 whatever the codec dtype
+            cur_output = cur_output[:, 0:min_samples].float()
+            if not pieces:
+                pieces.append(cur_output.clone())
+            elif ovlp_samples == 0:
+                pieces.append(cur_output)
             else:
-                if ovlp_samples == 0:
-                    output = torch.cat([output, cur_output], -1)
-                else:
-                    ov_win = torch.from_numpy(np.linspace(0, 1, ovlp_samples)[None, :])
-                    ov_win = torch.cat([ov_win, 1 - ov_win], -1)
-                    output[:, -ovlp_samples:] = (
-                        output[:, -ovlp_samples:] * ov_win[:, -ovlp_samples:]
-                        + cur_output[:, 0:ovlp_samples] * ov_win[:, 0:ovlp_samples]
-                    )
-                    output = torch.cat([output, cur_output[:, ovlp_samples:]], -1)
-        output = output[:, 0:target_len]
-        return output
+                tail = pieces[-1]
+                tail[:, -ovlp_samples:] = (
+                    tail[:, -ovlp_samples:] * fade_out
+                    + cur_output[:, 0:ovlp_samples] * fade_in
+                )
+                pieces.append(cur_output[:, ovlp_samples:].clone())
+        return torch.cat(pieces, -1)
@@ -2,8 +2,8 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 from tqdm import tqdm
-from vector_quantize_pytorch import ResidualVQ
 from .transformer import LlamaTransformer
+from ...profiling import profile_span
 
 
 class FlowMatching(nn.Module):
@@ -28,6 +28,8 @@ class FlowMatching(nn.Module):
         out_channels: int = 256,
     ):
         super().__init__()
+        # deferred: vector_quantize_pytorch is slow to import
+        from vector_quantize_pytorch import ResidualVQ
 
         self.vq_embed = ResidualVQ(
             dim=dim,
@@ -50,6 +52,9 @@ class FlowMatching(nn.Module):
             num_layers_2=num_layers_2,
             out_channels=out_channels,
         )
+        # exported estimator graph used in place of ``estimator`` (see export.py)
+        self.estimator_backend = None
+        self.profiler = None
 
         self.latent_dim = out_channels
 
@@ -82,13 +87,23 @@ class FlowMatching(nn.Module):
         ).permute(0, 2, 1)
 
         num_frames = quantized_feature_emb.shape[1]  #
+        # noise is always drawn in fp32 so every codec dtype sees the same seeds
         latents = torch.randn(
-            (batch_size, num_frames, self.latent_dim), device=device, dtype=dtype
+            (batch_size, num_frames, self.latent_dim),
+            device=device,
+            dtype=torch.float32,
         )
         latent_masks = torch.zeros(
             latents.shape[0], latents.shape[1], dtype=torch.int64, device=latents.device
         )
-        latent_masks[:, 0:latent_length] = 2
+        if torch.is_tensor(latent_length):
+            # per-sample content length, for windows that are only partly filled
+            valid = torch.arange(num_frames, device=device)[None, :] < latent_length.to(
+                device
+            ).unsqueeze(-1)
+            latent_masks[valid] = 2
+        else:
+            latent_masks[:, 0:latent_length] = 2
         if scenario == "other_seg":
             latent_masks[:, 0:incontext_length] = 1
 
@@ -102,7 +117,7 @@ class FlowMatching(nn.Module):
 
         incontext_latents = (
             true_latents
-            * ((latent_masks > 0.5) * (latent_masks < 1.5)).unsqueeze(-1).float()
+            * ((latent_masks > 0.5) * (latent_masks < 1.5)).unsqueeze(-1).to(dtype)
         )
         incontext_length = ((latent_masks > 0.5) * (latent_masks < 1.5)).sum(-1)[0]
 
@@ -123,7 +138,7 @@ class FlowMatching(nn.Module):
         latents[:, 0:incontext_length, :] = incontext_latents[
             :, 0:incontext_length, :
         ]  # B, T, dim
-        return latents
+        return latents.to(dtype)
 
     def solve_euler(self, x, incontext_x, incontext_length, t_span, mu, guidance_scale):
         """
@@ -136,36 +151,49 @@ class FlowMatching(nn.Module):
                 shape: (batch_size, n_feats, mel_timesteps)
         """
         t, _, dt = t_span[0], t_span[-1], t_span[1] - t_span[0]
+        # the ODE state is integrated in fp32; only the estimator runs in its dtype
+        est_dtype = mu.dtype
+        estimator = self.estimator_backend or self.estimator
+        x = x.float()
+        incontext_x = incontext_x.float()
         noise = x.clone()
         # I am storing this because I can later plot it by putting a debugger here and saving it to a file
         # Or in future might add like a return_all_steps flag
         sol = []
         for step in tqdm(range(1, len(t_span))):
-            x[:, 0:incontext_length, :] = (1 - (1 - 1e-6) * t) * noise[
-                :, 0:incontext_length, :
-            ] + t * incontext_x[:, 0:incontext_length, :]
-            if guidance_scale > 1.0:
-                dphi_dt = self.estimator(
-                    torch.cat(
-                        [
-                            torch.cat([x, x], 0),
-                            torch.cat([incontext_x, incontext_x], 0),
-                            torch.cat([torch.zeros_like(mu), mu], 0),
-                        ],
-                        2,
-                    ),
-                    timestep=t.unsqueeze(-1).repeat(2),
-                )
-                dphi_dt_uncond, dhpi_dt_cond = dphi_dt.chunk(2, 0)
-                dphi_dt = dphi_dt_uncond + guidance_scale * (
-                    dhpi_dt_cond - dphi_dt_uncond
-                )
-            else:
-                dphi_dt = self.estimator(
-                    torch.cat([x, incontext_x, mu], 2), timestep=t.unsqueeze(-1)
-                )
+            with profile_span(self.profiler, "codec.ode_step", step=step):
+                x[:, 0:incontext_length, :] = (1 - (1 - 1e-6) * t) * noise[
+                    :, 0:incontext_length, :
+                ] + t * incontext_x[:, 0:incontext_length, :]
+                # one timestep per sample: the estimator's adaLN tables are [B, ...]
+                t_batch = t.expand(x.shape[0])
+                if guidance_scale > 1.0:
+                    x_in = x.to(est_dtype)
+                    incontext_in = incontext_x.to(est_dtype)
+                    dphi_dt = estimator(
+                        torch.cat(
+                            [
+                                torch.cat([x_in, x_in], 0),
+                                torch.cat([incontext_in, incontext_in], 0),
+                                torch.cat([torch.zeros_like(mu), mu], 0),
+                            ],
+                            2,
+                        ),
+                        timestep=t_batch.repeat(2),
+                    )
+                    dphi_dt_uncond, dhpi_dt_cond = dphi_dt.chunk(2, 0)
+                    dphi_dt = dphi_dt_uncond + guidance_scale * (
+                        dhpi_dt_cond - dphi_dt_uncond
+                    )
+                else:
+                    dphi_dt = estimator(
+                        torch.cat(
+                            [x.to(est_dtype), incontext_x.to(est_dtype), mu], 2
+                        ),
+                        timestep=t_batch,
+                    )
 
-            x = x + dt * dphi_dt
+                x = x + dt * dphi_dt.float()
             t = t + dt
             sol.append(x)
             if step < len(t_span) - 1:
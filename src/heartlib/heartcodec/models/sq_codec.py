@@ -2,8 +2,9 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
+import warnings
 from torch.nn.utils.parametrizations import weight_norm
-from torch.nn.utils import remove_weight_norm
+from torch.nn.utils import parametrize
 from torch.autograd.function import InplaceFunction
 
 
@@ -11,6 +12,15 @@ def get_padding(kernel_size, dilation=1):
     return int((kernel_size * dilation - dilation) / 2)
 
 
+def maybe_weight_norm(module, use_weight_norm=True):
+    return weight_norm(module) if use_weight_norm else module
+
+
+def remove_weight_norm(module):
+    if parametrize.is_parametrized(module, "weight"):
+        parametrize.remove_parametrizations(module, "weight")
+
+
 # Scripting this brings model speed up 1.4x
 @torch.jit.script
 def snake(x, alpha):
@@ -21,13 +31,54 @@ def snake(x, alpha):
     return x
 
 
+def prelu_residual(x, weight, residual):
+    return torch.where(x >= 0, x, x * weight) + residual
+
+
+class FusedElementwise:
+    """
+    Runs ``fn`` through ``torch.compile`` (one vectorised kernel per call
+    instead of one pass per op) and falls back to eager PyTorch if compilation
+    is unavailable or fails, e.g. without a C++ toolchain for Inductor.
+    """
+
+    def __init__(self, fn, eager_fn=None, compile=False):
+        self.eager_fn = eager_fn or fn
+        self.compiled_fn = None
+        if compile and hasattr(torch, "compile"):
+            try:
+                self.compiled_fn = torch.compile(fn, dynamic=True)
+            except Exception as e:
+                warnings.warn(f"torch.compile unavailable for {fn.__name__}: {e}")
+
+    def __call__(self, *args):
+        if self.compiled_fn is not None:
+            try:
+                return self.compiled_fn(*args)
+            except Exception as e:
+                warnings.warn(
+                    f"Compiled {self.eager_fn.__name__} failed, using eager: {e}"
+                )
+                self.compiled_fn = None
+        return self.eager_fn(*args)
+
+
+def snake_eager(x, alpha):
+    return x + (alpha + 1e-9).reciprocal() * torch.sin(alpha * x).pow(2)
+
+
 class Snake1d(nn.Module):
     def __init__(self, channels):
         super().__init__()
         self.alpha = nn.Parameter(torch.ones(1, channels, 1))
+        self.fused_snake = None
 
     def forward(self, x):
-        return snake(x, self.alpha)
+        fn = self.fused_snake or snake
+        if x.dtype == torch.float32:
+            return fn(x, self.alpha)
+        # sin(alpha * x)^2 / alpha is unstable in half precision
+        return fn(x.float(), self.alpha.float()).to(x.dtype)
 
 
 class Conv1d(nn.Conv1d):
@@ -70,7 +121,7 @@ class Conv1d(nn.Conv1d):
 
     def forward(self, x):
         if self.causal:
-            x = F.pad(x.unsqueeze(2), (self.left_padding, 0, 0, 0)).squeeze(2)
+            x = F.pad(x, (self.left_padding, 0))
 
         return super(Conv1d, self).forward(x)
 
@@ -149,30 +200,54 @@ class PostProcessor(nn.Module):
 
 
 class ResidualUnit(nn.Module):
-    def __init__(self, n_in, n_out, dilation, res_kernel_size=7, causal=False):
+    def __init__(
+        self,
+        n_in,
+        n_out,
+        dilation,
+        res_kernel_size=7,
+        causal=False,
+        use_weight_norm=True,
+    ):
         super(ResidualUnit, self).__init__()
-        self.conv1 = weight_norm(
+        self.conv1 = maybe_weight_norm(
             Conv1d(
                 n_in,
                 n_out,
                 kernel_size=res_kernel_size,
                 dilation=dilation,
                 causal=causal,
-            )
+            ),
+            use_weight_norm,
+        )
+        self.conv2 = maybe_weight_norm(
+            Conv1d(n_in, n_out, kernel_size=1, causal=causal), use_weight_norm
         )
-        self.conv2 = weight_norm(Conv1d(n_in, n_out, kernel_size=1, causal=causal))
         self.activation1 = nn.PReLU()
         self.activation2 = nn.PReLU()
+        self.fused_residual = None
 
     def forward(self, x):
         output = self.activation1(self.conv1(x))
-        output = self.activation2(self.conv2(output))
-        return output + x
+        return self.residual_out(self.conv2(output), x)
+
+    def residual_out(self, output, x):
+        """activation2(output) + x, as one fused kernel when enabled."""
+        if self.fused_residual is not None:
+            return self.fused_residual(output, self.activation2.weight, x)
+        return self.activation2(output) + x
 
 
 class ResEncoderBlock(nn.Module):
     def __init__(
-        self, n_in, n_out, stride, down_kernel_size, res_kernel_size=7, causal=False
+        self,
+        n_in,
+        n_out,
+        stride,
+        down_kernel_size,
+        res_kernel_size=7,
+        causal=False,
+        use_weight_norm=True,
     ):
         super(ResEncoderBlock, self).__init__()
         self.convs = nn.ModuleList(
@@ -183,6 +258,7 @@ class ResEncoderBlock(nn.Module):
                     dilation=1,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out // 2,
@@ -190,6 +266,7 @@ class ResEncoderBlock(nn.Module):
                     dilation=3,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out // 2,
@@ -197,6 +274,7 @@ class ResEncoderBlock(nn.Module):
                     dilation=5,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out // 2,
@@ -204,6 +282,7 @@ class ResEncoderBlock(nn.Module):
                     dilation=7,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out // 2,
@@ -211,12 +290,18 @@ class ResEncoderBlock(nn.Module):
                     dilation=9,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
             ]
         )
 
         self.down_conv = DownsampleLayer(
-            n_in, n_out, down_kernel_size, stride=stride, causal=causal
+            n_in,
+            n_out,
+            down_kernel_size,
+            stride=stride,
+            causal=causal,
+            use_weight_norm=use_weight_norm,
         )
 
     def forward(self, x):
@@ -228,7 +313,14 @@ class ResEncoderBlock(nn.Module):
 
 class ResDecoderBlock(nn.Module):
     def __init__(
-        self, n_in, n_out, stride, up_kernel_size, res_kernel_size=7, causal=False
+        self,
+        n_in,
+        n_out,
+        stride,
+        up_kernel_size,
+        res_kernel_size=7,
+        causal=False,
+        use_weight_norm=True,
     ):
         super(ResDecoderBlock, self).__init__()
         self.up_conv = UpsampleLayer(
@@ -238,6 +330,7 @@ class ResDecoderBlock(nn.Module):
             stride=stride,
             causal=causal,
             activation=None,
+            use_weight_norm=use_weight_norm,
         )
 
         self.convs = nn.ModuleList(
@@ -248,6 +341,7 @@ class ResDecoderBlock(nn.Module):
                     dilation=1,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out,
@@ -255,6 +349,7 @@ class ResDecoderBlock(nn.Module):
                     dilation=3,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out,
@@ -262,6 +357,7 @@ class ResDecoderBlock(nn.Module):
                     dilation=5,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out,
@@ -269,6 +365,7 @@ class ResDecoderBlock(nn.Module):
                     dilation=7,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
                 ResidualUnit(
                     n_out,
@@ -276,6 +373,7 @@ class ResDecoderBlock(nn.Module):
                     dilation=9,
                     res_kernel_size=res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 ),
             ]
         )
@@ -324,6 +422,7 @@ class DownsampleLayer(nn.Module):
     def remove_weight_norm(self):
         if self.use_weight_norm:
             remove_weight_norm(self.layer)
+            self.use_weight_norm = False
 
 
 class UpsampleLayer(nn.Module):
@@ -365,6 +464,7 @@ class UpsampleLayer(nn.Module):
     def remove_weight_norm(self):
         if self.use_weight_norm:
             remove_weight_norm(self.layer)
+            self.use_weight_norm = False
 
 
 class round_func9(InplaceFunction):
@@ -396,6 +496,7 @@ class ScalarModel(nn.Module):
         init_channel,
         res_kernel_size,
         mode="pre_proj",
+        use_weight_norm=True,
     ):
         super(ScalarModel, self).__init__()
         # self.args = args
@@ -405,13 +506,14 @@ class ScalarModel(nn.Module):
         self.mode = mode
         # Encoder parts
         self.encoder.append(
-            weight_norm(
+            maybe_weight_norm(
                 Conv1d(
                     num_bands,
                     init_channel,
                     kernel_size=default_kernel_size,
                     causal=causal,
-                )
+                ),
+                use_weight_norm,
             )
         )
         if num_samples > 1:
@@ -434,27 +536,30 @@ class ScalarModel(nn.Module):
                     downsample_kernel_sizes[i],
                     res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 )
             )
         self.encoder.append(
-            weight_norm(
+            maybe_weight_norm(
                 Conv1d(
                     init_channel * np.power(2, len(downsample_factors)),
                     latent_hidden_dim,
                     kernel_size=default_kernel_size,
                     causal=causal,
-                )
+                ),
+                use_weight_norm,
             )
         )
         # Decoder
         # look ahead
         self.decoder.append(
-            weight_norm(
+            maybe_weight_norm(
                 Conv1d(
                     latent_hidden_dim,
                     init_channel * np.power(2, len(upsample_factors)),
                     kernel_size=delay_kernel_size,
-                )
+                ),
+                use_weight_norm,
             )
         )
         for i, upsample_factor in enumerate(upsample_factors):
@@ -466,6 +571,7 @@ class ScalarModel(nn.Module):
                     upsample_kernel_sizes[i],
                     res_kernel_size,
                     causal=causal,
+                    use_weight_norm=use_weight_norm,
                 )
             )
         if num_samples > 1:
@@ -479,18 +585,39 @@ class ScalarModel(nn.Module):
                 )
             )
         self.decoder.append(
-            weight_norm(
+            maybe_weight_norm(
                 Conv1d(
                     init_channel,
                     num_bands,
                     kernel_size=default_kernel_size,
                     causal=causal,
-                )
+                ),
+                use_weight_norm,
             )
         )
         self.encoder = nn.ModuleList(self.encoder)
         self.decoder = nn.ModuleList(self.decoder)
 
+    def remove_weight_norm(self):
+        """Fold every weight-norm parametrization into a plain weight."""
+        for module in list(self.modules()):
+            remove_weight_norm(module)
+
+    def fuse_activations(self, compile=False):
+        """
+        Replace the PReLU + residual add that closes every ResidualUnit (and
+        any Snake1d) with a single fused elementwise function. ``compile=True``
+        runs it through torch.compile (first call pays the compile time); by
+        default, or when torch.compile is unusable, it runs in eager PyTorch.
+        """
+        fused_residual = FusedElementwise(prelu_residual, compile=compile)
+        fused_snake = FusedElementwise(snake_eager, eager_fn=snake, compile=compile)
+        for module in self.modules():
+            if isinstance(module, ResidualUnit):
+                module.fused_residual = fused_residual
+            elif isinstance(module, Snake1d):
+                module.fused_snake = fused_snake
+
     def forward(self, x):
         for i, layer in enumerate(self.encoder):
             if i != len(self.encoder) - 1:
@@ -537,3 +664,98 @@ class ScalarModel(nn.Module):
         for i, layer in enumerate(self.decoder):
             x = layer(x)
         return x
+
+    def streaming_decoder(self):
+        return StreamingDecoder(self)
+
+
+class StreamingDecoder:
+    """
+    Chunk-by-chunk ``ScalarModel.decode`` with persistent conv state.
+    Every causal conv keeps its left context (``dilation * (kernel_size - 1)``
+    input frames, one frame for causal transposed convs) between calls, so
+    memory stays constant and the concatenated output of ``push`` + ``flush``
+    matches ``decode`` on the whole latent. The look-ahead conv at the head of
+    the decoder holds back its right padding until ``flush``.
+    """
+
+    def __init__(self, model: ScalarModel):
+        for module in list(model.decoder.modules())[1:]:
+            if module is model.decoder[0]:
+                continue
+            if isinstance(module, (Conv1d, ConvTranspose1d)) and not module.causal:
+                raise ValueError("Streaming decode requires a causal ScalarModel.")
+        self.model = model
+        self.reset()
+
+    def reset(self):
+        self._state = {}
+        self._empty = None
+
+    def push(self, x):
+        """x: latent chunk [B, latent_hidden_dim, T]; returns the audio it completes."""
+        self._empty = x[..., 0:0]
+        return self._run(self.model.vq.apply(x), flush=False)
+
+    def flush(self):
+        """Emit the tail held back by the look-ahead conv and reset the state."""
+        if self._empty is None:
+            return None
+        out = self._run(self._empty, flush=True)
+        self.reset()
+        return out
+
+    def _run(self, x, flush):
+        for layer in self.model.decoder:
+            x = self._step(layer, x, flush)
+        return x
+
+    def _step(self, module, x, flush):
+        if isinstance(module, ResDecoderBlock):
+            x = self._step(module.up_conv, x, flush)
+            for conv in module.convs:
+                x = self._step(conv, x, flush)
+            return x
+        if isinstance(module, ResidualUnit):
+            output = module.activation1(self._conv(module.conv1, x, flush))
+            return module.residual_out(self._conv(module.conv2, output, flush), x)
+        if isinstance(module, UpsampleLayer):
+            if module.repeat:
+                raise NotImplementedError("Streaming decode of repeat upsampling.")
+            x = self._conv(module.layer, x, flush)
+            return module.activation(x) if module.activation is not None else x
+        if isinstance(module, PostProcessor):
+            x = torch.repeat_interleave(x, module.num_samples, dim=-1)
+            return module.activation(self._conv(module.conv, x, flush))
+        return self._conv(module, x, flush)
+
+    def _conv(self, layer, x, flush):
+        if isinstance(layer, ConvTranspose1d):
+            return self._conv_transpose(layer, x)
+        kernel_size = layer.dilation[0] * (layer.kernel_size[0] - 1) + 1
+        state = self._state.get(layer, None)
+        if state is None:
+            left = layer.left_padding if layer.causal else layer.padding[0]
+            state = x.new_zeros(x.shape[0], x.shape[1], left)
+        if flush and not layer.causal:
+            x = F.pad(x, (0, layer.padding[0]))
+        buf = torch.cat([state, x], -1)
+        keep = min(buf.shape[-1], kernel_size - 1)
+        self._state[layer] = buf[..., buf.shape[-1] - keep :]
+        if buf.shape[-1] < kernel_size:
+            return x.new_zeros(x.shape[0], layer.out_channels, 0)
+        return F.conv1d(
+            buf, layer.weight, layer.bias, 1, 0, layer.dilation, layer.groups
+        )
+
+    def _conv_transpose(self, layer, x):
+        # kernel_size == 2 * stride: each input frame spills into the next block
+        prev = self._state.get(layer, None)
+        if prev is None:
+            prev = x.new_zeros(x.shape[0], x.shape[1], 1)
+        if x.shape[-1] == 0:
+            return x.new_zeros(x.shape[0], layer.out_channels, 0)
+        buf = torch.cat([prev, x], -1)
+        self._state[layer] = buf[..., -1:]
+        y = nn.ConvTranspose1d.forward(layer, buf)
+        return y[..., layer.stride : -layer.stride]
@@ -12,8 +12,9 @@ class RMSNorm(nn.Module):
         self.weight = nn.Parameter(torch.ones(dim))
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        var = x.pow(2).mean(dim=-1, keepdim=True)
-        x = x * torch.rsqrt(var + self.eps)
+        # variance in fp32: squaring overflows / loses precision in fp16 and bf16
+        var = x.float().pow(2).mean(dim=-1, keepdim=True)
+        x = x * torch.rsqrt(var + self.eps).to(x.dtype)
         return self.weight * x
 
 
@@ -51,6 +52,32 @@ class RotaryEmbedding(nn.Module):
         ) + (x_rot * sin.unsqueeze(-1)).reshape_as(x[..., : self.dim])
 
 
+def rope_freqs_cis(
+    seq_len: int, rope_dim: int, device, base: int = 10000
+) -> torch.Tensor:
+    """Complex RoPE table of shape [seq_len, rope_dim // 2], built in fp32."""
+    inv_freq = 1.0 / (
+        base
+        ** (torch.arange(0, rope_dim, 2, device=device, dtype=torch.float32) / rope_dim)
+    )
+    t = torch.arange(seq_len, device=device, dtype=torch.float32)
+    freqs = torch.outer(t, inv_freq)
+    return torch.polar(torch.ones_like(freqs), freqs)
+
+
+def _apply_rotary_cis(x: torch.Tensor, freqs_cis: torch.Tensor) -> torch.Tensor:
+    # Same interleaved-pair rotation as LlamaAttention.forward, as one complex mul.
+    rope_dim = freqs_cis.shape[-1] * 2
+    head = x[..., :rope_dim]
+    rot = torch.view_as_complex(
+        head.float().reshape(*head.shape[:-1], rope_dim // 2, 2)
+    )
+    rot = torch.view_as_real(rot * freqs_cis).flatten(-2).to(x.dtype)
+    if rope_dim == x.shape[-1]:
+        return rot
+    return torch.cat([rot, x[..., rope_dim:]], dim=-1)
+
+
 class LlamaAttention(nn.Module):
     def __init__(
         self,
@@ -79,6 +106,52 @@ class LlamaAttention(nn.Module):
         self.rope = RotaryEmbedding(self.rope_dim)
         self.use_sdpa = use_sdpa
         self._has_sdpa = hasattr(F, "scaled_dot_product_attention")
+        self._fused = False
+
+    def fuse_qkv(self):
+        """Concatenate q/k/v projections into one matmul for inference.
+
+        The original ``q_proj``/``k_proj``/``v_proj`` parameters are re-pointed
+        at slices of the fused weight, so the state dict is unchanged and no
+        extra memory is used. Later ``.to()`` / dtype moves keep the aliasing
+        (see ``_apply``).
+        """
+        if self._fused or self.cross_attention_dim is not None:
+            return
+        projs = (self.q_proj, self.k_proj, self.v_proj)
+        weight = torch.cat([p.weight.data for p in projs], 0)
+        self.register_buffer("qkv_weight", weight, persistent=False)
+        if self.q_proj.bias is not None:
+            bias = torch.cat([p.bias.data for p in projs], 0)
+            self.register_buffer("qkv_bias", bias, persistent=False)
+        self._alias_qkv()
+        self._fused = True
+
+    def _alias_qkv(self):
+        bias = getattr(self, "qkv_bias", None)
+        for i, p in enumerate((self.q_proj, self.k_proj, self.v_proj)):
+            sl = slice(i * self.inner_dim, (i + 1) * self.inner_dim)
+            p.weight.data = self.qkv_weight[sl]
+            if bias is not None:
+                p.bias.data = bias[sl]
+
+    def _apply(self, fn, *args, **kwargs):
+        super()._apply(fn, *args, **kwargs)
+        if self._fused:
+            # parameters and buffers are converted separately; without this the
+            # q/k/v copies stop sharing storage and QKV memory doubles
+            self._alias_qkv()
+        return self
+
+    def _forward_fused(self, x: torch.Tensor, freqs_cis: torch.Tensor):
+        b, t, _ = x.shape
+        qkv = F.linear(x, self.qkv_weight, getattr(self, "qkv_bias", None))
+        q, k, v = qkv.view(b, t, 3, self.n_heads, self.head_dim).permute(2, 0, 3, 1, 4)
+        q = _apply_rotary_cis(q, freqs_cis)
+        k = _apply_rotary_cis(k, freqs_cis)
+        out = F.scaled_dot_product_attention(q, k, v)
+        out = out.transpose(1, 2).reshape(b, t, self.inner_dim)
+        return self.o_proj(out)
 
     def _shape(self, x: torch.Tensor, b: int, t: int) -> torch.Tensor:
         return x.view(b, t, self.n_heads, self.head_dim).transpose(1, 2)
@@ -88,7 +161,18 @@ class LlamaAttention(nn.Module):
         x: torch.Tensor,
         encoder_hidden_states: Optional[torch.Tensor] = None,
         attention_mask: Optional[torch.Tensor] = None,
+        freqs_cis: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
+        if (
+            freqs_cis is not None
+            and self._fused
+            and encoder_hidden_states is None
+            and attention_mask is None
+            and self._has_sdpa
+            and not self.training
+        ):
+            return self._forward_fused(x, freqs_cis)
+
         b, t, c = x.shape
         q = self._shape(self.q_proj(x), b, t)
         if encoder_hidden_states is None:
@@ -234,6 +318,7 @@ class LlamaTransformerBlock(nn.Module):
         encoder_hidden_states: Optional[torch.Tensor] = None,
         attention_mask: Optional[torch.Tensor] = None,
         timestep: Optional[torch.Tensor] = None,
+        freqs_cis: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
         if self.use_ada_layer_norm_single:
             batch_size = x.shape[0]
@@ -245,7 +330,9 @@ class LlamaTransformerBlock(nn.Module):
             # Self-Attention with modulation and gating
             norm_hidden_states = self.attn_norm(x)
             norm_hidden_states = norm_hidden_states * (1 + scale_msa) + shift_msa
-            h = self.attn(norm_hidden_states, attention_mask=attention_mask)
+            h = self.attn(
+                norm_hidden_states, attention_mask=attention_mask, freqs_cis=freqs_cis
+            )
             h = gate_msa * h
             x = x + h
 
@@ -257,7 +344,9 @@ class LlamaTransformerBlock(nn.Module):
             x = x + h
             return x
         else:
-            h = self.attn(self.attn_norm(x), attention_mask=attention_mask)
+            h = self.attn(
+                self.attn_norm(x), attention_mask=attention_mask, freqs_cis=freqs_cis
+            )
             x = x + h
             h = self.mlp(self.mlp_norm(x))
             x = x + h
@@ -351,6 +440,32 @@ class LlamaTransformer(nn.Module):
         self.adaln_single = AdaLayerNormSingleFlow(inner_dim)
         self.adaln_single_2 = AdaLayerNormSingleFlow(inner_dim_2)
 
+        self.fast_path = False
+        self._rope_tables = {}
+
+    def enable_fast_path(self):
+        """Fuse QKV projections and share one RoPE table per window length.
+
+        Inference only: every block then runs a single QKV matmul and maskless
+        SDPA, and RoPE is precomputed once per forward instead of per block.
+        """
+        for blk in list(self.transformer_blocks) + list(self.transformer_blocks_2):
+            blk.attn.fuse_qkv()
+        self.fast_path = True
+        self._rope_tables = {}
+
+    def _get_rope(self, seq_len: int, head_dim: int, device) -> torch.Tensor:
+        key = (seq_len, head_dim, device)
+        table = self._rope_tables.get(key, None)
+        if table is None:
+            # Window length is fixed per detokenize call; keep only the latest.
+            self._rope_tables = {
+                k: v for k, v in self._rope_tables.items() if k[0] == seq_len
+            }
+            table = rope_freqs_cis(seq_len, head_dim, device)
+            self._rope_tables[key] = table
+        return table
+
     def forward(
         self,
         hidden_states: torch.Tensor,
@@ -358,6 +473,16 @@ class LlamaTransformer(nn.Module):
     ):
         s = self.proj_in(hidden_states)
 
+        freqs_cis = freqs_cis_2 = None
+        if self.fast_path and not self.training:
+            seq_len = hidden_states.shape[1]
+            freqs_cis = self._get_rope(
+                seq_len, self.transformer_blocks[0].attn.rope_dim, s.device
+            )
+            freqs_cis_2 = self._get_rope(
+                seq_len, self.transformer_blocks_2[0].attn.rope_dim, s.device
+            )
+
         embedded_timestep = None
         timestep_mod = None
         if self.adaln_single is not None and timestep is not None:
@@ -366,7 +491,7 @@ class LlamaTransformer(nn.Module):
                 timestep, hidden_dtype=s.dtype
             )
         for blk in self.transformer_blocks:
-            s = blk(s, timestep=timestep_mod)
+            s = blk(s, timestep=timestep_mod, freqs_cis=freqs_cis)
 
         if embedded_timestep is None:
             embedded_timestep = torch.zeros(
@@ -390,7 +515,7 @@ class LlamaTransformer(nn.Module):
                 timestep, hidden_dtype=x.dtype
             )
         for blk in self.transformer_blocks_2:
-            x = blk(x, timestep=timestep_mod_2)
+            x = blk(x, timestep=timestep_mod_2, freqs_cis=freqs_cis_2)
 
         if embedded_timestep_2 is None:
             embedded_timestep_2 = torch.zeros(
@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional
+import hashlib
+import os
+import torch
+
+CACHE_SUFFIX = ".window.pt"
+
+
+class WindowCache:
+    """
+    On-disk LRU of solved and decoded ``HeartCodec.detokenize`` windows.
+
+    An entry holds a window batch's flow-matching latents, its ScalarModel
+    audio and the RNG state after solving it. ``HeartCodec`` keys entries on
+    the window codes, the in-context latent, the solver settings and the RNG
+    state before the solve, so a hit returns exactly what solving would have
+    produced. Least recently used entries are deleted once the directory
+    grows past ``max_bytes``. Keys do not cover the codec weights: use one
+    directory per checkpoint.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 4 * 1024**3):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            if torch.is_tensor(part):
+                part = part.detach().cpu()
+                if part.is_floating_point():
+                    part = part.float()
+                digest.update(str(tuple(part.shape)).encode())
+                digest.update(part.contiguous().numpy().tobytes())
+            else:
+                digest.update(repr(part).encode())
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{CACHE_SUFFIX}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            entry = torch.load(path, map_location="cpu", weights_only=True)
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"Dropping unreadable window cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        torch.save(entry, tmp_path)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,14 +1,17 @@
+from typing import TYPE_CHECKING
 import torch
 import torch.nn as nn
 from .configuration_heartmula import HeartMuLaConfig
 from transformers.modeling_utils import PreTrainedModel
-import torch
-import torch.nn as nn
-import torchtune
-from torchtune.models import llama3_2
 
+# torchtune is imported when a model is built, not when this module is imported
+if TYPE_CHECKING:
+    from torchtune.modules import TransformerDecoder
+
+
+def llama3_2_3B() -> "TransformerDecoder":
+    from torchtune.models import llama3_2
 
-def llama3_2_3B() -> torchtune.modules.transformer.TransformerDecoder:
     return llama3_2.llama3_2(
         vocab_size=128_256,
         num_layers=28,
@@ -24,7 +27,9 @@ def llama3_2_3B() -> torchtune.modules.transformer.TransformerDecoder:
     )
 
 
-def llama3_2_300M() -> torchtune.modules.transformer.TransformerDecoder:
+def llama3_2_300M() -> "TransformerDecoder":
+    from torchtune.models import llama3_2
+
     return llama3_2.llama3_2(
         vocab_size=128_256,
         num_layers=3,
@@ -40,7 +45,9 @@ def llama3_2_300M() -> torchtune.modules.transformer.TransformerDecoder:
     )
 
 
-def llama3_2_7B() -> torchtune.modules.transformer.TransformerDecoder:
+def llama3_2_7B() -> "TransformerDecoder":
+    from torchtune.models import llama3_2
+
     return llama3_2.llama3_2(
         vocab_size=128_256,
         num_layers=32,
@@ -56,7 +63,9 @@ def llama3_2_7B() -> torchtune.modules.transformer.TransformerDecoder:
     )
 
 
-def llama3_2_400M() -> torchtune.modules.transformer.TransformerDecoder:
+def llama3_2_400M() -> "TransformerDecoder":
+    from torchtune.models import llama3_2
+
     return llama3_2.llama3_2(
         vocab_size=128_256,
         num_layers=4,
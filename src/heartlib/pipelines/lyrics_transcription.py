@@ -1,8 +1,9 @@
 from transformers.pipelines.automatic_speech_recognition import (
     AutomaticSpeechRecognitionPipeline,
 )
-from transformers.models.whisper.modeling_whisper import WhisperForConditionalGeneration
-from transformers.models.whisper.processing_whisper import WhisperProcessor
+from .vocal_activity import vocal_regions
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
 import torch
 import os
 
@@ -11,10 +12,101 @@ class HeartTranscriptorPipeline(AutomaticSpeechRecognitionPipeline):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    def transcribe_tensor(
+        self,
+        wav: torch.Tensor,
+        sample_rate: int,
+        vocal_gating: bool = False,
+        gate_kwargs: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ):
+        """
+        Transcribe an in-memory waveform, e.g. the 48 kHz ``[channels, samples]``
+        output of ``HeartMuLaGenPipeline``, without writing it to disk. The audio
+        is downmixed and resampled once, on the pipeline's device, to the
+        feature extractor's rate; ``kwargs`` are passed to the pipeline call.
+        With ``vocal_gating`` only the voiced regions are transcribed, see
+        ``transcribe_voiced``.
+        """
+        import torchaudio
+
+        wav = wav.to(self.device, torch.float32)
+        if wav.dim() == 2:
+            wav = wav.mean(0)
+        target_rate = self.feature_extractor.sampling_rate
+        if sample_rate != target_rate:
+            wav = torchaudio.functional.resample(wav, sample_rate, target_rate)
+        if vocal_gating:
+            return self.transcribe_voiced(
+                wav.cpu().numpy(), target_rate, gate_kwargs, **kwargs
+            )
+        audio = {"raw": wav.cpu().numpy(), "sampling_rate": target_rate}
+        return self(audio, **kwargs)
+
+    def transcribe_voiced(
+        self,
+        audio: Union[np.ndarray, List[np.ndarray]],
+        sampling_rate: int,
+        gate_kwargs: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ):
+        """
+        Transcribe only the regions of mono ``audio`` (or a list of songs)
+        that ``vocal_regions`` finds voiced, skipping silent intros, outros
+        and breaks where Whisper spends compute and tends to hallucinate.
+        The regions of all songs go through one pipeline call. Each result
+        holds the joined ``text``, the ``regions`` in song time and the
+        ``voiced_sec`` / ``total_sec`` that were transcribed; with
+        ``return_timestamps`` its ``chunks`` are shifted back to song time.
+        """
+        songs = audio if isinstance(audio, list) else [audio]
+        segments, owners = [], []
+        results = []
+        for i, song in enumerate(songs):
+            regions = vocal_regions(song, sampling_rate, **(gate_kwargs or {}))
+            for start, end in regions:
+                raw = song[int(start * sampling_rate) : int(end * sampling_rate)]
+                segments.append(
+                    {"raw": np.ascontiguousarray(raw), "sampling_rate": sampling_rate}
+                )
+                owners.append((i, start))
+            results.append(
+                {
+                    "text": "",
+                    "regions": regions,
+                    "voiced_sec": sum(end - start for start, end in regions),
+                    "total_sec": len(song) / sampling_rate,
+                }
+            )
+        outputs = self(segments, **kwargs) if segments else []
+        texts = [[] for _ in songs]
+        for (i, offset), output in zip(owners, outputs):
+            texts[i].append(output["text"].strip())
+            if "chunks" in output:
+                results[i].setdefault("chunks", []).extend(
+                    {
+                        **chunk,
+                        "timestamp": tuple(
+                            None if t is None else t + offset
+                            for t in chunk["timestamp"]
+                        ),
+                    }
+                    for chunk in output["chunks"]
+                )
+        for result, parts in zip(results, texts):
+            result["text"] = " ".join(part for part in parts if part)
+        return results if isinstance(audio, list) else results[0]
+
     @classmethod
     def from_pretrained(
         cls, pretrained_path: str, device: torch.device, dtype: torch.dtype
     ):
+        # deferred: the Whisper classes are only needed to load a checkpoint
+        from transformers.models.whisper.modeling_whisper import (
+            WhisperForConditionalGeneration,
+        )
+        from transformers.models.whisper.processing_whisper import WhisperProcessor
+
         if os.path.exists(
             hearttranscriptor_path := os.path.join(
                 pretrained_path, "HeartTranscriptor-oss"
@@ -1,12 +1,12 @@
 from tokenizers import Tokenizer
 from ..heartmula.modeling_heartmula import HeartMuLa
 from ..heartcodec.modeling_heartcodec import HeartCodec
+from ..profiling import Profiler, profile_span
 import torch
-from typing import Dict, Any, Optional, Union
+from typing import Callable, Dict, Any, Optional, Union
 import os
 from dataclasses import dataclass
 from tqdm import tqdm
-import torchaudio
 import json
 from contextlib import contextmanager
 import gc
@@ -94,6 +94,7 @@ class HeartMuLaGenPipeline:
         muq_mulan: Optional[Any],
         text_tokenizer: Tokenizer,
         config: HeartMuLaGenConfig,
+        compile_codec: bool = False,
     ):
 
         self.muq_mulan = muq_mulan
@@ -110,9 +111,12 @@ class HeartMuLaGenPipeline:
         self.codec_dtype = heartcodec_dtype
         self.codec_path = heartcodec_path
         self.codec_device = heartcodec_device
+        # torch.compile for the codec's fused activations (needs an Inductor toolchain)
+        self.compile_codec = compile_codec
 
         self._mula: Optional[HeartMuLa] = None
         self._codec: Optional[HeartCodec] = None
+        self.profiler: Optional[Profiler] = None
         if not lazy_load:
             print(
                 f"You have set lazy_load = False. Loading HeartMuLa and HeartCodec onto device..."
@@ -122,35 +126,58 @@ class HeartMuLaGenPipeline:
                 device_map=self.mula_device,
                 dtype=self.mula_dtype,
             )
-            self._codec = HeartCodec.from_pretrained(
-                self.codec_path,
-                device_map=self.codec_device,
-                dtype=self.codec_dtype,
-            )
+            self._codec = self._load_codec()
         self.lazy_load = lazy_load
 
     @property
     def mula(self) -> HeartMuLa:
         if isinstance(self._mula, HeartMuLa):
             return self._mula
-        self._mula = HeartMuLa.from_pretrained(
-            self.mula_path,
-            device_map=self.mula_device,
-            dtype=self.mula_dtype,
-        )
+        with profile_span(self.profiler, "load", model="heartmula"):
+            self._mula = HeartMuLa.from_pretrained(
+                self.mula_path,
+                device_map=self.mula_device,
+                dtype=self.mula_dtype,
+            )
         return self._mula
 
     @property
     def codec(self) -> HeartCodec:
         if isinstance(self._codec, HeartCodec):
             return self._codec
-        self._codec = HeartCodec.from_pretrained(
-            self.codec_path,
-            device_map=self.codec_device,
-            dtype=self.codec_dtype,
-        )
+        self._codec = self._load_codec()
         return self._codec
 
+    def _load_codec(self) -> HeartCodec:
+        # weight norm is folded once and cached next to the checkpoint
+        with profile_span(self.profiler, "load", model="heartcodec"):
+            return HeartCodec.from_pretrained_folded(
+                self.codec_path,
+                device_map=self.codec_device,
+                dtype=self.codec_dtype,
+                compile_activations=self.compile_codec,
+            )
+
+    @contextmanager
+    def profile(self, callback=None, cuda_sync: bool = True):
+        """
+        Record timed spans (load, tokenize, prefill, frame, codec.window,
+        codec.ode_step, codec.decode, detokenize, save) with memory high-water
+        marks for the renders run inside the block::
+
+            with pipeline.profile() as profiler:
+                pipeline(inputs, save_path="song.mp3")
+            report = profiler.report()
+        """
+        profiler = Profiler(callback=callback, cuda_sync=cuda_sync)
+        self.profiler = profiler
+        try:
+            yield profiler
+        finally:
+            self.profiler = None
+            if isinstance(self._codec, HeartCodec):
+                self._codec.set_profiler(None)
+
     def _unload(self):
         if not self.lazy_load:
             return
@@ -190,6 +217,10 @@ class HeartMuLaGenPipeline:
         }
         postprocess_kwargs = {
             "save_path": kwargs.get("save_path", "output.mp3"),
+            "artifact_path": kwargs.get("artifact_path", None),
+            "window_cache": kwargs.get("window_cache", None),
+            "codec_seed": kwargs.get("codec_seed", None),
+            "post_render": kwargs.get("post_render", None),
         }
         return preprocess_kwargs, forward_kwargs, postprocess_kwargs
 
@@ -281,7 +312,9 @@ class HeartMuLaGenPipeline:
 
         bs_size = 2 if cfg_scale != 1.0 else 1
         self.mula.setup_caches(bs_size)
-        with torch.autocast(device_type=self.mula_device.type, dtype=self.mula_dtype):
+        with torch.autocast(
+            device_type=self.mula_device.type, dtype=self.mula_dtype
+        ), profile_span(self.profiler, "prefill", tokens=prompt_pos.shape[-1]):
             curr_token = self.mula.generate_frame(
                 tokens=prompt_tokens,
                 tokens_mask=prompt_tokens_mask,
@@ -317,7 +350,7 @@ class HeartMuLaGenPipeline:
             curr_token, curr_token_mask = _pad_audio_token(curr_token)
             with torch.autocast(
                 device_type=self.mula_device.type, dtype=self.mula_dtype
-            ):
+            ), profile_span(self.profiler, "frame", index=i):
                 curr_token = self.mula.generate_frame(
                     tokens=curr_token,
                     tokens_mask=curr_token_mask,
@@ -332,22 +365,50 @@ class HeartMuLaGenPipeline:
                 break
             frames.append(curr_token[0:1,])
         frames = torch.stack(frames).permute(1, 2, 0).squeeze(0)
-        self._unload()
+        with profile_span(self.profiler, "unload"):
+            self._unload()
         return {"frames": frames}
 
-    def postprocess(self, model_outputs: Dict[str, Any], save_path: str):
+    def postprocess(
+        self,
+        model_outputs: Dict[str, Any],
+        save_path: str,
+        artifact_path: Optional[str] = None,
+        window_cache=None,
+        codec_seed: Optional[int] = None,
+        post_render: Optional[Callable[[torch.Tensor, int], Any]] = None,
+    ):
         frames = model_outputs["frames"].to(self.codec_device)
-        wav = self.codec.detokenize(frames)
-        self._unload()
-        torchaudio.save(save_path, wav.to(torch.float32).cpu(), 48000)
+        if codec_seed is not None:
+            # codec noise independent of how many draws HeartMuLa made, so
+            # window_cache can reuse unchanged windows across re-renders
+            torch.manual_seed(codec_seed)
+        codec = self.codec.set_profiler(self.profiler)
+        # artifact_path keeps frames + codec latents for re-decoding without HeartMuLa
+        with profile_span(self.profiler, "detokenize", frames=frames.shape[-1]):
+            wav = codec.detokenize(
+                frames, artifact_path=artifact_path, window_cache=window_cache
+            )
+        with profile_span(self.profiler, "unload"):
+            self._unload()
+        import torchaudio  # deferred: only needed to write the file
+
+        with profile_span(self.profiler, "save"):
+            torchaudio.save(save_path, wav.to(torch.float32).cpu(), 48000)
+        if post_render is not None:
+            # e.g. an in-process lyric audit on the waveform, without a wav round-trip;
+            # runs after _unload so a lazy-loaded pipeline has freed its device memory
+            with profile_span(self.profiler, "post_render"):
+                return post_render(wav, 48000)
 
     def __call__(self, inputs: Dict[str, Any], **kwargs):
         preprocess_kwargs, forward_kwargs, postprocess_kwargs = (
             self._sanitize_parameters(**kwargs)
         )
-        model_inputs = self.preprocess(inputs, **preprocess_kwargs)
+        with profile_span(self.profiler, "tokenize"):
+            model_inputs = self.preprocess(inputs, **preprocess_kwargs)
         model_outputs = self._forward(model_inputs, **forward_kwargs)
-        self.postprocess(model_outputs, **postprocess_kwargs)
+        return self.postprocess(model_outputs, **postprocess_kwargs)
 
     @classmethod
     def from_pretrained(
@@ -357,6 +418,7 @@ class HeartMuLaGenPipeline:
         dtype: Union[torch.dtype, Dict[str, torch.dtype]],
         version: str,
         lazy_load: bool = False,
+        compile_codec: bool = False,
     ):
 
         mula_path, codec_path, tokenizer_path, gen_config_path = _resolve_paths(
@@ -380,4 +442,5 @@ class HeartMuLaGenPipeline:
             config=gen_config,
             heartmula_dtype=mula_dtype,
             heartcodec_dtype=codec_dtype,
+            compile_codec=compile_codec,
         )
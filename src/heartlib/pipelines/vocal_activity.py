@@ -0,0 +1,80 @@
+from typing import List, Tuple
+import numpy as np
+
+
+def _frames(audio: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """``[num_frames, frame_length]`` strided view, the tail zero-padded."""
+    num_frames = max(1, 1 + int(np.ceil((len(audio) - frame_length) / hop_length)))
+    padded = np.zeros((num_frames - 1) * hop_length + frame_length, dtype=np.float32)
+    padded[: len(audio)] = audio
+    return np.lib.stride_tricks.sliding_window_view(padded, frame_length)[
+        ::hop_length
+    ]
+
+
+def vocal_envelopes(
+    audio: np.ndarray,
+    sampling_rate: int,
+    frame_length: int = 1024,
+    hop_length: int = 320,
+    band: Tuple[float, float] = (200.0, 4000.0),
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame energy (dB relative to the loudest frame) and spectral flatness
+    (0 = tonal, 1 = noise-like) of mono ``audio``, both restricted to the
+    vocal ``band``. Frames are ``hop_length`` samples apart.
+    """
+    frames = _frames(audio.astype(np.float32), frame_length, hop_length)
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_length), axis=-1)) ** 2
+    freqs = np.fft.rfftfreq(frame_length, 1 / sampling_rate)
+    power = power[:, (freqs >= band[0]) & (freqs <= band[1])] + 1e-10
+    energy = 10 * np.log10(power.mean(-1))
+    energy -= energy.max()
+    flatness = np.exp(np.log(power).mean(-1)) / power.mean(-1)
+    return energy, flatness
+
+
+def vocal_regions(
+    audio: np.ndarray,
+    sampling_rate: int,
+    energy_db: float = -35.0,
+    max_flatness: float = 0.4,
+    smooth_sec: float = 0.5,
+    min_gap_sec: float = 2.0,
+    min_region_sec: float = 1.0,
+    pad_sec: float = 0.5,
+    hop_length: int = 320,
+) -> List[Tuple[float, float]]:
+    """
+    ``(start_sec, end_sec)`` regions of mono ``audio`` that may hold vocals.
+
+    A frame counts as voiced when its band energy is within ``energy_db`` of
+    the loudest frame and its band spectrum is tonal (flatness at most
+    ``max_flatness``); the mask is smoothed over ``smooth_sec``. Regions
+    closer than ``min_gap_sec`` are merged, shorter than ``min_region_sec``
+    dropped, and the rest padded by ``pad_sec`` on both sides. The gate only
+    drops silence, fades and noise-like passages; sustained tonal
+    instrumentals are kept, so Whisper still sees every sung word.
+    """
+    energy, flatness = vocal_envelopes(audio, sampling_rate, hop_length=hop_length)
+    frame_sec = hop_length / sampling_rate
+    voiced = ((energy > energy_db) & (flatness < max_flatness)).astype(np.float32)
+    width = max(1, int(round(smooth_sec / frame_sec)))
+    voiced = np.convolve(voiced, np.ones(width) / width, mode="same") > 0.5
+
+    # rising / falling edges of the mask -> frame ranges
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced, [0])).astype(int)))
+    starts, ends = edges[::2] * frame_sec, edges[1::2] * frame_sec
+    duration = len(audio) / sampling_rate
+    regions = []
+    for start, end in zip(starts, ends):
+        # merge across short gaps, and where the padding would overlap
+        if regions and start - regions[-1][1] < max(min_gap_sec, 2 * pad_sec):
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+    return [
+        (max(0.0, float(start) - pad_sec), min(duration, float(end) + pad_sec))
+        for start, end in regions
+        if end - start >= min_region_sec
+    ]
@@ -0,0 +1,125 @@
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, List, Optional
+import sys
+import threading
+import time
+import torch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process-wide resident-set high-water mark in MB, if the OS reports it."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 1024**2
+    except (ImportError, AttributeError):
+        return None
+
+
+class Profiler:
+    """
+    Collects timed spans from ``HeartMuLaGenPipeline`` and ``HeartCodec``.
+
+    Every span records its name, start offset, duration, nesting parent and
+    free-form attributes (frame index, window index, ...), plus the RSS and
+    CUDA memory high-water marks when it ended. ``callback(span)`` is called as
+    each span finishes, e.g. for live progress. With ``cuda_sync=True`` CUDA
+    work is synchronized at span boundaries so spans measure device time, at
+    some cost to throughput. Spans may be recorded from several threads.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cuda_sync: bool = True,
+    ):
+        self.callback = callback
+        self.cuda_sync = cuda_sync and torch.cuda.is_available()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._t0 = time.perf_counter()
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if self.cuda_sync:
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+            if self.cuda_sync:
+                torch.cuda.synchronize()
+            end = time.perf_counter()
+            record = {
+                "name": name,
+                "parent": stack[-1] if stack else None,
+                "start_sec": start - self._t0,
+                "duration_sec": end - start,
+                "peak_rss_mb": peak_rss_mb(),
+                "peak_cuda_mb": (
+                    torch.cuda.max_memory_allocated() / 1024**2
+                    if torch.cuda.is_available()
+                    else None
+                ),
+                **attrs,
+            }
+            with self._lock:
+                self.spans.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def report(self, include_spans: bool = False) -> Dict[str, Any]:
+        """
+        Summarise the recorded spans per name (count, total, mean, max) with
+        the overall memory high-water marks; ``include_spans`` adds every raw
+        span (one per generated frame, so large for long songs).
+        """
+        with self._lock:
+            spans = list(self.spans)
+        stages = {}
+        for record in spans:
+            stage = stages.setdefault(
+                record["name"],
+                {"count": 0, "total_sec": 0.0, "max_sec": 0.0, "parent": None},
+            )
+            stage["count"] += 1
+            stage["total_sec"] += record["duration_sec"]
+            stage["max_sec"] = max(stage["max_sec"], record["duration_sec"])
+            stage["parent"] = record["parent"]
+        for stage in stages.values():
+            stage["mean_sec"] = stage["total_sec"] / stage["count"]
+        rss = [r["peak_rss_mb"] for r in spans if r["peak_rss_mb"] is not None]
+        cuda = [r["peak_cuda_mb"] for r in spans if r["peak_cuda_mb"] is not None]
+        report = {
+            "wall_sec": time.perf_counter() - self._t0,
+            "peak_rss_mb": max(rss) if rss else None,
+            "peak_cuda_mb": max(cuda) if cuda else None,
+            "stages": stages,
+        }
+        if include_spans:
+            report["spans"] = spans
+        return report
+
+
+def profile_span(profiler: Optional[Profiler], name: str, **attrs):
+    """``profiler.span(name, ...)``, or a no-op when no profiler is attached."""
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name, **attrs)